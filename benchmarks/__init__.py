@@ -0,0 +1,2 @@
+# Benchmarks de la app: cada página se ejecuta sin navegador (streamlit.testing) con los datos del repo o con datos sintéticos
+# python -m benchmarks.run --help
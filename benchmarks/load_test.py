@@ -0,0 +1,190 @@
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from benchmarks.run import RESULTS_DIR, _git_commit
+from utils.paths import BASE_DIR
+
+# Prueba de carga en local: arranca la app con "streamlit run" y abre N sesiones a la vez por websocket,
+# como N navegadores. Cada sesión recorre las páginas de SESSION_PAGES eligiéndolas en el menú; se mide
+# la latencia de cada ejecución del script y la memoria del servidor con todas las sesiones abiertas,
+# para varios valores de N (curvas de memoria y latencia)
+
+# Recorrido de cada sesión simulada (lo que haría alguien que sigue la presentación)
+SESSION_PAGES = ["Overview", "Interactive Analysis", "Statistics", "Conclusions", "Downloads & Resources"]
+
+# Nombre del componente del menú en los mensajes de Streamlit: su id es el widget al que se envía la página elegida
+MENU_COMPONENT = "streamlit_option_menu.option_menu"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _server_rss_mb(pid):
+    # Memoria residente del servidor (solo Linux)
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[max(0, math.ceil(q * len(values)) - 1)] if values else None
+
+
+def start_server(port, timeout=60):
+    command = [
+        sys.executable, "-m", "streamlit", "run", str(BASE_DIR / "app.py"),
+        "--server.headless", "true", "--server.port", str(port), "--browser.gatherUsageStats", "false",
+    ]
+    server = subprocess.Popen(command, cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"The Streamlit server did not start on port {port}")
+
+
+class Session:
+    # Una sesión de navegador simulada: envía "rerun" con el estado de los widgets y espera a script_finished
+
+    def __init__(self, websocket, timeout):
+        self.websocket = websocket
+        self.timeout = timeout
+        self.menu_id = None
+        self.errors = []
+
+    async def run(self, page=None):
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        if page is not None and self.menu_id is not None:
+            widget = message.rerun_script.widget_states.widgets.add()
+            widget.id = self.menu_id
+            widget.json_value = json.dumps(page)
+        start = time.perf_counter()
+        await self.websocket.send(message.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await asyncio.wait_for(self.websocket.recv(), self.timeout))
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                if element.WhichOneof("type") == "component_instance" and element.component_instance.component_name == MENU_COMPONENT:
+                    self.menu_id = element.component_instance.id
+                elif element.WhichOneof("type") == "exception":
+                    self.errors.append(f"{page}: {element.exception.message}")
+            elif kind == "script_finished":
+                return time.perf_counter() - start
+
+
+async def _simulate_session(url, pages, timeout, sessions_open, measured):
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as websocket:
+        session = Session(websocket, timeout)
+        latencies = [await session.run()]
+        for page in pages:
+            latencies.append(await session.run(page))
+        # La sesión sigue abierta (con su session_state en el servidor) hasta que se ha medido la memoria
+        sessions_open.release()
+        await measured.wait()
+        return latencies, session.errors
+
+
+async def run_level(port, pid, sessions, pages, timeout):
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    rss_before = _server_rss_mb(pid)
+    sessions_open = asyncio.Semaphore(0)
+    measured = asyncio.Event()
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(_simulate_session(url, pages, timeout, sessions_open, measured)) for _ in range(sessions)]
+    for _ in range(sessions):
+        await sessions_open.acquire()
+    elapsed = time.perf_counter() - start
+    rss_after = _server_rss_mb(pid)
+    measured.set()
+    results = await asyncio.gather(*tasks)
+    latencies = [latency for session_latencies, _ in results for latency in session_latencies]
+    errors = [error for _, session_errors in results for error in session_errors]
+    return {
+        "sessions": sessions,
+        "runs": len(latencies),
+        "elapsed_seconds": elapsed,
+        "runs_per_second": len(latencies) / elapsed,
+        "p50_seconds": statistics.median(latencies),
+        "p95_seconds": _percentile(latencies, 0.95),
+        "max_seconds": max(latencies),
+        "server_rss_mb": rss_after,
+        "rss_growth_per_session_mb": None if rss_after is None or rss_before is None else (rss_after - rss_before) / sessions,
+        "errors": errors[:20],
+    }
+
+
+async def _load_test(port, pid, levels, pages, timeout):
+    # Una primera sesión llena las cachés compartidas: los niveles miden sesiones que llegan con el servidor en caliente
+    warmup = await run_level(port, pid, 1, pages, timeout)
+    return warmup, [await run_level(port, pid, sessions, pages, timeout) for sessions in levels]
+
+
+def load_test(levels, pages=SESSION_PAGES, timeout=300):
+    port = _free_port()
+    server = start_server(port)
+    try:
+        warmup, results = asyncio.run(_load_test(port, server.pid, levels, pages, timeout))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "cpu_count": os.cpu_count(),
+        "pages": list(pages),
+        "warmup": warmup,
+        "levels": results,
+    }
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.load_test --sessions 1,10,50,200
+    parser = argparse.ArgumentParser(description="Simulate concurrent browser sessions and report memory and latency curves.")
+    parser.add_argument("--sessions", default="1,10,50", help="Comma-separated numbers of concurrent sessions")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds allowed for one script run")
+    args = parser.parse_args()
+
+    result = load_test([int(value) for value in args.sessions.split(",")], timeout=args.timeout)
+    print(f"{'sessions':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'runs/s':>7} {'RSS MB':>8} {'MB/session':>10}")
+    for level in result["levels"]:
+        print(
+            f"{level['sessions']:>8} {level['p50_seconds'] * 1000:>8.0f} {level['p95_seconds'] * 1000:>8.0f} "
+            f"{level['max_seconds'] * 1000:>8.0f} {level['runs_per_second']:>7.1f} {level['server_rss_mb'] or 0:>8.0f} "
+            f"{level['rss_growth_per_session_mb'] or 0:>10.2f}"
+        )
+        for error in level["errors"]:
+            print(f"  ERROR {error}")
+    output_dir = RESULTS_DIR / "load"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"{result['timestamp'].replace(':', '').replace('-', '')[:15]}-{result['commit']}.json"
+    path.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"Results saved to {path}")
@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from collections import Counter
+
+from utils.paths import BASE_DIR
+
+# Ejecuta una página de la app sin navegador en este proceso y escribe sus medidas en JSON por la salida estándar
+# benchmarks/run.py lanza un proceso nuevo por página, así cada medida empieza en frío (sin módulos ni cachés en memoria)
+
+# Tiempo máximo de una ejecución de la página (con 10M de filas algunas páginas tardan minutos)
+DEFAULT_TIMEOUT = 900
+
+
+def _peak_memory_mb():
+    # Pico de memoria residente de este proceso y de sus hijos (ru_maxrss está en KB en Linux y en bytes en macOS)
+    unit = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+    return {"peak_rss_mb": own / 1024 ** 2, "peak_children_rss_mb": children / 1024 ** 2}
+
+
+def _payload(node, sizes):
+    # Bytes de cada elemento que se enviaría al navegador (el mensaje protobuf), agrupados por tipo
+    proto = getattr(node, "proto", None)
+    if proto is not None and hasattr(proto, "ByteSize"):
+        sizes[getattr(node, "type", type(node).__name__)] += proto.ByteSize()
+    for child in getattr(node, "children", {}).values():
+        _payload(child, sizes)
+    return sizes
+
+
+def run_page(title, runs=2, timeout=DEFAULT_TIMEOUT):
+    import streamlit_option_menu
+
+    # El menú es un componente de React que no funciona sin navegador: devolvemos directamente la página a medir
+    streamlit_option_menu.option_menu = lambda *args, **kwargs: title
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(BASE_DIR / "app.py"), default_timeout=timeout)
+    app.session_state["current_page_key"] = title
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        app.run()
+        durations.append(time.perf_counter() - start)
+    sizes = _payload(app._tree, Counter())
+    return {
+        "cold_seconds": durations[0],
+        "warm_seconds": min(durations[1:]) if len(durations) > 1 else None,
+        "payload_bytes": sum(sizes.values()),
+        "payload_by_type": dict(sizes.most_common()),
+        "chart_bytes": sum(size for kind, size in sizes.items() if "chart" in kind),
+        "exceptions": [exception.message for exception in app.exception],
+        **_peak_memory_mb(),
+    }
+
+
+def measure_downloads():
+    # Tamaño y tiempo de generación de lo que se puede descargar en "Downloads & Resources"
+    from utils.archives import get_folder_archive
+    from utils.paths import PROCESSED_DIR, RAW_DIR, REPORTS_DIR
+    from utils.reports import build_report
+
+    results = {}
+    for path in sorted(REPORTS_DIR.glob("*.pdf")):
+        results[path.name] = {"bytes": path.stat().st_size, "seconds": 0.0}
+    producers = {
+        "raw.zip": lambda: get_folder_archive(os.fspath(RAW_DIR)),
+        "processed.zip": lambda: get_folder_archive(os.fspath(PROCESSED_DIR)),
+        "report_en.pdf": lambda: build_report("en"),
+        "report_es.pdf": lambda: build_report("es"),
+    }
+    for name, produce in producers.items():
+        start = time.perf_counter()
+        payload = produce()
+        elapsed = time.perf_counter() - start
+        size = len(payload) if isinstance(payload, bytes) else os.path.getsize(payload)
+        results[name] = {"bytes": size, "seconds": elapsed}
+    return {"files": results, **_peak_memory_mb()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run one page headlessly and print its measurements as JSON.")
+    parser.add_argument("page", nargs="?", help="Page title, as in the sidebar menu")
+    parser.add_argument("--downloads", action="store_true", help="Measure the downloadable files instead of a page")
+    parser.add_argument("--runs", type=int, default=2, help="Script runs in the same session (the first one is cold)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args()
+    # Streamlit escribe avisos por la salida estándar; el JSON va en la última línea
+    result = measure_downloads() if args.downloads else run_page(args.page, runs=args.runs, timeout=args.timeout)
+    print(json.dumps(result))
@@ -0,0 +1,176 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import build_processed, generate
+from sections import PAGES
+from utils.paths import BASE_DIR, CACHE_DIR, DATA_DIR
+
+# Benchmark de todas las páginas: cada una en un proceso nuevo (arranque en frío), con los datos del repo o sintéticos
+# Los resultados se guardan en benchmarks/results/ (un JSON por ejecución) y se comparan con la ejecución anterior
+# de la misma escala para ver las regresiones entre commits
+RESULTS_DIR = BASE_DIR / "benchmarks" / "results"
+
+# Los datos sintéticos se guardan aquí y se reutilizan entre ejecuciones (generar 10M de filas tarda)
+SYNTHETIC_DIR = CACHE_DIR / "benchmarks"
+
+# Una medida que empeora más que esto respecto a la ejecución anterior se marca como regresión
+REGRESSION_THRESHOLD = 0.2
+
+# Medidas que se comparan entre ejecuciones (más es peor en todas)
+COMPARED = ["cold_seconds", "warm_seconds", "peak_rss_mb", "payload_bytes"]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _run_measurement(args, env, timeout):
+    # Lanza benchmarks.page_runner en un proceso nuevo y lee el JSON de la última línea
+    command = [sys.executable, "-m", "benchmarks.page_runner", *args]
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(command, cwd=BASE_DIR, env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout after {timeout:.0f} s"}
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else f"exit code {completed.returncode}"}
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    # Tiempo total del proceso, incluida la importación de Streamlit y de la app
+    result["process_seconds"] = wall
+    return result
+
+
+def prepare_data(rows):
+    # Carpeta de datos para la escala pedida (None = los datos del repo) y carpeta con el estado del ETL para esos datos
+    # El ETL se ejecuta aquí, fuera de las medidas (si los datos no han cambiado, solo comprueba que están al día);
+    # su estado se copia a la caché vacía de cada medida para que al arrancar la app no haya nada que procesar
+    etl_cache = SYNTHETIC_DIR / f"etl-{rows or 'repo'}"
+    if rows is None:
+        error = build_processed(DATA_DIR, etl_cache)
+        if error is not None:
+            print(f"utils.etl: {error}")
+        return None, etl_cache / "etl"
+    data_dir = SYNTHETIC_DIR / f"data-{rows}"
+    marker = data_dir / ".complete"
+    if not marker.exists():
+        print(f"Generating {rows:,} synthetic clients in {data_dir}...")
+        shutil.rmtree(data_dir, ignore_errors=True)
+        shutil.rmtree(etl_cache, ignore_errors=True)
+        generate(rows, data_dir, etl_cache)
+        marker.touch()
+    return data_dir, etl_cache / "etl"
+
+
+def run_benchmarks(rows=None, pages=None, runs=2, timeout=900, downloads=True):
+    data_dir, etl_state = prepare_data(rows)
+    results = {
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "rows": rows,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pages": {},
+    }
+    # Caché vacía en cada ejecución (salvo el estado del ETL): las medidas en frío incluyen construir los archivos de .cache
+    with tempfile.TemporaryDirectory(prefix="bench-cache-") as cache_dir:
+        if etl_state.exists():
+            shutil.copytree(etl_state, os.path.join(cache_dir, "etl"))
+        env = {**os.environ, "APP_CACHE_DIR": cache_dir, "PYTHONPATH": os.fspath(BASE_DIR)}
+        if data_dir is not None:
+            env["APP_DATA_DIR"] = os.fspath(data_dir)
+        for page in PAGES:
+            if pages and page["title"] not in pages:
+                continue
+            print(f"{page['title']}...", flush=True)
+            results["pages"][page["title"]] = _run_measurement([page["title"], "--runs", str(runs), "--timeout", str(timeout)], env, timeout * runs + 120)
+        if downloads:
+            print("Downloads...", flush=True)
+            results["downloads"] = _run_measurement(["--downloads"], env, timeout + 120)
+    return results
+
+
+def save_results(results):
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = results["timestamp"].replace(":", "").replace("-", "")[:15]
+    scale = results["rows"] or "repo"
+    path = RESULTS_DIR / f"{stamp}-{results['commit']}-{scale}.json"
+    path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return path
+
+
+def previous_results(results, current_path=None):
+    # Última ejecución guardada con la misma escala de datos
+    candidates = sorted(path for path in RESULTS_DIR.glob("*.json") if path != current_path)
+    for path in reversed(candidates):
+        previous = json.loads(path.read_text(encoding="utf-8"))
+        if previous.get("rows") == results["rows"]:
+            return previous
+    return None
+
+
+def compare(results, previous, threshold=REGRESSION_THRESHOLD):
+    # Tabla de texto con cada medida, su cambio respecto a la ejecución anterior y las regresiones
+    lines, regressions = [], []
+    for title, current in results["pages"].items():
+        if "error" in current:
+            lines.append(f"{title:<24} ERROR: {current['error']}")
+            continue
+        before = (previous or {}).get("pages", {}).get(title, {})
+        cells = []
+        for metric in COMPARED:
+            value = current.get(metric)
+            if value is None:
+                continue
+            cell = f"{metric}={value:,.2f}" if isinstance(value, float) else f"{metric}={value:,}"
+            old = before.get(metric)
+            if old:
+                change = (value - old) / old
+                cell += f" ({change:+.0%})"
+                if change > threshold:
+                    regressions.append(f"{title}: {metric} {old:,.2f} -> {value:,.2f} ({change:+.0%})")
+            cells.append(cell)
+        if current.get("exceptions"):
+            cells.append(f"EXCEPTIONS: {'; '.join(current['exceptions'])}")
+        lines.append(f"{title:<24} " + "  ".join(cells))
+    return lines, regressions
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.run                  todas las páginas con los datos del repo
+    # python -m benchmarks.run --rows 1000000   con 1M de clientes sintéticos (también --rows 10000000)
+    parser = argparse.ArgumentParser(description="Benchmark every page of the app headlessly.")
+    parser.add_argument("--rows", type=int, help="Use synthetic data with this many clients instead of data/")
+    parser.add_argument("--page", action="append", help="Only this page (can be repeated)")
+    parser.add_argument("--runs", type=int, default=2, help="Script runs per page (the first one is cold)")
+    parser.add_argument("--timeout", type=float, default=900, help="Seconds allowed for one script run")
+    parser.add_argument("--no-downloads", action="store_true", help="Skip measuring the downloadable files")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="Relative slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with code 1 if there is a regression")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.rows, args.page, args.runs, args.timeout, downloads=not args.no_downloads)
+    path = save_results(results)
+    previous = previous_results(results, path)
+    lines, regressions = compare(results, previous, args.threshold)
+    print("\n".join(lines))
+    if "downloads" in results and "files" in results["downloads"]:
+        for name, item in results["downloads"]["files"].items():
+            print(f"{name:<28} {item['bytes'] / 1024:,.0f} KB in {item['seconds']:.2f} s")
+    print(f"Results saved to {path}" + (f" (compared with commit {previous['commit']})" if previous else ""))
+    if regressions:
+        print("Regressions:\n" + "\n".join(regressions))
+        if args.fail_on_regression:
+            sys.exit(1)
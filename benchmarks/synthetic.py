@@ -0,0 +1,80 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from utils.datasets import DATASETS, EXACT_DTYPES, read_dataset
+from utils.paths import BASE_DIR, DATA_DIR
+
+# Datos sintéticos para los benchmarks: copias de los archivos raw con muchas más filas, con el mismo esquema
+# Cada fila es un cliente real remuestreado con un poco de ruido y un client_id nuevo
+# Se generan por bloques para que 10M de filas no necesiten tenerlo todo en memoria
+# data/processed no se escribe aquí sino con utils/etl.py, como en la app: así es lo que el ETL reconoce como suyo
+
+CHUNK_ROWS = 1_000_000
+
+
+def _sample_clients(base, n, rng, first_id):
+    rows = base.iloc[rng.integers(0, len(base), size=n)].reset_index(drop=True)
+    rows["client_id"] = np.arange(first_id, first_id + n, dtype="int64")
+    # Ruido pequeño en edad y saldo para que no haya filas idénticas (la antigüedad y los contadores se quedan igual)
+    rows["clnt_age"] = (rows["clnt_age"].astype("float64") + rng.normal(0, 1, size=n)).clip(17, 100).round(1)
+    rows["bal"] = (rows["bal"].astype("float64") * rng.lognormal(0, 0.05, size=n)).round(2)
+    return rows
+
+
+def build_processed(data_dir, cache_dir):
+    # Ejecuta utils/etl.py sobre data_dir con el estado del ETL en cache_dir/etl; None si todo va bien o el error
+    # En otro proceso: las rutas de utils/paths.py se fijan al importar
+    env = {**os.environ, "APP_DATA_DIR": os.fspath(data_dir), "APP_CACHE_DIR": os.fspath(cache_dir), "PYTHONPATH": os.fspath(BASE_DIR)}
+    completed = subprocess.run([sys.executable, "-m", "utils.etl"], cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else f"exit code {completed.returncode}"
+    return None
+
+
+def generate(rows, output_dir, cache_dir, seed=0, source_dir=DATA_DIR):
+    # Crea output_dir con la misma estructura que data/ (raw, processed, reports) y rows clientes
+    # df_final_demo y df_final_experiment_clients salen de los mismos clientes, con los valores en float64 (sin
+    # redondear); df_clients y df_networth los construye el ETL, que deja su estado en cache_dir
+    rng = np.random.default_rng(seed)
+    base = read_dataset(source_dir / "processed" / DATASETS["clients"].name, EXACT_DTYPES)
+    targets = {
+        "demo": output_dir / "raw" / DATASETS["demo"].name,
+        "experiment": output_dir / "raw" / DATASETS["experiment"].name,
+    }
+    for path in targets.values():
+        path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copytree(source_dir / "reports", output_dir / "reports", dirs_exist_ok=True)
+
+    written = 0
+    while written < rows:
+        n = min(CHUNK_ROWS, rows - written)
+        chunk = _sample_clients(base, n, rng, first_id=written + 1)
+        options = {"index": False, "mode": "w" if written == 0 else "a", "header": written == 0}
+        chunk.drop(columns="variation").to_csv(targets["demo"], **options)
+        chunk[["client_id", "variation"]].rename(columns={"variation": "Variation"}).to_csv(targets["experiment"], **options)
+        written += n
+    error = build_processed(output_dir, cache_dir)
+    if error is not None:
+        raise RuntimeError(f"utils.etl failed on {output_dir}: {error}")
+    targets.update({name: output_dir / "processed" / DATASETS[name].name for name in ("clients", "networth")})
+    return {name: path.stat().st_size for name, path in targets.items()}
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.synthetic --rows 1000000 --output .cache/benchmarks/data-1000000
+    parser = argparse.ArgumentParser(description="Generate a scaled copy of the project data.")
+    parser.add_argument("--rows", type=int, required=True, help="Number of clients")
+    parser.add_argument("--output", required=True, help="Folder to create (same layout as data/)")
+    parser.add_argument("--cache", help="Cache folder for the ETL state (default: <output>-cache); use it as APP_CACHE_DIR")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    output = Path(args.output)
+    sizes = generate(args.rows, output, Path(args.cache) if args.cache else output.with_name(f"{output.name}-cache"), seed=args.seed)
+    for name, size in sizes.items():
+        print(f"{name}: {size / 1024 ** 2:,.1f} MB")
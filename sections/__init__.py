@@ -0,0 +1,106 @@
+# Una página de la app por módulo; cada módulo tiene una función render() que pinta la página
+# Opcionalmente, on_leave() se llama cuando el usuario sale de la página (liberar trabajos, contadores...)
+# app.py solo importa el módulo de una página la primera vez que alguien la visita
+
+import importlib
+import sys
+import threading
+import time
+
+import streamlit as st
+
+from utils.probes import probe
+
+# Registro de páginas: título (el del menú), icono (Bootstrap Icons, para option_menu) y módulo de sections/
+# Para añadir una página: crea sections/<modulo>.py con una función render() y añade aquí su entrada
+PAGES = [
+    {"title": "Overview", "icon": "house-door-fill", "module": "overview"},
+    {"title": "Interactive Analysis", "icon": "bar-chart-line-fill", "module": "interactive_analysis"},
+    {"title": "Statistics", "icon": "percent", "module": "statistics"},
+    {"title": "ML/DP", "icon": "cpu-fill", "module": "ml"},
+    {"title": "Conclusions", "icon": "clipboard-data-fill", "module": "conclusions"},
+    {"title": "Downloads & Resources", "icon": "download", "module": "downloads"},
+    {"title": "Load & Quick EDA", "icon": "folder-fill", "module": "quick_eda"},
+    {"title": "Settings", "icon": "gear-fill", "module": "settings"},
+]
+
+PAGES_BY_TITLE = {page["title"]: page for page in PAGES}
+
+
+class PageTimings:
+    # Tiempos de todo el proceso (compartidos entre sesiones): importación y renders de cada página
+    # y duración de las ejecuciones completas del script
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = {}
+        self.runs = {"first": None, "last": None, "count": 0}
+
+    def _page(self, title):
+        return self.pages.setdefault(title, {"import": None, "first_render": None, "last_render": None, "renders": 0})
+
+    def record_import(self, title, seconds):
+        with self.lock:
+            self._page(title)["import"] = seconds
+
+    def record_render(self, title, seconds):
+        with self.lock:
+            page = self._page(title)
+            if page["first_render"] is None:
+                page["first_render"] = seconds
+            page["last_render"] = seconds
+            page["renders"] += 1
+
+    def record_run(self, seconds):
+        with self.lock:
+            if self.runs["first"] is None:
+                self.runs["first"] = seconds
+            self.runs["last"] = seconds
+            self.runs["count"] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {title: dict(values) for title, values in self.pages.items()}, dict(self.runs)
+
+
+@st.cache_resource(show_spinner=False)
+def get_timings():
+    return PageTimings()
+
+
+def _module_name(page):
+    return f"{__name__}.{page['module']}"
+
+
+def load_page(page):
+    # Importa el módulo de la página; la primera importación del proceso se mide
+    name = _module_name(page)
+    module = sys.modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        get_timings().record_import(page["title"], time.perf_counter() - start)
+    return module
+
+
+def render_page(title):
+    # Pinta la página con ese título; devuelve False si no está en el registro
+    page = PAGES_BY_TITLE.get(title)
+    if page is None:
+        return False
+    module = load_page(page)
+    start = time.perf_counter()
+    with probe(f"page.{title}"):
+        module.render()
+    get_timings().record_render(title, time.perf_counter() - start)
+    return True
+
+
+def leave_page(title):
+    # Llama a on_leave() de la página que se abandona, solo si su módulo ya está importado
+    page = PAGES_BY_TITLE.get(title)
+    if page is None:
+        return
+    module = sys.modules.get(_module_name(page))
+    on_leave = getattr(module, "on_leave", None)
+    if on_leave is not None:
+        on_leave()
@@ -0,0 +1,80 @@
+# Página "Conclusions": resumen de resultados y recomendación final
+
+import time
+
+import altair as alt
+import streamlit as st
+
+from utils.cube import BUCKETS, DIMENSIONS, MIN_SEGMENT_SIZE, cube_measures, dataset_cube, segment_lift, slice_cube
+from utils.probes import probed
+from utils.texts import CONCLUSIONS
+
+
+def render():
+    st.title("🔍 Conclusions")
+
+    # Mete este apartado dentro de un expander para que no resulte abrumador a primera vista, cambiar el texto según el proyecto / Wrap in an expander so it's not overwhelming at first glance
+    # Ahora mismo hay unos subapartados sugeridos, pero se puede escribir o incluir lo que quiera el usuario
+    # El texto está en utils/texts.py (en inglés y español) y es el mismo que sale en los informes PDF (ver utils/reports.py)
+    with st.expander("Show Summary of Findings", expanded=False):
+        conclusions = CONCLUSIONS["en"]
+        st.markdown(conclusions["intro"])
+        for heading, body in conclusions["sections"]:
+            st.markdown(f"### {heading}")
+            st.markdown(body)
+
+    # Efecto del Test por segmento de clientes, calculado sobre un cubo de agregados (ver utils/cube.py)
+    # El cubo se construye una vez por versión de los datos; cada corte solo suma celdas del cubo
+    st.markdown("### 🎯 Where did the Test help?")
+    segment_explorer()
+
+
+@st.fragment
+@probed("conclusions.segment_explorer")
+def segment_explorer():
+    # Fragmento: cambiar filtros o desglose solo vuelve a pintar este bloque
+    cube = dataset_cube("clients")
+    col_measure, col_by, col_alpha = st.columns([2, 2, 1])
+    with col_measure:
+        measure = st.selectbox("Metric", cube_measures(cube), key="segment_measure")
+    with col_by:
+        by = st.multiselect("Break down by", DIMENSIONS, default=["age"], max_selections=2, key="segment_by")
+    with col_alpha:
+        alpha = st.selectbox("Alpha", [0.05, 0.01, 0.10], key="segment_alpha")
+
+    filters = {}
+    filter_cols = st.columns(len(DIMENSIONS))
+    for col, dimension in zip(filter_cols, DIMENSIONS):
+        options = BUCKETS[dimension][2] if dimension in BUCKETS else sorted(cube[dimension].unique())
+        with col:
+            filters[dimension] = st.multiselect(f"Filter {dimension}", options, key=f"segment_filter_{dimension}")
+
+    start = time.perf_counter()
+    lift = segment_lift(slice_cube(cube, filters, by), measure, alpha=alpha)
+    elapsed = time.perf_counter() - start
+    if lift.empty:
+        st.info("No segment has enough clients in both groups with these filters.")
+        return
+
+    chart_data = lift.reset_index()
+    index_cols = list(lift.index.names)
+    chart_data["segment"] = chart_data[index_cols].astype(str).agg(" · ".join, axis=1)
+    base = alt.Chart(chart_data).encode(y=alt.Y("segment:N", sort=None, title=None))
+    st.altair_chart(
+        base.mark_rule().encode(x=alt.X("ci_low:Q", title=f"Test − Control ({measure})"), x2="ci_high:Q")
+        + base.mark_point(filled=True, size=80).encode(
+            x="diff:Q",
+            color=alt.Color("significant:N", scale=alt.Scale(domain=[True, False], range=["#0d6efd", "#adb5bd"])),
+            tooltip=["segment", "n_Control", "n_Test", alt.Tooltip("diff:Q", format=".3f"), alt.Tooltip("q_value:Q", format=".4f")],
+        )
+        + alt.Chart().mark_rule(strokeDash=[4, 4]).encode(x=alt.datum(0)),
+        width="stretch",
+    )
+    st.dataframe(
+        lift.style.format({"rel_diff": "{:.2%}", "p_value": "{:.4f}", "q_value": "{:.4f}"}, precision=3),
+        width="stretch",
+    )
+    st.caption(
+        f"Difference in means with {1 - alpha:.0%} Welch confidence intervals; q-values are Benjamini-Hochberg adjusted across segments. "
+        f"Segments with fewer than {MIN_SEGMENT_SIZE} clients in a group are hidden. Answered from the cube in {elapsed * 1000:.0f} ms."
+    )
@@ -0,0 +1,208 @@
+# Página "Downloads & Resources": resúmenes ejecutivos y datos para descargar
+
+import os
+
+import streamlit as st
+
+from utils.archives import get_folder_archive
+from utils.documents import extraction_progress, failed_reports, load_index, start_extraction, thumbnail_path
+from utils.datasets import DATASETS
+from utils.downloads import SUMMARY_REFRESH_SECONDS, file_download_button, lazy_download_button, reset_visit_counter, visit_bytes_summary
+from utils.exports import EXPORT_FORMATS, build_export, column_summary, count_matching
+from utils.paths import PROCESSED_DIR, RAW_DIR, REPORTS_DIR
+from utils.probes import probe, probed
+
+
+def _generated_report(lang_code):
+    # Se importa aquí para que abrir la página no cargue matplotlib ni fpdf2 hasta que alguien pide el informe
+    from utils.reports import build_report
+
+    with probe("reports.build"):
+        return build_report(lang_code)
+
+
+def on_leave():
+    # Cada visita a la página cuenta los bytes descargados desde cero
+    reset_visit_counter()
+
+
+def render():
+    # Este apartado es para quien no haya asistido o quiera más información, se pueda descargar un resumen y todos los datos limpios y procesados
+    # En este caso, el código está preparado para descargar lo que hay a modo de ejemplo dentro de la carpeta de data, la subcarpeta de reports (hay 2 pdfs) y las subcarpetas de raw y processed (con df a modo de ejemplo)
+    # Hay que ir las subcarpetas de reports, processed y raw, cambiar esos archivos por los nuevos (en los reports manenter el mismo nombre, en los de data processed/raw adatpar el código al nuevo nombre)
+    # Ahora mismo hay dos pdf, 3 archivos en processed y 4 en raw, son de otro proyecto a modo de ejemplo, pero habría que reemplzarlo todo
+
+    st.title("📂 Downloads & Resources")
+
+    # 1️⃣ Executive Summary Reports
+    st.markdown("### 📄 Executive Summary Reports")
+    st.markdown(
+        """
+        For those who couldn't attend the live presentation—or anyone who wants a quick, formal
+        overview—please select your preferred language and download the concise executive summary.
+        """
+    )
+
+    # Language selector
+    lang = st.selectbox("Choose report language", ["English", "Español"])
+
+    # Base path para los reports
+    report_base = REPORTS_DIR
+
+    # Los PDF no se leen hasta que se hace clic en el botón (ver utils/downloads.py)
+    if lang == "English":
+        file_download_button(
+            label="📥 Download Executive Summary (English)",
+            path=os.path.join(report_base, "Executive_Summary_EN.pdf"),
+            file_name="Vanguard_Digital_Redesign_Summary_EN.pdf",
+            mime="application/pdf",
+        )
+    else:
+        file_download_button(
+            label="📥 Descargar Resumen Ejecutivo (Español)",
+            path=os.path.join(report_base, "Executive_Summary_ES.pdf"),
+            file_name="Vanguard_Digital_Redesign_Resumen_ES.pdf",
+            mime="application/pdf",
+        )
+
+    # Informe generado con los datos y textos actuales (ver utils/reports.py): se construye al hacer clic
+    # y solo se vuelve a generar el PDF si ha cambiado su contenido
+    lang_code = "en" if lang == "English" else "es"
+    lazy_download_button(
+        label="🛠️ Download report generated from the current data" if lang_code == "en" else "🛠️ Descargar informe generado con los datos actuales",
+        produce=lambda: _generated_report(lang_code),
+        file_name=f"Vanguard_Digital_Redesign_Latest_{lang_code.upper()}.pdf",
+        mime="application/pdf",
+    )
+
+    # Búsqueda en el texto de los informes: cada PDF nuevo o modificado se extrae página a página en segundo plano
+    # (una vez por versión del archivo) y se busca en un índice guardado en disco, ver utils/documents.py
+    start_extraction()
+    extracting = extraction_progress() is not None
+
+    # Solo este bloque se refresca cada segundo mientras se extraen los PDF
+    @st.fragment(run_every=1 if extracting else None)
+    @probed("downloads.report_search")
+    def report_search():
+        st.markdown("#### 🔎 Search the reports")
+        progress = extraction_progress()
+        if progress is not None:
+            st.progress(progress, text=f"Indexing the reports in the background... {progress:.0%}")
+        elif extracting:
+            # Ha terminado: una última ejecución completa para dejar de refrescar
+            st.rerun()
+        for failure in failed_reports():
+            st.warning(f"{failure['file']} could not be indexed ({failure['error']}), so it is left out of the search.")
+        index = load_index()
+        query = st.text_input("Search", placeholder="e.g. completion rate, errores", key="report_query", label_visibility="collapsed")
+        if index is None or not query:
+            return
+        hits = index.search(query)
+        if not hits:
+            st.info("No page contains all the words of the search.")
+            return
+        for hit in hits:
+            thumb_col, text_col = st.columns([1, 5])
+            with thumb_col:
+                st.image(str(thumbnail_path(hit["digest"], hit["page"])))
+            with text_col:
+                st.markdown(f"**{hit['file']}** · page {hit['page']}")
+                st.markdown(index.snippet(hit["digest"], hit["page"], query))
+                tables = index.page(hit["digest"], hit["page"])["tables"]
+                if tables:
+                    with st.expander(f"Tables on this page ({len(tables)})"):
+                        for table in tables:
+                            st.dataframe(table, width="stretch")
+
+    report_search()
+
+    st.markdown("---")
+
+    # 2️⃣ Data Downloads
+    st.markdown("### 🗄️ Data Downloads")
+    st.markdown(
+        """
+        You can download the raw and processed datasets used in our analysis.  
+        - **Raw**: Original exported tables, before any cleaning.  
+        - **Processed**: Final cleaned and joined tables ready for analysis.
+        """
+    )
+
+    # Los ZIP se generan al hacer clic, una sola vez por versión de los datos, y se comparten entre todas las sesiones
+    # (ver utils/archives.py, ahí se puede activar que se guarden en disco)
+    # Raw data
+    lazy_download_button(
+        label="📥 Download Raw Data (ZIP)",
+        produce=lambda: get_folder_archive(os.fspath(RAW_DIR)),
+        file_name="vanguard_raw_data.zip",
+        mime="application/zip",
+    )
+
+    # Processed data
+    lazy_download_button(
+        label="📥 Download Processed Data (ZIP)",
+        produce=lambda: get_folder_archive(os.fspath(PROCESSED_DIR)),
+        file_name="vanguard_processed_data.zip",
+        mime="application/zip",
+    )
+
+    # Exportación a medida: columnas, filtros y formato; el filtro se evalúa sobre la copia columnar y el archivo
+    # se escribe por bloques al hacer clic (ver utils/exports.py). Solo este bloque se vuelve a ejecutar al cambiar los controles
+    @st.fragment
+    @probed("downloads.export_builder")
+    def export_builder():
+        st.markdown("#### 🧮 Custom export")
+        st.caption("Pick a dataset, the columns and the filters: only the matching rows are written, in the format you choose.")
+        col_dataset, col_format = st.columns(2)
+        with col_dataset:
+            export_dataset = st.selectbox("Dataset", list(DATASETS), key="export_dataset")
+        with col_format:
+            export_format = st.selectbox("Format", list(EXPORT_FORMATS), key="export_format")
+        summary = column_summary(export_dataset)
+        export_columns = st.multiselect("Columns", list(summary), default=list(summary), key=f"export_columns_{export_dataset}")
+        filter_columns = st.multiselect(
+            "Filter by", [column for column, info in summary.items() if info["kind"] != "other"], key=f"export_filters_{export_dataset}"
+        )
+        filters = []
+        for column in filter_columns:
+            info = summary[column]
+            if info["kind"] == "category":
+                values = st.multiselect(column, info["values"], default=info["values"], key=f"export_{export_dataset}_{column}")
+                filters.append((column, "in", tuple(values)))
+            else:
+                col_low, col_high = st.columns(2)
+                with col_low:
+                    low = st.number_input(f"{column} from", value=float(info["min"]), key=f"export_{export_dataset}_{column}_low")
+                with col_high:
+                    high = st.number_input(f"{column} to", value=float(info["max"]), key=f"export_{export_dataset}_{column}_high")
+                filters += [(column, ">=", low), (column, "<=", high)]
+        if not export_columns:
+            st.info("Choose at least one column to export.")
+            return
+        matching = count_matching(export_dataset, filters)
+        st.caption(f"{matching:,} rows match these filters.")
+        spec = EXPORT_FORMATS[export_format]
+        lazy_download_button(
+            label=f"📥 Download {matching:,} rows ({export_format})",
+            produce=lambda: build_export(export_dataset, export_columns, filters, export_format),
+            file_name=f"{export_dataset}_export{spec['extension']}",
+            mime=spec["mime"],
+            disabled=matching == 0,
+        )
+
+    export_builder()
+
+    st.markdown( # Cambiar este apartado y poner, si se quiere, el nombre de la nueva empresa en vez del nombre que viene por defecto que es X
+        """
+        ---
+        *These datasets are provided under internal X use—please do not redistribute.*
+        """
+    )
+
+    # Bytes que se han servido desde que se abrió esta página; las descargas se sirven después de la ejecución
+    # de la página (al hacer clic, sin rerun), así que este bloque se refresca solo para incluirlas
+    @st.fragment(run_every=SUMMARY_REFRESH_SECONDS)
+    def visit_bytes():
+        st.caption(visit_bytes_summary())
+
+    visit_bytes()
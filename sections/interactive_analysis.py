@@ -0,0 +1,153 @@
+# Página "Interactive Analysis": dashboards de demografía y KPIs
+# En este apartado tenemos unos gráficos interactivos importados desde Tableau a modo de ejemplo, pero se pueden importar gráficos y tablas creadas con pyton, con Power BI, etc.
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from utils.assets import robot_widget_html
+from utils.dashboards import demographics_dashboard, missing_events_notice, rate_dashboard, time_dashboard
+from utils.funnel import load_funnel_results
+from utils.probes import probe, probed
+from utils.texts import HYPOTHESES
+
+
+def render():
+    st.title("Interactive Analysis")
+
+    # Por defecto los dashboards se calculan en local con los datos de data/ (ver utils/dashboards.py), sin conexión a internet
+    # Activando este interruptor se muestran los dashboards de Tableau Public en iframes
+    use_tableau = st.toggle("Show Tableau Public dashboards (requires internet)", value=False)
+
+    # Si están los archivos de eventos web en data/raw, los KPIs se calculan con los datos actuales (ver utils/funnel.py)
+    funnel_results = load_funnel_results()
+
+    # Pestañas principales: Demographics vs KPIs
+    demo_tab, kpi_tab = st.tabs(["📊 Demographics", "📈 KPIs"])
+
+    # Demographics: un único dashboard con tus 4 visualizaciones
+    with demo_tab, probe("interactive.demographics"):
+        st.subheader("Demographics Overview")
+        if use_tableau:
+            components.iframe(
+                "https://public.tableau.com/views/Clients_17485213608790/Dashboard1"
+                "?:language=es-ES&publish=yes&:showVizHome=no&:embed=y",
+                height=700,
+                scrolling=True,
+            )
+        else:
+            demographics_dashboard("clients")
+
+    # KPIs: sub-pestañas para cada uno de los 4 dashboards
+    with kpi_tab, probe("interactive.kpis"):
+        st.subheader("Key Performance Indicators")
+        kpi_subtabs = kpi_tab.tabs([
+            "Completion Rate",
+            "First-Time Completion",
+            "Time Invested",
+            "Error Rate"
+        ])
+
+        # 1️⃣ Completion Rate
+        with kpi_subtabs[0]:
+            st.markdown("#### Completion Rate")
+            if use_tableau:
+                components.iframe(
+                    "https://public.tableau.com/views/Insights_17485215898210/CompletionRate"
+                    "?:language=es-ES&publish=yes&:showVizHome=no&:embed=y",
+                    height=650,
+                    scrolling=True,
+                )
+            elif funnel_results is not None:
+                rate_dashboard(funnel_results, "completion_rate", "Completion rate")
+            else:
+                missing_events_notice()
+
+            # Robot: Completion Rate
+            # El HTML del robot está en utils/assets.py y usa el reproductor Lottie de static/vendor si se ha descargado
+            # (python -m utils.assets --vendor); si no, unpkg y lottie.host, o un robot estático con APP_VENDOR_CDN=0
+            # Los textos de las hipótesis están en utils/texts.py (en inglés y español), los mismos que salen en los informes PDF
+            components.html(robot_widget_html("Click to see the hypothesis results"), height=180)
+            hypothesis_results(
+                "hypo1",
+                HYPOTHESES["completion_rate"],
+                funnel_results["proportions"].loc[["completion_rate"]] if funnel_results is not None else None,
+            )
+
+        # 2️⃣ Completion Rate at the First Time
+        with kpi_subtabs[1]:
+            st.markdown("#### Completion Rate at the First Time")
+            if use_tableau:
+                components.iframe(
+                    "https://public.tableau.com/views/Completion_17485219424030/Firsttime"
+                    "?:language=es-ES&publish=yes&:showVizHome=no&:embed=y",
+                    height=650,
+                    scrolling=True,
+                )
+            elif funnel_results is not None:
+                rate_dashboard(funnel_results, "first_attempt_rate", "First-attempt completion")
+            else:
+                missing_events_notice()
+
+            # Robot: First Attempt Success
+            components.html(robot_widget_html("Click to see first attempt success results"), height=180)
+            hypothesis_results(
+                "hypo2",
+                HYPOTHESES["first_attempt_rate"],
+                funnel_results["proportions"].loc[["first_attempt_rate"]] if funnel_results is not None else None,
+            )
+
+        # 3️⃣ Time Invested
+        with kpi_subtabs[2]:
+            st.markdown("#### Time Invested")
+            if use_tableau:
+                components.iframe(
+                    "https://public.tableau.com/views/Timeinvested/Timeinvested"
+                    "?:language=es-ES&publish=yes&:showVizHome=no&:embed=y",
+                    height=650,
+                    scrolling=True,
+                )
+            elif funnel_results is not None:
+                time_dashboard(funnel_results)
+            else:
+                missing_events_notice()
+
+            # Robot: UX Insights
+            components.html(robot_widget_html("Click to see UX performance insights"), height=180)
+            hypothesis_results(
+                "hypo3",
+                HYPOTHESES["step_times"],
+                funnel_results["step_tests"] if funnel_results is not None else None,
+            )
+
+        # 4️⃣ Error Rate
+        with kpi_subtabs[3]:
+            st.markdown("#### Error Rate")
+            if use_tableau:
+                components.iframe(
+                    "https://public.tableau.com/views/Errorrate_17485220756100/ErrorRate"
+                    "?:language=es-ES&publish=yes&:showVizHome=no&:embed=y",
+                    height=650,
+                    scrolling=True,
+                )
+            elif funnel_results is not None:
+                rate_dashboard(funnel_results, "error_rate", "Error rate (backward steps)")
+            else:
+                missing_events_notice()
+
+            # Robot: Error Rate
+            components.html(robot_widget_html("Click to see error rate results"), height=180)
+            hypothesis_results(
+                "hypo4",
+                HYPOTHESES["error_rate"],
+                funnel_results["proportions"].loc[["error_rate"]] if funnel_results is not None else None,
+            )
+
+
+@st.fragment
+@probed("interactive.hypothesis_results")
+def hypothesis_results(key, text, table=None):
+    # Fragmento: al pulsar el botón solo se vuelve a ejecutar este bloque, no los dashboards, iframes ni el menú
+    if st.button("Show hypothesis results", key=key):
+        st.markdown(text)
+        if table is not None:
+            st.dataframe(table, width="stretch")
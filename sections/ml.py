@@ -0,0 +1,86 @@
+# Página "ML/DP": modelos de machine learning
+# Si solo hay ML, quitar del título DP
+
+import streamlit as st
+
+from utils.charts import histogram_chart, histogram_table
+from utils.datasets import dataset_version
+from utils.models import MODELS, TARGETS, TrainingJob, available_targets, model_key, poll_training, score_clients, start_training, training_data
+from utils.probes import probed
+
+
+def render():
+    st.title("ML / Deep Learning")
+
+    # Modelos que predicen un resultado por cliente a partir de df_clients (ver utils/models.py)
+    # El entrenamiento va en un proceso aparte; cada modelo se guarda en disco con una clave que incluye el hash
+    # de los datos y los hiperparámetros, así que volver a la página (o reiniciar la app) no vuelve a entrenar
+    st.markdown("Train a classifier on the client features (tenure, age, accounts, balance, calls, logons, gender and variation).")
+
+    col_target, col_model = st.columns(2)
+    with col_target:
+        target = st.selectbox("Outcome", available_targets(), format_func=lambda name: TARGETS[name]["label"])
+    with col_model:
+        model = st.selectbox("Model", list(MODELS), format_func=lambda name: MODELS[name]["label"])
+
+    options = MODELS[model]["params"]
+    param_cols = st.columns(len(options))
+    params = {}
+    for col, (param, values) in zip(param_cols, options.items()):
+        with col:
+            params[param] = st.select_slider(param, options=sorted(values), value=values[0], key=f"ml_{model}_{param}")
+
+    X, y, data_digest = training_data("clients", target)
+    key = model_key(data_digest, target, model, params)
+    if TARGETS[target]["drop"]:
+        st.caption(f"Not used as features (they define the outcome): {', '.join(TARGETS[target]['drop'])}.")
+
+    if st.button("Train model"):
+        start_training(key, X, y, target, model, params)
+
+    state = poll_training(key)
+    training = isinstance(state, TrainingJob) and state.error is None
+
+    # Solo este bloque se refresca cada segundo mientras se entrena
+    @st.fragment(run_every=1 if training else None)
+    @probed("ml.model_results")
+    def model_results():
+        fitted = poll_training(key)
+        if fitted is None:
+            st.info("This model has not been trained with these settings yet. Click the button to train it.")
+            return
+        if isinstance(fitted, TrainingJob) and fitted.error is not None:
+            if training:
+                # Ha fallado: una última ejecución completa para dejar de refrescar
+                st.rerun()
+            st.error(f"Training failed ({type(fitted.error).__name__}: {fitted.error}). Click the button to train it again.")
+            return
+        if isinstance(fitted, TrainingJob):
+            st.info("Training in a background process...")
+            return
+        if training:
+            # Ha terminado: una última ejecución completa para dejar de refrescar
+            st.rerun()
+
+        metrics = fitted["metrics"]
+        cols = st.columns(4)
+        cols[0].metric("ROC AUC", f"{metrics['roc_auc']:.3f}")
+        cols[1].metric("Accuracy", f"{metrics['accuracy']:.1%}", help=f"Base rate: {metrics['base_rate']:.1%}")
+        cols[2].metric("F1", f"{metrics['f1']:.3f}")
+        cols[3].metric("Training time", f"{metrics['fit_seconds']:.1f} s")
+        st.caption(f"Measured on {metrics['n_test']:,} held-out clients (trained on {metrics['n_train']:,}). Model key: {key}")
+
+        scores, elapsed = score_clients(key, "clients", dataset_version("clients"))
+        left, right = st.columns(2)
+        with left:
+            st.markdown("**Predicted probability by variation**")
+            st.altair_chart(histogram_chart(histogram_table(scores, "score", "variation", bins=30), "score", "variation"), width="stretch")
+        with right:
+            if fitted["importances"] is not None:
+                st.markdown("**Feature weights**")
+                st.bar_chart(fitted["importances"].head(10), horizontal=True)
+        st.markdown("**Clients with the highest predicted probability**")
+        st.dataframe(scores.nlargest(20, "score"), hide_index=True, width="stretch")
+        st.caption(f"All {len(scores):,} clients scored in {elapsed * 1000:.0f} ms.")
+
+    model_results()
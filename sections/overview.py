@@ -0,0 +1,159 @@
+# Página "Overview": presentación del equipo, fuentes de datos y objetivo del proyecto
+
+import datetime
+
+import pandas as pd
+import pydeck as pdk
+import streamlit as st
+
+from utils.probes import probed
+
+
+def render():
+    # Título fijo arriba
+    st.title("Overview")
+
+    # Inicializamos el slide actual y lo ponemos en la primera slide (0) por defecto
+    if "ov_page" not in st.session_state:
+        st.session_state.ov_page = 0
+
+    # Las slides son un fragmento: al pulsar ← / → solo se vuelve a ejecutar esta parte, no toda la app
+    slides()
+
+
+def _previous_slide():
+    st.session_state.ov_page -= 1
+
+
+def _next_slide():
+    st.session_state.ov_page += 1
+
+
+@st.fragment
+@probed("overview.slides")
+def slides():
+    # Botones de navegación
+    nav_col1, _, nav_col3 = st.columns([1, 6, 1])
+    with nav_col1:
+        st.button("←", disabled=(st.session_state.ov_page == 0), on_click=_previous_slide)
+    with nav_col3:
+        st.button("→", disabled=(st.session_state.ov_page == 2), on_click=_next_slide)
+
+    # SLIDE 0: Who Are We?
+    if st.session_state.ov_page == 0:
+        st.subheader("🧑‍💼 Who Are We?") # O: "🧑‍💼 Who Am I?" si el proyecto es de una persona solo, a modo de ejemplo están marcadas las ciudades de los dos autores, pero se puede poner la ubicación de la empresa, o lo que cada uno crea conveniente
+        df = pd.DataFrame([
+            {
+            "city": "Barcelona", "lat": 41.3851, "lon": 2.1734,
+            },
+            {
+            "city": "Madrid",    "lat": 40.4168, "lon": -3.7038,
+            }
+        ])
+
+        # Usamos un ScatterplotLayer con puntas rojas tipo chincheta
+        layer = pdk.Layer(
+            "ScatterplotLayer",
+            data=df,
+            get_position=["lon", "lat"],
+            get_fill_color=[255, 0, 0, 200],  # rojo
+            get_radius=20000
+        )
+
+        deck = pdk.Deck(
+            map_style="mapbox://styles/mapbox/light-v9",
+            initial_view_state=pdk.ViewState(
+                latitude=41.0, longitude=0.0, zoom=4.5, pitch=0
+            ),
+            layers=[layer]
+        )
+        st.pydeck_chart(deck, width="stretch")
+
+        # Enlaces con badges tipo shields.io (están a modo de ejemplo los dos badges de los autores, modificarlo al gusto de cada uno)
+        st.markdown("**Connect with us on GitHub:**")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(
+                """
+                [![Rocío Jiménez](https://img.shields.io/badge/@JimenezRoDA-GitHub-181717?logo=github&style=flat-square)](https://github.com/JimenezRoDA)
+                """,
+                unsafe_allow_html=True
+            )
+            st.markdown(
+                """
+                [![Xavi Fernández](https://img.shields.io/badge/@xavistem-GitHub-181717?logo=github&style=flat-square)](https://github.com/xavistem)
+                """,
+                unsafe_allow_html=True
+            )
+
+
+    # SLIDE 1: Data Sources & Timeline
+    elif st.session_state.ov_page == 1:
+        st.subheader("📑 Data Sources & Project Timeline")
+        left, right = st.columns(2)
+        with left: # Modificar el apartado siguiente, con los df utilizados en tu proyecto
+            st.markdown("""
+**Data Sources Used**  
+- `df_1`  
+- `df_2`  
+- `df_3`  
+- `df_4`  
+""")
+        with right: #M Modificar este apartado poniendo un calendario solo y marcando el inico y el final, o poner dos, eso ya depende de cada proyecto
+            st.markdown("**Project Active Dates**")
+            col_a, col_b = st.columns(2)
+            with col_a:
+                # Phase 1 calendar siempre visible
+                st.date_input(
+                    "Phase 1: May 19–23, 2025",
+                    value=(datetime.date(2025,5,19), datetime.date(2025,5,23)),
+                    min_value=datetime.date(2025,5,1),
+                    max_value=datetime.date(2025,5,31),
+                    key="phase1",
+                    label_visibility="collapsed"
+                )
+            with col_b:
+                # Phase 2 calendar siempre visible
+                st.date_input(
+                    "Phase 2: May 26–30, 2025",
+                    value=(datetime.date(2025,5,26), datetime.date(2025,5,30)),
+                    min_value=datetime.date(2025,5,1),
+                    max_value=datetime.date(2025,5,31),
+                    key="phase2",
+                    label_visibility="collapsed"
+                )
+
+    # SLIDE 2: Texto e imagen
+    else: # Modificar el texto según el proyecto, dejar (si se quiere) la parte final de "👉 Join us in this analysis"
+        left_col, right_col = st.columns([2, 1])
+        with left_col:
+            st.markdown("""
+    ### 🎯 Title of the objective of the project
+
+    Definition of the company or the project  
+    The goal is clear:
+
+    Othe things:
+    - X 
+    - X
+
+    ---
+
+    #### 📊 Key Metrics Analyzed:
+    - X
+    - X
+
+    #### 🎯 Success Criterion:
+    > **Increase the completion rate by at least 5%.**
+
+    ---
+
+    On this page, we will explore the experiment data, analyze key metrics, identify behavioral patterns, and answer a fundamental question:
+
+    > 🧠 *Firs part of the question  
+    > Second part of the question?*
+
+    👉 Join us in this analysis to discover X.
+            """)
+        with right_col: # Aquí puedes incluir una imagen que pongas en la carpeta de assets y titules image1
+            st.image("assets/image1.png", width="stretch")
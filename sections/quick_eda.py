@@ -0,0 +1,120 @@
+# Página "Load & Quick EDA": vista rápida de los datasets y perfil de archivos subidos
+
+import pandas as pd
+import streamlit as st
+
+from utils.charts import dataset_grid, dataset_histogram, dataset_quantiles, grid_chart, histogram_chart, quantile_chart
+from utils.datasets import DATASETS, dataset_memory, load_dataset
+from utils.downloads import format_bytes
+from utils.profiler import profile_file, server_files
+from utils.validation import validate_dataset
+
+
+def render():
+    st.title("Load & Quick EDA")
+
+    # Vista rápida de los datasets del proyecto (se cargan una sola vez y se comparten entre sesiones, ver utils/datasets.py)
+    st.markdown("### 🗃️ Project Datasets")
+    dataset_name = st.selectbox("Choose a dataset", list(DATASETS))
+    df_preview = load_dataset(dataset_name)
+    col_rows, col_cols, col_mem = st.columns(3)
+    col_rows.metric("Rows", f"{len(df_preview):,}")
+    col_cols.metric("Columns", df_preview.shape[1])
+    col_mem.metric("Memory", format_bytes(dataset_memory(df_preview)))
+    st.dataframe(df_preview.head(100), width="stretch")
+
+    # Calidad de los datos: reglas de utils/validation.py, comprobadas una vez por versión del archivo
+    validation = validate_dataset(dataset_name)
+    if validation is not None:
+        results = validation["results"]
+        errors, warnings = (results["status"] == "error").sum(), (results["status"] == "warning").sum()
+        if errors:
+            st.error(f"Data quality: {errors} rule(s) fail and {warnings} warning(s). Check the file before trusting the results.")
+        elif warnings:
+            st.warning(f"Data quality: all rules pass, with {warnings} warning(s) to review.")
+        else:
+            st.success(f"Data quality: all {len(results)} rules pass.")
+        with st.expander("Data quality checks", expanded=bool(errors)):
+            # Primero los errores, después los avisos
+            order = {"error": 0, "warning": 1, "ok": 2}
+            icons = {"error": "❌", "warning": "⚠️", "ok": "✅"}
+            checks = results.sort_values("status", key=lambda status: status.map(order), kind="stable")
+            st.dataframe(checks.assign(status=checks["status"].map(icons)), hide_index=True, width="stretch")
+
+    # Gráficos rápidos del dataset: los datos se agregan en pandas antes de enviarlos al navegador (ver utils/charts.py)
+    # así el tamaño del gráfico no depende del número de filas
+    numeric_columns = [c for c in df_preview.select_dtypes("number").columns if c != "client_id"]
+    group_col = "variation" if "variation" in df_preview.columns else None
+    if numeric_columns:
+        st.markdown("#### Quick Charts")
+        chart_col, chart_clip = st.columns([3, 1])
+        with chart_col:
+            chart_metric = st.selectbox("Column", numeric_columns, index=numeric_columns.index("bal") if "bal" in numeric_columns else 0)
+        with chart_clip:
+            clip_outliers = st.toggle("Hide top/bottom 1%", value=True)
+        clip_quantile = 0.99 if clip_outliers else 1.0
+
+        hist_col, summary_col = st.columns(2)
+        with hist_col:
+            hist_table = dataset_histogram(dataset_name, chart_metric, group_col, clip_quantile=clip_quantile)
+            st.altair_chart(histogram_chart(hist_table, chart_metric, group_col), width="stretch")
+        with summary_col:
+            if group_col is not None:
+                st.altair_chart(quantile_chart(dataset_quantiles(dataset_name, chart_metric), chart_metric), width="stretch")
+            if {"clnt_age", "bal"} <= set(numeric_columns):
+                st.altair_chart(grid_chart(dataset_grid(dataset_name, "clnt_age", "bal"), "clnt_age", "bal"), width="stretch")
+
+    st.markdown("---")
+
+    # Perfil de un archivo: se lee por bloques y la tabla se actualiza con cada bloque (ver utils/profiler.py)
+    # Streamlit guarda los archivos subidos enteros en la memoria del servidor, así que la subida tiene un límite
+    # (.streamlit/config.toml); los archivos más grandes se copian en data/uploads y se leen del disco por bloques,
+    # con memoria constante sea cual sea su tamaño
+    st.markdown("### 📤 Upload & Profile")
+    st.caption("Counts, nulls, min/max, mean/std, approximate distinct counts (HyperLogLog) and quantiles (KLL), computed chunk by chunk.")
+    upload_limit = st.get_option("server.maxUploadSize")
+    col_source, col_sep = st.columns([4, 1])
+    with col_source:
+        source = st.radio(
+            "Source", [f"Upload (up to {upload_limit} MB)", "File on the server (data/uploads)"],
+            horizontal=True, label_visibility="collapsed",
+        )
+    with col_sep:
+        separators = {"Comma (,)": ",", "Semicolon (;)": ";", "Tab": "\t", "Pipe (|)": "|"}
+        sep_label = st.selectbox("Separator", list(separators))
+
+    profile_source, profile_key = None, None
+    if source.startswith("Upload"):
+        uploaded_file = st.file_uploader("Upload a CSV or TXT file", type=["csv", "txt"])
+        st.caption("Larger files: copy them to `data/uploads` on the server and choose \"File on the server\".")
+        if uploaded_file is not None:
+            uploaded_file.seek(0)
+            profile_source, profile_key = uploaded_file, (uploaded_file.file_id, sep_label)
+    else:
+        files = server_files()
+        if not files:
+            st.info("No CSV or TXT files in `data/uploads`.")
+        else:
+            server_path = st.selectbox("File", files, format_func=lambda path: f"{path.name} ({format_bytes(path.stat().st_size)})")
+            stat = server_path.stat()
+            profile_source, profile_key = server_path, (str(server_path), stat.st_mtime_ns, stat.st_size, sep_label)
+
+    if profile_source is not None:
+        saved_profile = st.session_state.get("eda_profile")
+        if saved_profile is not None and saved_profile[0] == profile_key:
+            # Ya perfilado en esta sesión: no se vuelve a leer en cada rerun
+            st.caption(saved_profile[1])
+            st.dataframe(saved_profile[2], width="stretch")
+        else:
+            status = st.empty()
+            profile_table = st.empty()
+            try:
+                for profiler in profile_file(profile_source, sep=separators[sep_label]):
+                    status.caption(f"⏳ Read {profiler.rows:,} rows ({profiler.chunks} chunks)...")
+                    profile_table.dataframe(profiler.summary(), width="stretch")
+            except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+                status.error(f"Could not read the file: {e}")
+            else:
+                done_text = f"✅ Profiled {profiler.rows:,} rows in {profiler.chunks} chunks."
+                status.caption(done_text)
+                st.session_state["eda_profile"] = (profile_key, done_text, profiler.summary())
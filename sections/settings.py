@@ -0,0 +1,139 @@
+# Página "Settings"
+
+import os
+
+import streamlit as st
+
+from sections import PAGES, get_timings
+from utils.probes import global_stats, probes_enabled, session_stats, set_probes_enabled
+from utils.resources import get_resources
+from utils.warmcache import get_disk_cache
+
+# Las acciones que afectan a todas las sesiones (vaciar las cachés compartidas) solo se habilitan con APP_ADMIN=1
+# La app no tiene usuarios: el flag es del despliegue, no de la sesión
+ADMIN_ACTIONS = os.environ.get("APP_ADMIN", "0") == "1"
+ADMIN_HELP = "Affects every session: start the server with APP_ADMIN=1 to enable it."
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def render():
+    st.title("Settings")
+
+    # Tiempos de arranque del proceso: cuánto cuesta importar y pintar cada página (ver sections/__init__.py)
+    # La importación de una página incluye las librerías que aún no había cargado otra página antes
+    st.markdown("### ⏱️ Startup & page timings")
+    pages, runs = get_timings().snapshot()
+    cols = st.columns(3)
+    cols[0].metric("First app run", f"{_ms(runs['first']) or 0:,.0f} ms")
+    cols[1].metric("Last app run", f"{_ms(runs['last']) or 0:,.0f} ms")
+    cols[2].metric("Runs since start", f"{runs['count']:,}")
+
+    rows = []
+    for page in PAGES:
+        timing = pages.get(page["title"], {})
+        rows.append({
+            "page": page["title"],
+            "module": f"sections.{page['module']}",
+            "imported": timing.get("import") is not None,
+            "import (ms)": _ms(timing.get("import")),
+            "first render (ms)": _ms(timing.get("first_render")),
+            "last render (ms)": _ms(timing.get("last_render")),
+            "renders": timing.get("renders", 0),
+        })
+    st.dataframe(rows, hide_index=True, width="stretch")
+    st.caption("Pages that have not been visited since the server started are not imported yet.")
+
+    st.markdown("---")
+    performance_panel()
+
+    st.markdown("---")
+    resources_panel()
+
+
+def _set_probes():
+    set_probes_enabled(st.session_state["probes_enabled"])
+
+
+def performance_panel():
+    # Medidas de las sondas de utils/probes.py: sidebar, menú, páginas, fragmentos y funciones con caché
+    # Los percentiles son de las últimas medidas de cada sonda; los aciertos y fallos, desde el arranque (o el reinicio)
+    st.markdown("### 🩺 Performance")
+    # Encender o apagar las sondas y borrar las medidas de todas las sesiones son acciones de administración
+    # (ver ADMIN_ACTIONS); las medidas de la propia sesión se pueden borrar siempre
+    st.toggle(
+        "Enable performance probes (all sessions)", value=probes_enabled(), key="probes_enabled", on_change=_set_probes,
+        disabled=not ADMIN_ACTIONS,
+        help="When disabled, the probes add no measurable time to each run." + ("" if ADMIN_ACTIONS else f" {ADMIN_HELP}"),
+    )
+    scope = st.radio("Scope", ["This session", "All sessions"], horizontal=True)
+    stats = session_stats() if scope == "This session" else global_stats()
+    scope_label = "session" if scope == "This session" else "global"
+
+    rows = stats.summary()
+    if not rows:
+        st.info("No measurements yet: open a few pages and come back.")
+        return
+    table = [{
+        "probe": row["probe"],
+        "count": row["count"],
+        "p50 (ms)": _ms(row["p50_seconds"]),
+        "p95 (ms)": _ms(row["p95_seconds"]),
+        "p99 (ms)": _ms(row["p99_seconds"]),
+        "max (ms)": _ms(row["max_seconds"]),
+        "total (s)": round(row["total_seconds"], 2),
+        "cache hits": None if row["hit_ratio"] is None else row["hits"],
+        "cache misses": None if row["hit_ratio"] is None else row["misses"],
+        "hit ratio": None if row["hit_ratio"] is None else f"{row['hit_ratio']:.0%}",
+        "max memory growth (MB)": None if row["max_memory_growth_bytes"] is None else round(row["max_memory_growth_bytes"] / 1024 ** 2, 1),
+    } for row in rows]
+    st.dataframe(table, hide_index=True, width="stretch")
+
+    cols = st.columns(3)
+    cols[0].download_button("Export JSON", stats.to_json(scope_label), file_name=f"probes_{scope_label}.json", mime="application/json")
+    cols[1].download_button("Export Prometheus", stats.to_prometheus(scope_label), file_name=f"probes_{scope_label}.prom", mime="text/plain")
+    shared = scope != "This session" and not ADMIN_ACTIONS
+    if cols[2].button("Reset measurements", disabled=shared, help=ADMIN_HELP if shared else None):
+        stats.reset()
+        st.rerun()
+
+
+def resources_panel():
+    # Recursos compartidos entre sesiones (ver utils/resources.py): uso de cada presupuesto de memoria y descartes
+    st.markdown("### 🧠 Shared resources")
+    resources = get_resources()
+    rows = [{
+        "pool": pool["pool"],
+        "used (MB)": round(pool["used_bytes"] / 1024 ** 2, 1),
+        "budget (MB)": round(pool["budget_bytes"] / 1024 ** 2),
+        "entries": pool["entries"],
+        "TTL (s)": pool["ttl"],
+        "hits": pool["hits"],
+        "misses": pool["misses"],
+        "evictions": pool["evictions"],
+        "expirations": pool["expirations"],
+        "too large to keep": pool["oversized"],
+    } for pool in resources.snapshot()]
+    st.dataframe(rows, hide_index=True, width="stretch")
+    st.caption("Datasets, chart tables, ZIP archives and PDF files are kept once for all sessions, within these budgets.")
+    if st.button("Empty shared resources", disabled=not ADMIN_ACTIONS, help=None if ADMIN_ACTIONS else ADMIN_HELP):
+        resources.clear()
+        st.rerun()
+
+    # Caché en disco (utils/warmcache.py): resultados que se conservan entre reinicios; se llena con python -m utils.warmup
+    disk = get_disk_cache().snapshot()
+    st.dataframe([{
+        "used (MB)": round(disk["used_bytes"] / 1024 ** 2, 1),
+        "budget (MB)": round(disk["budget_bytes"] / 1024 ** 2),
+        "entries": disk["entries"],
+        "hits": disk["hits"],
+        "misses": disk["misses"],
+        "writes": disk["writes"],
+        "evictions": disk["evictions"],
+    }], hide_index=True, width="stretch")
+    st.caption(f"Results kept on disk across server restarts, in {disk['folder']}. Run `python -m utils.warmup` before starting the server to fill it.")
+    if st.button("Empty disk cache", disabled=not ADMIN_ACTIONS, help=None if ADMIN_ACTIONS else ADMIN_HELP):
+        get_disk_cache().clear()
+        st.rerun()
@@ -0,0 +1,147 @@
+# Página "Statistics": tests A/B entre Control y Test
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from utils.datasets import dataset_version, load_dataset
+from utils.probes import probed
+from utils.resampling import ResamplingJob, poll_job, release_session_jobs, start_job
+from utils.sequential import RATES, REFRESH_SECONDS, sequential_results
+from utils.stats import BOOT_APPROXIMATE, CONTROL, MAX_BOOTSTRAP_BINS, TEST, ab_test_report, threshold_proportion_test
+
+
+def on_leave():
+    # Al salir de la página se cancelan los remuestreos que ya no mira nadie
+    release_session_jobs()
+
+
+def render():
+    st.title("Statistics")
+
+    # Tests A/B calculados en directo a partir de la columna variation (Control/Test), ver utils/stats.py
+    # Los resultados se guardan en caché por versión del dataset: solo se recalculan si cambian los datos
+    stats_dataset = st.selectbox("Dataset", ["clients", "networth"])
+    metric_options = ["clnt_tenure_yr", "clnt_age", "num_accts", "bal", "calls_6_mnth", "logons_6_mnth"]
+    stats_metrics = st.multiselect("Metrics", metric_options, default=metric_options)
+    col_alpha, col_boot = st.columns(2)
+    with col_alpha:
+        stats_alpha = st.select_slider("Significance level (α)", options=[0.01, 0.05, 0.10], value=0.05)
+    with col_boot:
+        stats_resamples = st.select_slider("Bootstrap resamples", options=[1_000, 5_000, 10_000, 20_000], value=10_000)
+
+    if stats_metrics:
+        st.markdown("#### Test vs Control: difference in means")
+        st.caption("Welch t-test, Hedges' g effect size and percentile bootstrap confidence interval of the difference (Test − Control).")
+        report = ab_test_report(stats_dataset, stats_metrics, n_resamples=stats_resamples, alpha=stats_alpha)
+        approximate = report.index[report["boot_method"] == BOOT_APPROXIMATE]
+        if len(approximate):
+            st.caption(
+                f"⚠️ {', '.join(approximate)}: more than {MAX_BOOTSTRAP_BINS} distinct values, so the bootstrap interval is approximate "
+                "(quantile bins with a normal approximation inside each bin). Use the resampling tests below for an exact row bootstrap."
+            )
+        st.dataframe(
+            report.style.format({
+                "p_value": "{:.4f}",
+                "rel_diff": "{:.2%}",
+                "hedges_g": "{:.3f}",
+            }, precision=2),
+            width="stretch",
+        )
+
+        st.markdown("#### Test vs Control: share of clients above a threshold")
+        st.caption("Two-proportion z-test with Cohen's h effect size.")
+        col_metric, col_threshold = st.columns(2)
+        with col_metric:
+            prop_metric = st.selectbox("Metric", stats_metrics)
+        with col_threshold:
+            prop_threshold = st.number_input("Threshold", value=float(report.loc[prop_metric, "mean_Control"]))
+        prop_result = threshold_proportion_test(stats_dataset, prop_metric, prop_threshold, alpha=stats_alpha)
+        st.dataframe(prop_result.style.format({"p_value": "{:.4f}", "rate_control": "{:.2%}", "rate_test": "{:.2%}", "diff": "{:.2%}"}, precision=4), width="stretch")
+
+        # Seguimiento secuencial: p-valores siempre válidos que se actualizan solos con las filas nuevas del dataset
+        # (ver utils/sequential.py); el bloque vuelve a mirar cada REFRESH_SECONDS y solo lee lo añadido
+        st.markdown("#### Sequential monitoring")
+        st.caption(
+            "Always-valid p-values and confidence sequences (mixture SPRT), updated with the rows appended to the dataset. "
+            "They stay valid however often you look, so the experiment can be stopped as soon as a result is significant."
+        )
+
+        @st.fragment(run_every=REFRESH_SECONDS)
+        @probed("statistics.sequential_monitoring")
+        def sequential_monitoring():
+            monitoring = sequential_results(stats_dataset, alpha=stats_alpha)
+            tests = [*stats_metrics, *RATES]
+            results = monitoring["results"].reindex([test for test in tests if test in monitoring["results"].index])
+            if results.empty:
+                st.info("Not enough clients in each group to start the sequential tests yet.")
+                return
+            st.dataframe(
+                results.style.format({"p_value": "{:.4f}", CONTROL: "{:.3f}", TEST: "{:.3f}"}, precision=3),
+                width="stretch",
+            )
+            history = monitoring["history"]
+            history = history[history["test"].isin(results.index)]
+            st.altair_chart(
+                alt.Chart(history).mark_line(point=True).encode(
+                    x=alt.X("rows:Q", title="Clients seen"),
+                    y=alt.Y("p_value:Q", title="Always-valid p-value", scale=alt.Scale(domain=[0, 1])),
+                    color=alt.Color("test:N", title=None),
+                    tooltip=["test", "look", "rows", alt.Tooltip("p_value:Q", format=".4f")],
+                )
+                + alt.Chart().mark_rule(strokeDash=[4, 4]).encode(y=alt.datum(stats_alpha)),
+                width="stretch",
+            )
+            looks = int(results["looks"].max())
+            st.caption(f"{monitoring['rows']:,} clients in {looks} look{'s' if looks != 1 else ''}; checked for new rows every {REFRESH_SECONDS} s.")
+
+        sequential_monitoring()
+
+        # Tests por remuestreo exactos: se reparten en bloques con semilla en un pool de procesos (ver utils/resampling.py)
+        # Si sales de la página mientras se calculan, se cancelan; si ya se calcularon antes, el resultado sale al momento
+        st.markdown("#### Resampling tests")
+        st.caption("Permutation test (p-value) or row bootstrap (confidence interval) of the difference in means, computed in background worker processes.")
+        col_kind, col_resample_metric, col_resample_n = st.columns(3)
+        with col_kind:
+            resample_kind = st.selectbox("Test", ["permutation", "bootstrap"])
+        with col_resample_metric:
+            resample_metric = st.selectbox("Metric", stats_metrics, key="resample_metric")
+        with col_resample_n:
+            resample_n = st.select_slider("Resamples", options=[1_000, 10_000, 50_000, 100_000], value=10_000)
+        resample_key = (resample_kind, stats_dataset, dataset_version(stats_dataset), resample_metric, resample_n, stats_alpha)
+
+        if st.button("Run resampling test"):
+            df_resample = load_dataset(stats_dataset, columns=[resample_metric, "variation"])
+            start_job(
+                resample_key,
+                resample_kind,
+                df_resample.loc[df_resample["variation"] == "Control", resample_metric],
+                df_resample.loc[df_resample["variation"] == "Test", resample_metric],
+                n_resamples=resample_n,
+                alpha=stats_alpha,
+            )
+
+        resample_state = poll_job(resample_key)
+        resample_running = isinstance(resample_state, ResamplingJob) and resample_state.error is None
+
+        # Solo este bloque se refresca cada segundo mientras el test está en marcha
+        @st.fragment(run_every=1 if resample_running else None)
+        @probed("statistics.resampling_progress")
+        def resampling_progress():
+            state = poll_job(resample_key)
+            if state is None:
+                st.info("Choose a test and click the button to run it.")
+            elif isinstance(state, ResamplingJob) and state.error is not None:
+                if resample_running:
+                    # Ha fallado: una última ejecución completa para dejar de refrescar
+                    st.rerun()
+                st.error(f"The {resample_kind} test failed ({type(state.error).__name__}: {state.error}). Click the button to run it again.")
+            elif isinstance(state, ResamplingJob):
+                st.progress(state.progress(), text=f"Running {resample_kind} test... {state.progress():.0%}")
+            else:
+                if resample_running:
+                    # Ha terminado: una última ejecución completa para dejar de refrescar
+                    st.rerun()
+                st.dataframe(pd.DataFrame([state], index=[resample_metric]), width="stretch")
+
+        resampling_progress()
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Las cachés de los módulos (disco y columnares) van a una carpeta temporal, no a .cache del proyecto
+# Tiene que estar antes de importar utils: las rutas se calculan al importar utils/paths.py
+os.environ.setdefault("APP_CACHE_DIR", tempfile.mkdtemp(prefix="nomoreslides-tests-"))
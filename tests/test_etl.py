@@ -0,0 +1,88 @@
+# ETL raw -> processed (utils/etl.py): la reconstrucción completa frente a los processed del repo,
+# la incremental frente a la completa y que nunca se pisan los processed que no ha escrito el ETL
+
+import pandas as pd
+import pytest
+
+from utils import etl
+from utils.datasets import DATASETS
+from utils.paths import PROCESSED_DIR, RAW_DIR
+
+OUTPUTS = {"clients": PROCESSED_DIR / "df_clients.csv", "networth": PROCESSED_DIR / "df_networth.csv"}
+SOURCES = {"demo": RAW_DIR / "df_final_demo.txt", "experiment": RAW_DIR / "df_final_experiment_clients.txt"}
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    # Copias de los raw y carpetas propias para los processed y el estado del ETL
+    (tmp_path / "raw").mkdir()
+    for name, path in SOURCES.items():
+        monkeypatch.setitem(DATASETS, name, tmp_path / "raw" / path.name)
+        DATASETS[name].write_bytes(path.read_bytes())
+    for name, path in OUTPUTS.items():
+        monkeypatch.setitem(DATASETS, name, tmp_path / "processed" / path.name)
+    monkeypatch.setattr(etl, "ETL_DIR", tmp_path / "etl")
+    monkeypatch.setattr(etl, "STATE_PATH", tmp_path / "etl" / "state.json")
+    return tmp_path
+
+
+def _processed(name):
+    return pd.read_csv(DATASETS[name]).sort_values("client_id", ignore_index=True)
+
+
+def test_full_build_matches_committed_outputs(workspace):
+    assert etl.run_etl()["mode"] == "full"
+    for name, path in OUTPUTS.items():
+        assert DATASETS[name].read_bytes() == path.read_bytes()
+    assert etl.run_etl()["mode"] == "up to date"
+
+
+def test_incremental_matches_full_build(workspace):
+    # El 80 % de cada raw, ETL completo; luego se añade el 20 % que falta y se procesa solo eso
+    for name, path in SOURCES.items():
+        lines = path.read_bytes().splitlines(keepends=True)
+        DATASETS[name].write_bytes(b"".join(lines[: int(len(lines) * 0.8)]))
+    assert etl.run_etl()["mode"] == "full"
+    for name, path in SOURCES.items():
+        DATASETS[name].write_bytes(path.read_bytes())
+    result = etl.run_etl()
+    assert result["mode"] == "incremental"
+
+    incremental = {name: _processed(name) for name in OUTPUTS}
+    etl.run_etl(full=True)
+    for name in OUTPUTS:
+        full = _processed(name)
+        assert len(incremental[name]) == len(full) == result[name]
+        # Las filas ya escritas conservan la edad media de cuando se procesaron: la edad solo se compara donde venía en el raw
+        pd.testing.assert_frame_equal(incremental[name].drop(columns="clnt_age"), full.drop(columns="clnt_age"))
+    raw_ages = pd.read_csv(DATASETS["demo"]).set_index("client_id")["clnt_age"]
+    known = incremental["clients"]["client_id"].map(raw_ages).notna()
+    pd.testing.assert_series_equal(incremental["clients"].loc[known, "clnt_age"], _processed("clients").loc[known, "clnt_age"])
+
+
+def test_hand_edited_outputs_are_kept(workspace):
+    etl.run_etl()
+    edited = DATASETS["clients"].read_bytes() + b"1,2,3\n"
+    DATASETS["clients"].write_bytes(edited)
+    assert etl.run_etl()["mode"] == "kept"
+    # Aunque cambien los raw, los processed editados no se tocan
+    with open(DATASETS["demo"], "ab") as f:
+        f.write(b"99999999,1.0,12.0,30.0,M,2.0,1000.0,1.0,1.0\n")
+    assert etl.run_etl()["mode"] == "kept"
+    assert DATASETS["clients"].read_bytes() == edited
+
+
+def test_foreign_outputs_are_not_overwritten(workspace):
+    DATASETS["clients"].parent.mkdir()
+    for name in OUTPUTS:
+        DATASETS[name].write_text("client_id,other\n1,2\n")
+    assert etl.run_etl()["mode"] == "kept"
+    assert all(DATASETS[name].read_text() == "client_id,other\n1,2\n" for name in OUTPUTS)
+
+
+def test_missing_column_writes_nothing(workspace):
+    demo = pd.read_csv(DATASETS["demo"]).drop(columns="bal")
+    demo.to_csv(DATASETS["demo"], index=False)
+    with pytest.raises(ValueError, match="bal"):
+        etl.run_etl()
+    assert not any(DATASETS[name].exists() for name in OUTPUTS)
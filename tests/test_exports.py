@@ -0,0 +1,27 @@
+# Exportaciones a medida (utils/exports.py): los valores descargados son exactamente los del CSV
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from utils.datasets import DATASETS
+from utils.exports import EXPORT_FORMATS, build_export
+
+
+@pytest.mark.parametrize("export_format", list(EXPORT_FORMATS))
+def test_export_round_trip(export_format):
+    source = pd.read_csv(DATASETS["clients"])
+    path = build_export("clients", list(source.columns), export_format=export_format)
+    if export_format == "Parquet":
+        exported = pd.read_parquet(path)
+    else:
+        with pa.input_stream(path, compression=EXPORT_FORMATS[export_format]["compression"]) as stream:
+            exported = pd.read_csv(stream)
+    pd.testing.assert_frame_equal(exported, source, check_dtype=False, check_categorical=False, check_exact=True)
+
+
+def test_filtered_export_keeps_source_values():
+    source = pd.read_csv(DATASETS["clients"])
+    path = build_export("clients", ["client_id", "bal"], [("bal", ">", 100_000)])
+    expected = source.loc[source["bal"] > 100_000, ["client_id", "bal"]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(pd.read_csv(path), expected, check_exact=True)
@@ -0,0 +1,76 @@
+# Motor del embudo (utils/funnel.py) frente a un cálculo directo con pandas, evento a evento
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.funnel import STEPS, FunnelEngine
+from utils.stats import CONTROL, TEST
+
+
+@pytest.fixture
+def events():
+    # Visitas con pasos al azar (con vueltas atrás) y horas crecientes dentro de cada visita, repartidas en dos días
+    rng = np.random.default_rng(0)
+    rows = []
+    for client in range(1, 301):
+        for visit in range(rng.integers(1, 4)):
+            start = pd.Timestamp("2017-04-01") + pd.Timedelta(hours=int(rng.integers(0, 40)), seconds=int(rng.integers(0, 3600)))
+            seconds = np.cumsum(rng.integers(1, 300, size=rng.integers(1, 9)))
+            for step, offset in zip(rng.integers(0, len(STEPS), size=len(seconds)), seconds):
+                rows.append((client, f"{client}_{visit}", STEPS[step], start + pd.Timedelta(seconds=int(offset))))
+    events = pd.DataFrame(rows, columns=["client_id", "visit_id", "process_step", "date_time"])
+    events["client_id"] = events["client_id"].astype("int32")
+    variations = pd.Series(np.where(np.arange(1, 301) % 2, CONTROL, TEST), index=np.arange(1, 301))
+    return events, variations
+
+
+def _reference(events, variations):
+    df = events.assign(variation=events["client_id"].map(variations), step=events["process_step"].map(STEPS.index))
+    df = df.sort_values(["visit_id", "date_time"], kind="stable")
+    following = df.groupby("visit_id")[["step", "date_time"]].shift(-1)
+    transitions = df[following["step"].notna()].assign(
+        seconds=(following["date_time"] - df["date_time"]).dt.total_seconds(),
+        error=following["step"] < df["step"],
+    )
+    visits = df.groupby("visit_id").agg(
+        client_id=("client_id", "first"), variation=("variation", "first"), first_time=("date_time", "min"),
+        completed=("process_step", lambda steps: (steps == "confirm").any()),
+    ).join(transitions.groupby("visit_id").agg(errors=("error", "sum"), transitions=("error", "size")))
+    visits = visits.fillna({"errors": 0, "transitions": 0})
+    first = visits.sort_values("first_time").groupby("client_id").head(1).set_index("client_id")
+    clients = visits.groupby("client_id").agg(variation=("variation", "first"), completed=("completed", "any"))
+    clients["first_attempt"] = first["completed"] & (first["errors"] == 0)
+    kpis = pd.DataFrame({
+        "completion_rate": clients.groupby("variation")["completed"].mean(),
+        "first_attempt_rate": clients.groupby("variation")["first_attempt"].mean(),
+        "error_rate": visits.groupby("variation")["errors"].sum() / visits.groupby("variation")["transitions"].sum(),
+    })
+    step_times = transitions.groupby(["variation", "process_step"])["seconds"].agg(["size", "mean", "std"])
+    return kpis, step_times
+
+
+def _check(engine, events, variations):
+    kpis, step_times = _reference(events, variations)
+    summary = engine.kpi_summary()
+    for kpi in kpis.columns:
+        np.testing.assert_allclose(summary.loc[[CONTROL, TEST], kpi], kpis.loc[[CONTROL, TEST], kpi], rtol=1e-12)
+    times = engine.step_times()
+    for (variation, step), row in step_times.iterrows():
+        assert times.loc[(variation, step), "count"] == row["size"]
+        assert times.loc[(variation, step), "mean_seconds"] == pytest.approx(row["mean"], rel=1e-9)
+        assert times.loc[(variation, step), "std_seconds"] == pytest.approx(row["std"], rel=1e-6, nan_ok=True)
+
+
+def test_engine_matches_pandas(events):
+    events, variations = events
+    _check(FunnelEngine().append(events, variations), events, variations)
+
+
+def test_incremental_append_matches_single_pass(events):
+    # Un día cada vez: las visitas que cruzan de un día a otro se siguen contando bien
+    events, variations = events
+    engine = FunnelEngine()
+    for _, day in events.groupby(events["date_time"].dt.date):
+        engine.append(day, variations)
+    _check(engine, events, variations)
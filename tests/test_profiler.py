@@ -0,0 +1,68 @@
+# Perfil por bloques (utils/profiler.py) frente a pandas con el archivo entero en memoria
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.profiler import HyperLogLog, KLLSketch, profile_file
+
+
+@pytest.fixture
+def csv_file():
+    rng = np.random.default_rng(0)
+    n = 120_000
+    df = pd.DataFrame({
+        "client_id": np.arange(n),
+        "bal": rng.lognormal(10, 1, n),
+        "calls": rng.poisson(3, n).astype("float64"),
+        "gendr": rng.choice(["M", "F", "U"], n),
+    })
+    df.loc[rng.choice(n, 500, replace=False), "bal"] = np.nan
+    return df, df.to_csv(index=False)
+
+
+def test_profile_matches_pandas(csv_file):
+    df, text = csv_file
+    *_, profiler = profile_file(io.StringIO(text), chunk_rows=25_000)
+    summary = profiler.summary()
+    assert profiler.rows == len(df) and profiler.chunks == 5
+    for column in ["bal", "calls"]:
+        row = summary.loc[column]
+        assert row["count"] == len(df)
+        assert row["nulls"] == df[column].isna().sum()
+        assert row["min"] == df[column].min() and row["max"] == df[column].max()
+        assert row["mean"] == pytest.approx(df[column].mean(), rel=1e-9)
+        assert row["std"] == pytest.approx(df[column].std(), rel=1e-9)
+    assert summary.loc["gendr", "type"] == "text"
+
+
+def test_hyperloglog_distinct_count():
+    sketch = HyperLogLog()
+    values = np.random.default_rng(1).integers(0, 10**9, 200_000)
+    for chunk in np.array_split(values, 7):
+        sketch.update(chunk)
+    assert sketch.estimate() == pytest.approx(len(np.unique(values)), rel=0.03)
+
+
+def test_kll_quantiles_rank_error():
+    sketch = KLLSketch()
+    values = np.random.default_rng(2).lognormal(10, 1, 300_000)
+    for chunk in np.array_split(values, 11):
+        sketch.update(chunk)
+    qs = [0.1, 0.25, 0.5, 0.75, 0.9]
+    estimates = sketch.quantiles(qs)
+    # Error de rango: la posición del valor estimado en los datos ordenados está a menos de un 2% de la pedida
+    ranks = np.searchsorted(np.sort(values), estimates) / len(values)
+    assert np.max(np.abs(ranks - np.array(qs))) < 0.02
+
+
+def test_distinct_count_ignores_chunk_dtype():
+    # El primer bloque se lee como int64 y el segundo, con un nulo, como float64: los mismos 1000 valores
+    values = pd.Series(np.tile(np.arange(1000), 100), dtype="float64")
+    values[75_000] = np.nan
+    *_, profiler = profile_file(io.StringIO(pd.DataFrame({"x": values}).to_csv(index=False, float_format="%.0f")), chunk_rows=50_000)
+    row = profiler.summary().loc["x"]
+    assert row["nulls"] == 1
+    assert row["distinct_approx"] == pytest.approx(1000, rel=0.03)
@@ -0,0 +1,60 @@
+# Seguimiento secuencial (utils/sequential.py): los estadísticos suficientes frente a pandas y los p-valores de las miradas
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sequential import METRICS, RATES, SequentialMonitor
+from utils.stats import CONTROL, TEST
+
+
+@pytest.fixture
+def clients():
+    rng = np.random.default_rng(3)
+    n = 3000
+    df = pd.DataFrame({metric: rng.poisson(5, n).astype("float64") for metric in METRICS})
+    df["bal"] = rng.lognormal(10, 1, n)
+    df.loc[rng.choice(n, 100, replace=False), "clnt_age"] = np.nan
+    df["variation"] = np.where(rng.random(n) < 0.5, CONTROL, TEST)
+    return df
+
+
+def test_sums_match_pandas(clients):
+    monitor = SequentialMonitor().update(clients)
+    grouped = clients.groupby("variation")
+    for variation in (CONTROL, TEST):
+        for metric in METRICS:
+            count, total, sumsq = monitor.sums[variation][metric]
+            values = grouped.get_group(variation)[metric]
+            assert count == values.count()
+            assert total / count == pytest.approx(values.mean(), rel=1e-12)
+            assert (sumsq - count * (total / count) ** 2) / (count - 1) == pytest.approx(values.var(), rel=1e-9)
+        for name, (column, threshold) in RATES.items():
+            count, successes = monitor.successes[variation][name]
+            values = grouped.get_group(variation)[column].dropna()
+            assert (count, successes) == (len(values), (values > threshold).sum())
+
+
+def test_batches_match_single_update(clients):
+    # Tres lotes dan los mismos estadísticos que uno solo
+    whole = SequentialMonitor().update(clients)
+    batched = SequentialMonitor()
+    for start in range(0, len(clients), 1000):
+        batched.update(clients.iloc[start:start + 1000])
+    for variation in (CONTROL, TEST):
+        for metric in METRICS:
+            np.testing.assert_allclose(batched.sums[variation][metric], whole.sums[variation][metric], rtol=1e-12)
+        assert batched.successes[variation] == whole.successes[variation]
+    assert batched.rows == whole.rows == len(clients)
+
+
+def test_history_p_values_are_valid(clients):
+    monitor = SequentialMonitor()
+    for start in range(0, len(clients), 300):
+        monitor.update(clients.iloc[start:start + 300])
+    history = monitor.history()
+    assert not history.empty
+    assert history["p_value"].between(0, 1).all()
+    for _, test in history.groupby("test"):
+        assert (np.diff(test["p_value"]) <= 0).all()
+        assert (test["ci_low"] <= test["ci_high"]).all()
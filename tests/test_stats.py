@@ -0,0 +1,82 @@
+# Motor de estadística (utils/stats.py) frente a scipy y pandas
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats as sps
+
+from utils.stats import (
+    BOOT_APPROXIMATE, BOOT_EXACT, CONTROL, TEST, bootstrap_diff_ci, group_moments, two_proportion_ztest, welch_ttest,
+)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n_control, n_test = 900, 1100
+    return pd.DataFrame({
+        "variation": [CONTROL] * n_control + [TEST] * n_test,
+        "age": np.concatenate([rng.normal(45, 12, n_control), rng.normal(47, 15, n_test)]),
+        "calls": np.concatenate([rng.poisson(3, n_control), rng.poisson(3.3, n_test)]).astype("float32"),
+    })
+
+
+def test_group_moments_match_pandas(frame):
+    counts, means, variances = group_moments(frame, ["age", "calls"])
+    grouped = frame.groupby("variation")[["age", "calls"]]
+    pd.testing.assert_frame_equal(counts, grouped.count(), check_dtype=False)
+    pd.testing.assert_frame_equal(means, grouped.mean().astype("float64"), check_dtype=False)
+    pd.testing.assert_frame_equal(variances, grouped.var().astype("float64"), check_dtype=False)
+
+
+def test_welch_ttest_matches_scipy(frame):
+    report = welch_ttest(frame, ["age", "calls"], alpha=0.05)
+    for column in ["age", "calls"]:
+        control = frame.loc[frame["variation"] == CONTROL, column].astype("float64")
+        test = frame.loc[frame["variation"] == TEST, column].astype("float64")
+        reference = sps.ttest_ind(test, control, equal_var=False)
+        ci = reference.confidence_interval(0.95)
+        assert report.loc[column, "t_stat"] == pytest.approx(reference.statistic, rel=1e-9)
+        assert report.loc[column, "p_value"] == pytest.approx(reference.pvalue, rel=1e-9)
+        assert report.loc[column, "ci_low"] == pytest.approx(ci.low, rel=1e-9)
+        assert report.loc[column, "ci_high"] == pytest.approx(ci.high, rel=1e-9)
+        assert report.loc[column, "diff"] == pytest.approx(test.mean() - control.mean(), rel=1e-9)
+
+
+@pytest.mark.parametrize("successes", [(430, 1000, 470, 1100), (19, 10_000, 7, 10_000)])
+def test_two_proportion_ztest_matches_chi_square(successes):
+    x1, n1, x2, n2 = successes
+    result = two_proportion_ztest(x1, n1, x2, n2)
+    # El z-test de dos proporciones bilateral es el chi-cuadrado 2x2 sin corrección de Yates
+    chi2, p_value, _, _ = sps.chi2_contingency([[x1, n1 - x1], [x2, n2 - x2]], correction=False)
+    assert result["z_stat"] ** 2 == pytest.approx(chi2, rel=1e-9)
+    assert result["p_value"] == pytest.approx(p_value, rel=1e-9)
+    one_sided = two_proportion_ztest(x1, n1, x2, n2, alternative="smaller" if x2 / n2 < x1 / n1 else "larger")
+    assert one_sided["p_value"] == pytest.approx(p_value / 2, rel=1e-9)
+
+
+def test_bootstrap_is_exact_for_discrete_values(frame):
+    control = frame.loc[frame["variation"] == CONTROL, "calls"].to_numpy("float64")
+    test = frame.loc[frame["variation"] == TEST, "calls"].to_numpy("float64")
+    result = bootstrap_diff_ci(control, test, n_resamples=4000, seed=1)
+    assert result["boot_method"] == BOOT_EXACT
+
+    # Referencia: bootstrap clásico remuestreando filas
+    rng = np.random.default_rng(2)
+    diffs = np.array([
+        rng.choice(test, len(test)).mean() - rng.choice(control, len(control)).mean() for _ in range(4000)
+    ])
+    low, high = np.percentile(diffs, [2.5, 97.5])
+    assert result["boot_se"] == pytest.approx(diffs.std(ddof=1), rel=0.1)
+    assert result["boot_ci_low"] == pytest.approx(low, abs=0.1 * diffs.std())
+    assert result["boot_ci_high"] == pytest.approx(high, abs=0.1 * diffs.std())
+
+
+def test_bootstrap_labels_the_binned_approximation(frame):
+    control = frame.loc[frame["variation"] == CONTROL, "age"]
+    test = frame.loc[frame["variation"] == TEST, "age"]
+    result = bootstrap_diff_ci(control, test, n_resamples=2000)
+    assert result["boot_method"] == BOOT_APPROXIMATE
+    # Aun aproximado, el error estándar es el de la diferencia de medias
+    expected_se = np.sqrt(control.var() / len(control) + test.var() / len(test))
+    assert result["boot_se"] == pytest.approx(expected_se, rel=0.1)
@@ -0,0 +1,2 @@
+# Funciones auxiliares de la app (carga de datos, descargas, cachés...)
+# Cada módulo agrupa una parte de la lógica para que app.py solo se ocupe de pintar las páginas
@@ -0,0 +1,92 @@
+import hashlib
+import io
+import os
+import zipfile
+
+from utils.paths import CACHE_DIR, temp_path
+from utils.resources import shared_resource
+from utils.warmcache import persistent
+
+# Carpeta donde se guardan los ZIP si se activa ARCHIVES_ON_DISK
+ARCHIVES_DIR = CACHE_DIR / "archives"
+
+# Pon True para escribir los ZIP en disco y servirlos desde ahí en vez de guardarlos en memoria
+ARCHIVES_ON_DISK = False
+
+
+def folder_signature(folder_path):
+    # Huella del contenido de la carpeta: ruta relativa, tamaño y fecha de modificación de cada archivo
+    # Si se añade, borra o modifica un archivo, la huella cambia y el ZIP se vuelve a generar
+    entries = []
+    for root, _, files in os.walk(folder_path):
+        for file in files:
+            file_path = os.path.join(root, file)
+            stat = os.stat(file_path)
+            arcname = os.path.relpath(file_path, start=folder_path)
+            entries.append((arcname, stat.st_size, stat.st_mtime_ns))
+    entries.sort()
+    return tuple(entries)
+
+
+def signature_digest(signature):
+    return hashlib.sha1(repr(signature).encode()).hexdigest()[:16]
+
+
+def _write_zip(folder_path, signature, target):
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as z:
+        for arcname, _, _ in signature:
+            z.write(os.path.join(folder_path, arcname), arcname=arcname)
+
+
+def _archive_inputs(arguments):
+    return [os.path.join(arguments["folder_path"], arcname) for arcname, _, _ in arguments["signature"]]
+
+
+# En memoria, el ZIP también se guarda en la caché en disco (utils/warmcache.py) por contenido de los archivos:
+# tras un reinicio no se vuelve a comprimir
+@persistent("archives.zip_bytes", inputs=_archive_inputs, ignore=("folder_path", "signature"))
+def _zip_bytes(folder_path, signature):
+    buffer = io.BytesIO()
+    _write_zip(folder_path, signature, buffer)
+    return buffer.getvalue()
+
+
+def _remove_old_archives(prefix, keep):
+    # Borra las versiones antiguas del ZIP de una misma carpeta
+    for path in ARCHIVES_DIR.glob(f"{prefix}-*.zip"):
+        if path.name != keep:
+            path.unlink(missing_ok=True)
+
+
+# Sin spinner: el ZIP se pide al hacer clic en la descarga, fuera de la ejecución del script
+# Los ZIP en memoria cuentan en el presupuesto del grupo "archives" (ver utils/resources.py)
+@shared_resource("archives", "archives.build_archive")
+def _build_archive(folder_path, signature, on_disk):
+    # Se ejecuta una sola vez por versión del contenido y el resultado se comparte entre sesiones
+    if not on_disk:
+        return _zip_bytes(folder_path, signature)
+
+    prefix = os.path.basename(os.path.normpath(folder_path))
+    file_name = f"{prefix}-{signature_digest(signature)}.zip"
+    archive_path = ARCHIVES_DIR / file_name
+    if not archive_path.exists():
+        ARCHIVES_DIR.mkdir(parents=True, exist_ok=True)
+        # Escribimos en un temporal y lo renombramos para no servir nunca un ZIP a medias
+        tmp_path = temp_path(archive_path)
+        _write_zip(folder_path, signature, tmp_path)
+        os.replace(tmp_path, archive_path)
+        _remove_old_archives(prefix, keep=file_name)
+    return str(archive_path)
+
+
+def get_folder_archive(folder_path, on_disk=None):
+    # Devuelve los bytes del ZIP de la carpeta o, con on_disk=True, la ruta del ZIP en disco
+    if on_disk is None:
+        on_disk = ARCHIVES_ON_DISK
+    folder_path = str(folder_path)
+    archive = _build_archive(folder_path, folder_signature(folder_path), on_disk)
+    if on_disk and not os.path.exists(archive):
+        # Alguien ha borrado la caché en disco: la regeneramos
+        _build_archive.clear()
+        archive = _build_archive(folder_path, folder_signature(folder_path), on_disk)
+    return archive
@@ -0,0 +1,193 @@
+import argparse
+import base64
+import hashlib
+import mimetypes
+import os
+import shutil
+import urllib.request
+
+import streamlit as st
+
+from utils.paths import BASE_DIR, temp_path
+from utils.probes import cached_probe
+
+# Archivos estáticos servidos por Streamlit (server.enableStaticServing en .streamlit/config.toml)
+# Todo lo que hay en static/ se sirve en la URL app/static/...
+STATIC_DIR = BASE_DIR / "static"
+STATIC_URL = "app/static"
+
+# Copias con huella (hash del contenido en el nombre) de los archivos de assets/: se generan al arrancar
+BUILD_DIR = STATIC_DIR / "build"
+
+# Librerías y animaciones externas descargadas al proyecto (python -m utils.assets --vendor)
+# No vienen en el repo: hay que descargarlas una vez (con internet) o copiarlas desde otra carpeta (--from)
+VENDOR_DIR = STATIC_DIR / "vendor"
+VENDOR_FILES = {
+    "dotlottie-player.js": "https://unpkg.com/@dotlottie/player-component@2.7.12/dist/dotlottie-player.mjs",
+    "robot.lottie": "https://lottie.host/24393e73-f3c0-43bc-b296-3695056055a6/rnxrzeYROf.lottie",
+}
+
+# Qué hacer si falta algún archivo de static/vendor:
+#   APP_VENDOR_CDN=1 (por defecto) se usan las URL originales de VENDOR_FILES (el navegador necesita internet)
+#   APP_VENDOR_CDN=0 no se hace ninguna petición externa: en vez de la animación se muestra un robot estático
+VENDOR_CDN_FALLBACK = os.environ.get("APP_VENDOR_CDN", "1") != "0"
+
+
+def static_serving_enabled():
+    return bool(st.get_option("server.enableStaticServing"))
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+@cached_probe("assets.published_url", st.cache_resource(show_spinner=False))
+def _published_url(path, version):
+    # Copia el archivo a static/build con el hash en el nombre (una vez por versión del archivo)
+    # Al cambiar el archivo cambia la URL, así el navegador puede guardarlo en caché sin riesgo
+    path = os.fspath(path)
+    stem, suffix = os.path.splitext(os.path.basename(path))
+    name = f"{stem}.{_digest(path)}{suffix}"
+    target = BUILD_DIR / name
+    if not target.exists():
+        BUILD_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = temp_path(target)
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, target)
+    return f"{STATIC_URL}/build/{name}"
+
+
+@cached_probe("assets.data_uri", st.cache_resource(show_spinner=False))
+def _data_uri(path, version):
+    # Alternativa si el servidor de estáticos está desactivado: base64, pero calculado una sola vez por versión
+    mime = mimetypes.guess_type(os.fspath(path))[0] or "application/octet-stream"
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+
+
+def asset_url(path):
+    # URL de un archivo de assets/ para usar en HTML (<img src=...>); lanza FileNotFoundError si no existe
+    version = os.stat(path).st_mtime_ns
+    if static_serving_enabled():
+        return _published_url(os.fspath(path), version)
+    return _data_uri(os.fspath(path), version)
+
+
+@st.cache_resource(show_spinner=False)
+def _vendored_url(name, version):
+    # Una vez por versión del archivo: si se descarga o se cambia con la app en marcha, la URL cambia
+    return f"{STATIC_URL}/vendor/{name}?v={_digest(VENDOR_DIR / name)}"
+
+
+def vendor_url(name):
+    # URL local de un archivo de static/vendor; si no está, la URL original (CDN) o None con APP_VENDOR_CDN=0
+    # Lo que no existe no se guarda en caché: en cuanto se descarga el archivo, se usa
+    path = VENDOR_DIR / name
+    if static_serving_enabled() and path.exists():
+        return _vendored_url(name, os.stat(path).st_mtime_ns)
+    return VENDOR_FILES[name] if VENDOR_CDN_FALLBACK else None
+
+
+def vendor_files(force=False, source=None):
+    # Descarga las librerías externas a static/vendor para no depender de CDNs (entornos sin internet)
+    # source: carpeta con los archivos ya descargados en otro equipo (para servidores sin internet)
+    VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    for name, url in VENDOR_FILES.items():
+        target = VENDOR_DIR / name
+        if target.exists() and not force:
+            print(f"{name}: already vendored")
+            continue
+        tmp_path = temp_path(target)
+        if source is not None:
+            shutil.copyfile(os.path.join(source, name), tmp_path)
+        else:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                tmp_path.write_bytes(response.read())
+        os.replace(tmp_path, target)
+        print(f"{name}: copied from {source}" if source is not None else f"{name}: downloaded from {url}")
+
+
+def robot_widget_html(tooltip):
+    # Robot animado (Lottie) con un tooltip; usa el reproductor local si está descargado (ver VENDOR_CDN_FALLBACK)
+    return _robot_widget_html(tooltip, vendor_url("dotlottie-player.js"), vendor_url("robot.lottie"))
+
+
+@st.cache_resource(show_spinner=False)
+def _robot_widget_html(tooltip, player_url, animation_url):
+    # Se genera una vez por texto y por URLs (cambian al descargar los archivos)
+    if player_url is None or animation_url is None:
+        robot = '<div style="width: 150px; height: 150px; font-size: 96px; line-height: 150px; text-align: center;">🤖</div>'
+    else:
+        robot = f"""<script
+      src="{player_url}"
+      type="module"
+    ></script>
+    <dotlottie-player
+        src="{animation_url}"
+        background="transparent"
+        speed="1"
+        style="width: 150px; height: 150px;"
+        loop
+        autoplay
+      ></dotlottie-player>"""
+    return f"""
+    <style>
+    .tooltip {{
+      position: relative;
+      display: inline-block;
+      cursor: pointer;
+    }}
+    .tooltip .tooltiptext {{
+      visibility: hidden;
+      width: 220px;
+      background-color: #555;
+      color: #fff;
+      text-align: center;
+      border-radius: 6px;
+      padding: 5px 8px;
+      position: absolute;
+      z-index: 1;
+      bottom: 125%;
+      left: 50%;
+      margin-left: -110px;
+      opacity: 0;
+      transition: opacity 0.3s;
+      font-size: 14px;
+      pointer-events: none;
+      white-space: nowrap;
+    }}
+    .tooltip:hover .tooltiptext {{
+      visibility: visible;
+      opacity: 1;
+    }}
+    .tooltip .tooltiptext::after {{
+      content: "";
+      position: absolute;
+      top: 100%;
+      left: 50%;
+      margin-left: -5px;
+      border-width: 5px;
+      border-style: solid;
+      border-color: #555 transparent transparent transparent;
+    }}
+    </style>
+    <div class="tooltip">
+      {robot}
+      <span class="tooltiptext">{tooltip}</span>
+    </div>
+    """
+
+
+if __name__ == "__main__":
+    # python -m utils.assets --vendor: descarga el reproductor Lottie y la animación a static/vendor (necesita internet)
+    # python -m utils.assets --vendor --from carpeta: los copia desde una carpeta (descargados en otro equipo)
+    parser = argparse.ArgumentParser(description="Manage the app's static assets.")
+    parser.add_argument("--vendor", action="store_true", help="Download the external player and animation into static/vendor")
+    parser.add_argument("--from", dest="source", help="Copy the files from this folder instead of downloading them")
+    parser.add_argument("--force", action="store_true", help="Download again even if the files exist")
+    args = parser.parse_args()
+    if args.vendor:
+        vendor_files(force=args.force, source=args.source)
+    else:
+        parser.print_help()
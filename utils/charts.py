@@ -0,0 +1,143 @@
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from utils.datasets import dataset_version, load_dataset
+from utils.resources import shared_resource
+from utils.warmcache import dataset_inputs, persistent
+
+# Número máximo de marcas (barras, celdas, puntos) que se envían al navegador por gráfico
+# Los datos se agregan en pandas antes de llegar a Altair, así el tamaño no depende del número de filas
+MAX_MARKS = 2500
+
+# Cuantiles que se muestran en los resúmenes por grupo (bigotes, caja y mediana)
+SUMMARY_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+def _value_range(values, clip_quantile):
+    # Rango del eje; con clip_quantile < 1 se recortan los valores extremos (por ejemplo, saldos muy altos)
+    if clip_quantile < 1:
+        return tuple(np.nanquantile(values, [1 - clip_quantile, clip_quantile]))
+    return np.nanmin(values), np.nanmax(values)
+
+
+def histogram_table(df, column, group_col=None, bins=40, clip_quantile=1.0):
+    # Histograma ya agregado: una fila por tramo (y por grupo), con inicio, fin y número de filas
+    values = df[column].to_numpy(dtype="float64")
+    low, high = _value_range(values, clip_quantile)
+    edges = np.histogram_bin_edges(values[~np.isnan(values)], bins=bins, range=(low, high))
+    groups = [(None, values)] if group_col is None else [
+        (group, df[column].to_numpy(dtype="float64")[(df[group_col] == group).to_numpy()])
+        for group in df[group_col].dropna().unique()
+    ]
+    tables = []
+    for group, group_values in groups:
+        counts, _ = np.histogram(group_values, bins=edges)
+        table = pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+        if group_col is not None:
+            table[group_col] = group
+            table["share"] = counts / max(counts.sum(), 1)
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True)
+
+
+def grid_table(df, x, y, bins=(40, 40), clip_quantile=0.99, group_col=None):
+    # Agregación en rejilla para dispersión x vs y: solo se envían las celdas con datos
+    x_values = df[x].to_numpy(dtype="float64")
+    y_values = df[y].to_numpy(dtype="float64")
+    x_range = _value_range(x_values, clip_quantile)
+    y_range = _value_range(y_values, clip_quantile)
+    x_edges = np.linspace(*x_range, bins[0] + 1)
+    y_edges = np.linspace(*y_range, bins[1] + 1)
+    x_bin = np.clip(np.searchsorted(x_edges, x_values, side="right") - 1, 0, bins[0] - 1)
+    y_bin = np.clip(np.searchsorted(y_edges, y_values, side="right") - 1, 0, bins[1] - 1)
+    inside = (
+        (x_values >= x_range[0]) & (x_values <= x_range[1])
+        & (y_values >= y_range[0]) & (y_values <= y_range[1])
+    )
+    keys = {"x_bin": x_bin[inside], "y_bin": y_bin[inside]}
+    if group_col is not None:
+        keys[group_col] = df[group_col].to_numpy()[inside]
+    cells = pd.DataFrame(keys).value_counts().rename("count").reset_index()
+    cells[f"{x}_start"] = x_edges[cells["x_bin"]]
+    cells[f"{x}_end"] = x_edges[cells["x_bin"] + 1]
+    cells[f"{y}_start"] = y_edges[cells["y_bin"]]
+    cells[f"{y}_end"] = y_edges[cells["y_bin"] + 1]
+    return cells.drop(columns=["x_bin", "y_bin"]).nlargest(MAX_MARKS, "count")
+
+
+def quantile_table(df, column, group_col="variation", quantiles=SUMMARY_QUANTILES):
+    # Resumen por grupo (p5, p25, mediana, p75, p95, media y número de filas) en un solo groupby
+    grouped = df[column].astype("float64").groupby(df[group_col], observed=True)
+    table = grouped.quantile(quantiles).unstack()
+    table.columns = [f"p{int(q * 100)}" for q in quantiles]
+    table["mean"] = grouped.mean()
+    table["count"] = grouped.count()
+    return table.reset_index()
+
+
+def histogram_chart(table, column, group_col=None):
+    base = alt.Chart(table).encode(
+        x=alt.X("bin_start:Q", bin="binned", title=column),
+        x2="bin_end:Q",
+    )
+    if group_col is None:
+        return base.mark_bar().encode(y=alt.Y("count:Q", title="Rows"), tooltip=["bin_start", "bin_end", "count"])
+    # Con grupos mostramos el porcentaje de cada grupo, así Control y Test se comparan aunque tengan distinto tamaño
+    return base.mark_bar(opacity=0.55).encode(
+        y=alt.Y("share:Q", title="Share of group", axis=alt.Axis(format="%"), stack=None),
+        color=alt.Color(f"{group_col}:N"),
+        tooltip=[group_col, "bin_start", "bin_end", "count", alt.Tooltip("share:Q", format=".2%")],
+    )
+
+
+def grid_chart(table, x, y):
+    return alt.Chart(table).mark_rect().encode(
+        x=alt.X(f"{x}_start:Q", bin="binned", title=x),
+        x2=f"{x}_end:Q",
+        y=alt.Y(f"{y}_start:Q", bin="binned", title=y),
+        y2=f"{y}_end:Q",
+        color=alt.Color("count:Q", scale=alt.Scale(scheme="blues"), title="Clients"),
+        tooltip=["count"],
+    )
+
+
+def quantile_chart(table, column, group_col="variation"):
+    # Diagrama de caja construido a partir de los cuantiles ya calculados (no de las filas)
+    base = alt.Chart(table).encode(y=alt.Y(f"{group_col}:N", title=None), color=alt.Color(f"{group_col}:N", legend=None))
+    whiskers = base.mark_rule().encode(x=alt.X("p5:Q", title=column), x2="p95:Q")
+    box = base.mark_bar(size=22).encode(x="p25:Q", x2="p75:Q", tooltip=list(table.columns))
+    median = base.mark_tick(color="white", size=22, thickness=2).encode(x="p50:Q")
+    return whiskers + box + median
+
+
+@shared_resource("charts", "charts.histogram")
+@persistent("charts.histogram", inputs=dataset_inputs, ignore=("version",))
+def _dataset_histogram(name, version, column, group_col, bins, clip_quantile):
+    df = load_dataset(name, columns=[column] + ([group_col] if group_col else []))
+    return histogram_table(df, column, group_col, bins, clip_quantile)
+
+
+def dataset_histogram(name, column, group_col=None, bins=40, clip_quantile=1.0):
+    # Versiones con caché de las tablas anteriores para los datasets del proyecto (una vez por versión del archivo)
+    return _dataset_histogram(name, dataset_version(name), column, group_col, bins, clip_quantile)
+
+
+@shared_resource("charts", "charts.grid")
+@persistent("charts.grid", inputs=dataset_inputs, ignore=("version",))
+def _dataset_grid(name, version, x, y, bins, clip_quantile):
+    return grid_table(load_dataset(name, columns=[x, y]), x, y, bins, clip_quantile)
+
+
+def dataset_grid(name, x, y, bins=(40, 40), clip_quantile=0.99):
+    return _dataset_grid(name, dataset_version(name), x, y, tuple(bins), clip_quantile)
+
+
+@shared_resource("charts", "charts.quantiles")
+@persistent("charts.quantiles", inputs=dataset_inputs, ignore=("version",))
+def _dataset_quantiles(name, version, column, group_col):
+    return quantile_table(load_dataset(name, columns=[column, group_col]), column, group_col)
+
+
+def dataset_quantiles(name, column, group_col="variation"):
+    return _dataset_quantiles(name, dataset_version(name), column, group_col)
@@ -0,0 +1,106 @@
+import argparse
+import hashlib
+import json
+import os
+
+import pyarrow.feather as feather
+
+from utils.datasets import COLUMN_DTYPES, DATASETS, EXACT_DTYPES, dataset_path, read_dataset
+from utils.paths import CACHE_DIR, temp_path
+
+# Copias en formato columnar (Feather/Arrow sin comprimir, se pueden leer con mmap) de los CSV de data/
+# Los CSV originales no se tocan: son los que se siguen descargando en los ZIP
+# Cada dataset tiene dos copias: la de la app (métricas en float32, la mitad de memoria) y la exacta (float64),
+# que es la que leen las exportaciones para que los valores descargados sean los del CSV
+SIDECAR_DIR = CACHE_DIR / "columnar"
+
+
+def sidecar_path(name, exact=False):
+    return SIDECAR_DIR / f"{name}{'.exact' if exact else ''}.feather"
+
+
+def _meta_path(name, exact=False):
+    return SIDECAR_DIR / f"{name}{'.exact' if exact else ''}.json"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_meta(path, sha256=None):
+    stat = os.stat(path)
+    return {
+        "source": os.path.basename(path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": sha256 or file_sha256(path),
+    }
+
+
+def _write_meta(name, meta, exact=False):
+    tmp_path = temp_path(_meta_path(name, exact))
+    tmp_path.write_text(json.dumps(meta))
+    os.replace(tmp_path, _meta_path(name, exact))
+
+
+def is_fresh(name, exact=False):
+    # Comprobación rápida por fecha y tamaño; si la fecha ha cambiado pero el contenido es el mismo
+    # (por ejemplo, tras un git checkout) comparamos el hash y no se regenera
+    if not sidecar_path(name, exact).exists() or not _meta_path(name, exact).exists():
+        return False
+    meta = json.loads(_meta_path(name, exact).read_text())
+    stat = os.stat(dataset_path(name))
+    if stat.st_size != meta["size"]:
+        return False
+    if stat.st_mtime_ns == meta["mtime_ns"]:
+        return True
+    sha256 = file_sha256(dataset_path(name))
+    if sha256 != meta["sha256"]:
+        return False
+    _write_meta(name, _source_meta(dataset_path(name), sha256), exact)
+    return True
+
+
+def build_sidecar(name, exact=False):
+    path = dataset_path(name)
+    SIDECAR_DIR.mkdir(parents=True, exist_ok=True)
+    df = read_dataset(path, EXACT_DTYPES if exact else COLUMN_DTYPES)
+    # Sin compresión para que se pueda leer directamente con mmap
+    tmp_path = temp_path(sidecar_path(name, exact))
+    feather.write_feather(df, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, sidecar_path(name, exact))
+    _write_meta(name, _source_meta(path), exact)
+    return sidecar_path(name, exact)
+
+
+def ensure_sidecar(name, exact=False):
+    if not is_fresh(name, exact):
+        build_sidecar(name, exact)
+    return sidecar_path(name, exact)
+
+
+def read_columns(name, columns=None):
+    # Lee solo las columnas pedidas (None = todas) desde la copia columnar, creándola si falta o está desactualizada
+    path = ensure_sidecar(name)
+    table = feather.read_table(path, columns=list(columns) if columns else None, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+if __name__ == "__main__":
+    # Paso de build: python -m utils.columnar [--force] [dataset ...]
+    parser = argparse.ArgumentParser(description="Build the columnar copies of the project datasets.")
+    parser.add_argument("datasets", nargs="*", help="Datasets to build (default: all)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the copy is up to date")
+    args = parser.parse_args()
+
+    for name in args.datasets or DATASETS:
+        for exact in (False, True):
+            label = f"{name}{' (exact)' if exact else ''}"
+            if args.force or not is_fresh(name, exact):
+                print(f"{label}: built {build_sidecar(name, exact)}")
+            else:
+                print(f"{label}: up to date")
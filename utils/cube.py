@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from scipy import stats as sps
+
+from utils.datasets import dataset_version, load_dataset
+from utils.funnel import events_version, load_client_outcomes, web_event_files
+from utils.resources import shared_resource
+from utils.stats import CONTROL, TEST, welch_from_moments
+from utils.warmcache import dataset_inputs, persistent
+
+# Cubo de agregados para analizar el efecto del Test por segmento de clientes
+# Cada celda es una combinación de variation × dimensiones y guarda, por métrica, n, suma y suma de cuadrados:
+# con eso se puede sumar cualquier corte del cubo y sacar medias, varianzas y tests sin volver a leer los clientes
+
+# Tramos de las dimensiones numéricas (límite izquierdo incluido)
+BUCKETS = {
+    "age": ("clnt_age", [0, 30, 40, 50, 60, 70, np.inf], ["<30", "30-39", "40-49", "50-59", "60-69", "70+"]),
+    "tenure": ("clnt_tenure_yr", [0, 5, 10, 15, 20, np.inf], ["<5y", "5-9y", "10-14y", "15-19y", "20y+"]),
+    "balance": ("bal", [0, 50_000, 100_000, 250_000, 1_000_000, np.inf], ["<50k", "50k-100k", "100k-250k", "250k-1M", "1M+"]),
+}
+
+DIMENSIONS = ["gendr", *BUCKETS]
+
+# Métricas por cliente que se agregan; "completed" solo si hay archivos de eventos web
+MEASURES = ["logons_6_mnth", "calls_6_mnth", "num_accts", "bal"]
+
+# Segmentos con menos clientes que esto en Control o en Test no se testean (la aproximación normal no aguanta)
+MIN_SEGMENT_SIZE = 30
+
+
+def _bucket(values, edges, labels):
+    return pd.cut(values, bins=edges, labels=labels, right=False)
+
+
+def build_cube(df):
+    # Un solo groupby sobre todos los clientes: una fila por celda con n, suma y suma de cuadrados de cada métrica
+    measures = [column for column in [*MEASURES, "completed"] if column in df.columns]
+    keys = {"variation": df["variation"], "gendr": df["gendr"]}
+    for name, (column, edges, labels) in BUCKETS.items():
+        keys[name] = _bucket(df[column], edges, labels)
+    values = df[measures].astype("float64")
+    frame = pd.concat([values.add_suffix("__sum"), (values ** 2).add_suffix("__sumsq"), values.notna().add_suffix("__n")], axis=1)
+    cube = frame.groupby(list(keys.values()), observed=True).sum()
+    cube.index.names = list(keys)
+    for measure in measures:
+        cube[f"{measure}__n"] = cube[f"{measure}__n"].astype("int32")
+    return cube.reset_index()
+
+
+def _cube_inputs(arguments):
+    # El dataset y, si se usan, los archivos de eventos web (la columna completed)
+    return dataset_inputs(arguments) + (web_event_files() if arguments["events"] is not None else [])
+
+
+@shared_resource("charts", "cube.dataset_cube", spinner="Building segment cube...")
+@persistent("cube.dataset_cube", inputs=_cube_inputs, ignore=("version", "events"))
+def _dataset_cube(name, version, events):
+    columns = ["client_id", "variation", "gendr", *[column for column, _, _ in BUCKETS.values()], *MEASURES]
+    df = load_dataset(name, columns=list(dict.fromkeys(columns)))
+    if events is not None:
+        completed = load_client_outcomes()["completed"]
+        df = df.assign(completed=completed.reindex(df["client_id"]).to_numpy(dtype="float64"))
+    return build_cube(df)
+
+
+def dataset_cube(name="clients"):
+    # Cubo del dataset, calculado una vez por versión del dataset (y de los eventos web)
+    return _dataset_cube(name, dataset_version(name), events_version())
+
+
+def cube_measures(cube):
+    return [column[:-len("__sum")] for column in cube.columns if column.endswith("__sum")]
+
+
+def slice_cube(cube, filters=None, by=()):
+    # Corte del cubo: filtra celdas (filters = {dimensión: [valores]}) y suma por las dimensiones de by y variation
+    mask = np.ones(len(cube), dtype=bool)
+    for dimension, values in (filters or {}).items():
+        if values:
+            mask &= cube[dimension].isin(values).to_numpy()
+    cells = cube[mask]
+    if not by:
+        # Sin desglose: un único segmento con todos los clientes del filtro
+        cells, by = cells.assign(segment="All clients"), ["segment"]
+    stats = [column for column in cube.columns if "__" in column]
+    return cells.groupby([*by, "variation"], observed=True)[stats].sum()
+
+
+def segment_lift(sliced, measure, alpha=0.05, min_size=MIN_SEGMENT_SIZE):
+    # Diferencia Test - Control de la media de measure en cada segmento, con Welch a partir de n, suma y suma de cuadrados
+    n = sliced[f"{measure}__n"].astype("float64")
+    total = sliced[f"{measure}__sum"]
+    mean = total / n
+    var = ((sliced[f"{measure}__sumsq"] - total * mean) / (n - 1)).clip(lower=0)
+    table = pd.DataFrame({"n": n, "mean": mean, "var": var}).unstack("variation")
+    # Si en el corte falta uno de los grupos, sus columnas quedan vacías y el segmento no pasa el filtro de tamaño
+    table = table.reindex(columns=pd.MultiIndex.from_product([["n", "mean", "var"], [CONTROL, TEST]]))
+    table = table[(table[("n", CONTROL)] >= min_size) & (table[("n", TEST)] >= min_size)]
+    result = welch_from_moments(
+        table[("n", CONTROL)], table[("mean", CONTROL)], table[("var", CONTROL)],
+        table[("n", TEST)], table[("mean", TEST)], table[("var", TEST)],
+        alpha,
+    )
+    lift = pd.DataFrame({
+        f"n_{CONTROL}": table[("n", CONTROL)].astype("int64"),
+        f"n_{TEST}": table[("n", TEST)].astype("int64"),
+        f"mean_{CONTROL}": table[("mean", CONTROL)],
+        f"mean_{TEST}": table[("mean", TEST)],
+        **{key: result[key] for key in ["diff", "rel_diff", "ci_low", "ci_high", "p_value"]},
+    })
+    # Con muchos segmentos, algunos salen significativos por azar: q-valor de Benjamini-Hochberg
+    lift["q_value"] = sps.false_discovery_control(lift["p_value"].to_numpy()) if len(lift) else []
+    lift["significant"] = lift["q_value"] < alpha
+    return lift
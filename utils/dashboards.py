@@ -0,0 +1,118 @@
+import altair as alt
+import streamlit as st
+
+from utils.charts import histogram_chart, histogram_table, quantile_chart, quantile_table
+from utils.datasets import dataset_version, load_dataset
+from utils.funnel import STEPS
+from utils.resources import shared_resource
+from utils.warmcache import dataset_inputs, persistent
+
+# Dashboards de la página "Interactive Analysis" calculados en local (sin iframes de Tableau)
+# Todos se pintan a partir de tablas ya agregadas y guardadas en caché por versión de los datos
+
+# Colores de Control y Test en todos los gráficos
+VARIATION_COLORS = alt.Scale(domain=["Control", "Test"], range=["#9ec5fe", "#0d6efd"])
+
+
+@shared_resource("charts", "dashboards.demographics_tables")
+@persistent("dashboards.demographics_tables", inputs=dataset_inputs, ignore=("version",))
+def _demographics_tables(name, version):
+    # Todas las tablas del dashboard de demografía de una vez; el navegador solo recibe estas tablas pequeñas
+    df = load_dataset(name, columns=["clnt_age", "clnt_tenure_yr", "gendr", "bal", "variation"])
+    gender = df.groupby(["variation", "gendr"], observed=True).size().rename("clients").reset_index()
+    gender["share"] = gender["clients"] / gender.groupby("variation", observed=True)["clients"].transform("sum")
+    return {
+        "totals": df.groupby("variation", observed=True).agg(
+            clients=("clnt_age", "size"), age=("clnt_age", "mean"), tenure=("clnt_tenure_yr", "mean"), balance=("bal", "median")
+        ),
+        "age": histogram_table(df, "clnt_age", "variation", bins=30),
+        "tenure": histogram_table(df, "clnt_tenure_yr", "variation", bins=30, clip_quantile=0.99),
+        "gender": gender,
+        "balance": quantile_table(df, "bal"),
+    }
+
+
+def demographics_tables(name="clients"):
+    return _demographics_tables(name, dataset_version(name))
+
+
+def demographics_dashboard(name="clients"):
+    tables = demographics_tables(name)
+    totals = tables["totals"]
+    cols = st.columns(4)
+    cols[0].metric("Clients", f"{int(totals['clients'].sum()):,}")
+    cols[1].metric("Control / Test", f"{int(totals.loc['Control', 'clients']):,} / {int(totals.loc['Test', 'clients']):,}")
+    cols[2].metric("Average age", f"{(totals['age'] * totals['clients']).sum() / totals['clients'].sum():.1f}")
+    cols[3].metric("Median balance (Test)", f"{totals.loc['Test', 'balance']:,.0f}")
+
+    left, right = st.columns(2)
+    with left:
+        st.markdown("**Age distribution**")
+        st.altair_chart(histogram_chart(tables["age"], "clnt_age", "variation"), width="stretch")
+        st.markdown("**Gender**")
+        st.altair_chart(
+            alt.Chart(tables["gender"]).mark_bar().encode(
+                x=alt.X("gendr:N", title=None),
+                xOffset="variation:N",
+                y=alt.Y("share:Q", axis=alt.Axis(format="%"), title="Share of group"),
+                color=alt.Color("variation:N", scale=VARIATION_COLORS),
+                tooltip=["variation", "gendr", "clients", alt.Tooltip("share:Q", format=".1%")],
+            ),
+            width="stretch",
+        )
+    with right:
+        st.markdown("**Tenure (years)**")
+        st.altair_chart(histogram_chart(tables["tenure"], "clnt_tenure_yr", "variation"), width="stretch")
+        st.markdown("**Balance (p5–p95)**")
+        st.altair_chart(quantile_chart(tables["balance"], "bal"), width="stretch")
+
+
+def _rate_chart(kpis, column, title):
+    table = kpis[[column]].reset_index()
+    bars = alt.Chart(table).mark_bar(size=60).encode(
+        x=alt.X("variation:N", title=None),
+        y=alt.Y(f"{column}:Q", axis=alt.Axis(format="%"), title=title),
+        color=alt.Color("variation:N", scale=VARIATION_COLORS, legend=None),
+        tooltip=["variation", alt.Tooltip(f"{column}:Q", format=".2%")],
+    )
+    labels = bars.mark_text(dy=-8).encode(text=alt.Text(f"{column}:Q", format=".2%"))
+    return bars + labels
+
+
+def _rate_metrics(results, column):
+    kpis = results["kpis"]
+    test = results["proportions"].loc[column]
+    cols = st.columns(3)
+    cols[0].metric("Control", f"{kpis.loc['Control', column]:.2%}")
+    cols[1].metric("Test", f"{kpis.loc['Test', column]:.2%}", delta=f"{test['diff'] * 100:+.2f} pp")
+    cols[2].metric("p-value", f"{test['p_value']:.4f}")
+
+
+def rate_dashboard(results, column, title):
+    # Dashboard de un KPI de proporción (completion rate, primera vez, errores)
+    _rate_metrics(results, column)
+    st.altair_chart(_rate_chart(results["kpis"], column, title), width="stretch")
+
+
+def time_dashboard(results):
+    times = results["step_times"].reset_index()
+    cols = st.columns(len(STEPS))
+    step_tests = results["step_tests"]
+    for col, step in zip(cols, STEPS):
+        if step in step_tests.index:
+            col.metric(step, f"{step_tests.loc[step, 'diff']:+.1f} s", help=f"Test − Control, p = {step_tests.loc[step, 'p_value']:.4f}")
+    st.altair_chart(
+        alt.Chart(times).mark_bar().encode(
+            x=alt.X("step:N", sort=STEPS, title=None),
+            xOffset="variation:N",
+            y=alt.Y("mean_seconds:Q", title="Average seconds on step"),
+            color=alt.Color("variation:N", scale=VARIATION_COLORS),
+            tooltip=["variation", "step", "count", alt.Tooltip("mean_seconds:Q", format=".1f")],
+        ),
+        width="stretch",
+    )
+
+
+def missing_events_notice():
+    st.info("Add the web event files (df_final_web_data*.txt) to data/raw to compute this dashboard locally.")
+
@@ -0,0 +1,82 @@
+import os
+
+import pandas as pd
+
+from utils.paths import PROCESSED_DIR, RAW_DIR
+from utils.resources import shared_resource
+
+# Datasets del proyecto: cambia los nombres y rutas por los archivos de tu proyecto
+DATASETS = {
+    "clients": PROCESSED_DIR / "df_clients.csv",
+    "networth": PROCESSED_DIR / "df_networth.csv",
+    "demo": RAW_DIR / "df_final_demo.txt",
+    "experiment": RAW_DIR / "df_final_experiment_clients.txt",
+}
+
+# Tipos de cada columna: enteros de 32 bits para los ids, float32 para las métricas y categorías para los textos
+# float32 también admite los nulos y los "6.0" de los archivos raw
+COLUMN_DTYPES = {
+    "client_id": "int32",
+    "clnt_tenure_yr": "float32",
+    "clnt_tenure_mnth": "float32",
+    "clnt_age": "float32",
+    "gendr": "category",
+    "num_accts": "float32",
+    "bal": "float32",
+    "calls_6_mnth": "float32",
+    "logons_6_mnth": "float32",
+    "variation": "category",
+    "Variation": "category",
+}
+
+# Los mismos tipos con las métricas en float64: los valores tal como están en el CSV (para las exportaciones)
+# float32 solo guarda unas 7 cifras significativas: un bal de 406190.96 no se puede representar tal cual
+EXACT_DTYPES = {column: "float64" if dtype == "float32" else dtype for column, dtype in COLUMN_DTYPES.items()}
+
+def dataset_path(name):
+    if name not in DATASETS:
+        raise KeyError(f"Unknown dataset '{name}'. Available: {', '.join(DATASETS)}")
+    return DATASETS[name]
+
+
+def file_version(path):
+    # La versión de un archivo es su fecha de modificación y su tamaño: si cambia, se vuelve a leer
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def dataset_version(name):
+    return file_version(dataset_path(name))
+
+
+def read_dataset(path, column_dtypes=COLUMN_DTYPES):
+    # Lee un CSV aplicando los tipos de column_dtypes (COLUMN_DTYPES o EXACT_DTYPES) a las columnas que existan en el archivo
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {col: column_dtypes[col] for col in header if col in column_dtypes}
+    return pd.read_csv(path, dtype=dtypes)
+
+
+@shared_resource("datasets", "datasets.load_dataset", spinner="Loading dataset...")
+def _load_dataset(name, version, columns):
+    # Se ejecuta una sola vez por versión del archivo (y selección de columnas); el DataFrame se comparte entre todas las sesiones
+    # Las versiones guardadas a la vez dependen del presupuesto del grupo "datasets" (ver utils/resources.py)
+    # Se lee desde la copia columnar de utils/columnar.py y, si pyarrow no está disponible, desde el CSV
+    try:
+        from utils.columnar import read_columns
+    except ImportError:
+        df = read_dataset(dataset_path(name))
+        return df[list(columns)] if columns else df
+    return read_columns(name, columns)
+
+
+def load_dataset(name, columns=None):
+    # Punto de entrada para todas las páginas: nunca volver a leer los CSV con pd.read_csv en app.py
+    # Pide solo las columnas que use la página (columns=["bal", "variation"]) para leer menos datos
+    # Devuelve una copia superficial (no copia los datos): si una página añade o cambia columnas,
+    # el copy-on-write de pandas evita que se modifique el DataFrame compartido
+    columns = tuple(columns) if columns else None
+    return _load_dataset(name, dataset_version(name), columns)
+
+
+def dataset_memory(df):
+    return int(df.memory_usage(deep=True).sum())
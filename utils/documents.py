@@ -0,0 +1,308 @@
+import bisect
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+
+import streamlit as st
+
+from utils.columnar import file_sha256
+from utils.paths import CACHE_DIR, REPORTS_DIR, temp_path
+from utils.probes import cached_probe
+from utils.resampling import get_pool
+
+# Texto, tablas y miniaturas de los PDF de data/reports, extraídos una vez por versión del archivo
+# Cada PDF se guarda en .cache/documents/<sha256>.json (una entrada por página) y el índice de búsqueda en index.json
+# Si un PDF no se puede leer, el error se guarda en <sha256>.failed.json: no se vuelve a intentar hasta que cambie el archivo
+DOCUMENTS_DIR = CACHE_DIR / "documents"
+THUMBNAILS_DIR = DOCUMENTS_DIR / "thumbnails"
+INDEX_PATH = DOCUMENTS_DIR / "index.json"
+
+# Resolución de las miniaturas (puntos por pulgada): 36 da unos 300 px de ancho para un A4
+THUMBNAIL_RESOLUTION = 36
+
+# Caracteres de texto que se muestran alrededor de cada resultado
+SNIPPET_CHARS = 240
+
+_TOKEN = re.compile(r"\w+")
+
+
+def _fold(text):
+    # Minúsculas y sin acentos, carácter a carácter para que las posiciones coincidan con el texto original
+    folded = []
+    for char in text:
+        base = "".join(c for c in unicodedata.normalize("NFKD", char) if not unicodedata.combining(c)).casefold()
+        folded.append(base[:1] or char)
+    return "".join(folded)
+
+
+def tokenize(text):
+    return [token for token in _TOKEN.findall(_fold(text)) if len(token) > 1]
+
+
+def report_files():
+    return sorted(REPORTS_DIR.glob("*.pdf"))
+
+
+@cached_probe("documents.digest", st.cache_data(show_spinner=False))
+def _digest(path, mtime_ns, size):
+    return file_sha256(path)
+
+
+def report_digest(path):
+    # Versión del PDF: hash del contenido (se recalcula solo si cambia la fecha o el tamaño del archivo)
+    stat = os.stat(path)
+    return _digest(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def extraction_path(digest):
+    return DOCUMENTS_DIR / f"{digest}.json"
+
+
+def failure_path(digest):
+    return DOCUMENTS_DIR / f"{digest}.failed.json"
+
+
+def thumbnail_path(digest, page_number):
+    return THUMBNAILS_DIR / f"{digest}-{page_number}.png"
+
+
+def _extract_page(path, page_number, thumbnail):
+    # Se ejecuta en un proceso del pool: texto, tablas y miniatura de una página
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        page = pdf.pages[page_number - 1]
+        text = page.extract_text() or ""
+        tables = [[[cell or "" for cell in row] for row in table] for table in page.extract_tables()]
+        thumbnail.parent.mkdir(parents=True, exist_ok=True)
+        page.to_image(resolution=THUMBNAIL_RESOLUTION).save(thumbnail)
+    return {"page": page_number, "text": text, "tables": tables}
+
+
+def _write_json(path, payload):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(path)
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class ExtractionJob:
+    # Extracción de un PDF: una tarea por página en el pool de procesos; al terminar se guarda el JSON
+
+    def __init__(self, path, digest, n_pages):
+        self.path = path
+        self.digest = digest
+        pool = get_pool()
+        self.futures = [
+            pool.submit(_extract_page, str(path), number, thumbnail_path(digest, number)) for number in range(1, n_pages + 1)
+        ]
+
+    def progress(self):
+        return sum(future.done() for future in self.futures) / len(self.futures) if self.futures else 1
+
+    def finish(self):
+        # Guarda el texto de todas las páginas o, si alguna ha fallado, el archivo como fallido con el error
+        try:
+            pages = [future.result() for future in self.futures]
+        except BrokenProcessPool:
+            # El fallo es del pool, no del PDF: no se guarda nada y se vuelve a intentar en la siguiente visita
+            get_pool.clear()
+            return
+        except Exception as error:
+            _record_failure(self.path, self.digest, error)
+            return
+        _write_json(extraction_path(self.digest), {"file": self.path.name, "digest": self.digest, "pages": pages})
+
+
+def _record_failure(path, digest, error):
+    _write_json(failure_path(digest), {"file": path.name, "digest": digest, "error": f"{type(error).__name__}: {error}"})
+
+
+class ExtractionRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+
+@st.cache_resource
+def get_extraction_registry():
+    return ExtractionRegistry()
+
+
+def pending_reports():
+    # PDF cuya versión actual aún no está extraída (ni ha fallado)
+    return [
+        (path, digest) for path in report_files()
+        if not extraction_path(digest := report_digest(path)).exists() and not failure_path(digest).exists()
+    ]
+
+
+def failed_reports():
+    # PDF cuya versión actual no se ha podido extraer: [{"file", "digest", "error"}]
+    return [
+        json.loads(failure_path(digest).read_text(encoding="utf-8"))
+        for path in report_files() if failure_path(digest := report_digest(path)).exists()
+    ]
+
+
+def _page_count(path):
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def start_extraction():
+    # Lanza en segundo plano la extracción de los PDF nuevos o modificados (los que ya están en disco no se repiten)
+    # Solo se guarda como fallido el PDF que no se puede abrir; si falla el pool, se vuelve a intentar en la siguiente visita
+    registry = get_extraction_registry()
+    with registry.lock:
+        for path, digest in pending_reports():
+            if digest in registry.jobs:
+                continue
+            try:
+                n_pages = _page_count(path)
+            except Exception as error:
+                _record_failure(path, digest, error)
+                continue
+            try:
+                registry.jobs[digest] = ExtractionJob(path, digest, n_pages)
+            except RuntimeError:
+                # Pool roto (BrokenProcessPool) o cerrado: el siguiente intento crea otro
+                get_pool.clear()
+                return
+
+
+def extraction_progress():
+    # Fracción de páginas extraídas de los trabajos en curso; None si no queda ninguno
+    # Los trabajos terminados se guardan en disco aquí
+    registry = get_extraction_registry()
+    with registry.lock:
+        for digest, job in list(registry.jobs.items()):
+            if job.progress() == 1:
+                del registry.jobs[digest]
+                job.finish()
+        if not registry.jobs:
+            return None
+        futures = [future for job in registry.jobs.values() for future in job.futures]
+    return sum(future.done() for future in futures) / len(futures)
+
+
+class DocumentIndex:
+    # Índice invertido por página: término -> [(documento, página, apariciones)]
+
+    def __init__(self, documents, postings):
+        self.documents = documents
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+        self.n_pages = sum(len(document["pages"]) for document in documents)
+
+    @classmethod
+    def build(cls, documents):
+        postings = {}
+        for doc_id, document in enumerate(documents):
+            for page in document["pages"]:
+                table_text = " ".join(cell for table in page["tables"] for row in table for cell in row)
+                for term, count in Counter(tokenize(f"{page['text']} {table_text}")).items():
+                    postings.setdefault(term, []).append((doc_id, page["page"], count))
+        return cls(documents, postings)
+
+    def _matching_terms(self, token):
+        # Términos que empiezan por token (así "conver" encuentra "conversion" y "conversión")
+        start = bisect.bisect_left(self.vocabulary, token)
+        end = bisect.bisect_left(self.vocabulary, token + "\uffff")
+        return self.vocabulary[start:end]
+
+    def search(self, query, limit=10):
+        # Páginas que contienen todas las palabras de la búsqueda, ordenadas por tf-idf
+        scores = None
+        for token in tokenize(query):
+            token_scores = Counter()
+            for term in self._matching_terms(token):
+                idf = math.log(1 + self.n_pages / len(self.postings[term]))
+                for doc_id, page, count in self.postings[term]:
+                    token_scores[(doc_id, page)] += count * idf
+            scores = token_scores if scores is None else Counter({key: scores[key] + value for key, value in token_scores.items() if key in scores})
+        if not scores:
+            return []
+        return [
+            {"file": self.documents[doc_id]["file"], "digest": self.documents[doc_id]["digest"], "page": page, "score": score}
+            for (doc_id, page), score in scores.most_common(limit)
+        ]
+
+    def page(self, digest, page_number):
+        for document in self.documents:
+            if document["digest"] == digest:
+                return document["pages"][page_number - 1]
+        raise KeyError(digest)
+
+    def snippet(self, digest, page_number, query):
+        # Fragmento del texto de la página alrededor de la primera coincidencia, con las palabras en negrita
+        text = self.page(digest, page_number)["text"]
+        folded = _fold(text)
+        tokens = tokenize(query)
+        positions = [match for match in _TOKEN.finditer(folded) if any(match.group().startswith(token) for token in tokens)]
+        if not positions:
+            return text[:SNIPPET_CHARS]
+        start = max(0, positions[0].start() - SNIPPET_CHARS // 3)
+        end = min(len(text), start + SNIPPET_CHARS)
+        pieces, cursor = [], start
+        for match in positions:
+            if match.start() < start or match.end() > end:
+                continue
+            pieces.append(text[cursor:match.start()])
+            pieces.append(f"**{text[match.start():match.end()]}**")
+            cursor = match.end()
+        pieces.append(text[cursor:end])
+        body = "".join(pieces).replace("\n", " ")
+        return ("…" if start > 0 else "") + body + ("…" if end < len(text) else "")
+
+
+def _build_index(signature):
+    documents = [json.loads(extraction_path(digest).read_text(encoding="utf-8")) for _, digest in signature]
+    index = DocumentIndex.build(documents)
+    _write_json(INDEX_PATH, {"signature": signature, "documents": documents, "postings": index.postings})
+    return index
+
+
+@cached_probe("documents.load_index", st.cache_resource(show_spinner=False, max_entries=2))
+def _load_index(signature):
+    # El índice en disco se reutiliza si corresponde a las mismas versiones de los PDF; si no, se reconstruye
+    if INDEX_PATH.exists():
+        stored = json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+        if [tuple(item) for item in stored["signature"]] == list(signature):
+            postings = {term: [tuple(entry) for entry in entries] for term, entries in stored["postings"].items()}
+            return DocumentIndex(stored["documents"], postings)
+    return _build_index([list(item) for item in signature])
+
+
+def load_index():
+    # Índice de los PDF ya extraídos (los que aún se están extrayendo no aparecen)
+    signature = tuple(
+        (path.name, digest) for path in report_files() if extraction_path(digest := report_digest(path)).exists()
+    )
+    if not signature:
+        return None
+    return _load_index(signature)
+
+
+if __name__ == "__main__":
+    # python -m utils.documents: extrae los PDF nuevos de data/reports y reconstruye el índice
+    import time
+
+    start_extraction()
+    while (progress := extraction_progress()) is not None:
+        print(f"Extracting pages... {progress:.0%}")
+        time.sleep(0.5)
+    for failure in failed_reports():
+        print(f"Could not extract {failure['file']}: {failure['error']}")
+    index = load_index()
+    if index is None:
+        print(f"No PDF files in {REPORTS_DIR}")
+    else:
+        print(f"Indexed {len(index.documents)} documents, {index.n_pages} pages, {len(index.vocabulary)} terms")
@@ -0,0 +1,107 @@
+import mmap
+import os
+import threading
+
+import streamlit as st
+
+from utils.resources import shared_resource
+
+# Streamlit guarda el contenido de cada descarga en memoria (st.download_button lo pide como bytes), así que un
+# archivo se lee entero al hacer clic; lo que se evita es leerlo en cada ejecución de la página
+
+# Los archivos de hasta este tamaño (los PDF) se leen una vez y se sirven a todas las sesiones desde memoria
+# (grupo "reports" de utils/resources.py); los más grandes se leen del disco en cada descarga
+SHARED_FILE_MAX_BYTES = 16 * 1024 * 1024
+
+# Cada cuántos segundos se actualiza el resumen de bytes descargados en la visita
+SUMMARY_REFRESH_SECONDS = 2
+
+_counter_lock = threading.Lock()
+
+
+def _read_file(path):
+    # Una sola copia del archivo: el slice de la vista mmap ya es el objeto bytes que se sirve
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            # mmap no admite archivos vacíos
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return view[:]
+
+
+def reset_visit_counter():
+    # Se llama al salir de la página de descargas: cada visita empieza a contar desde cero
+    st.session_state["download_bytes"] = {"served": 0, "files": {}}
+
+
+def _visit_counter():
+    if "download_bytes" not in st.session_state:
+        reset_visit_counter()
+    return st.session_state["download_bytes"]
+
+
+def _count_bytes(counter, file_name, n):
+    # Las descargas se generan fuera del script (al hacer clic), por eso guardamos el dict y no session_state
+    with _counter_lock:
+        counter["served"] += n
+        counter["files"][file_name] = counter["files"].get(file_name, 0) + n
+
+
+@shared_resource("reports", "downloads.file_bytes")
+def _shared_file_bytes(path, version):
+    return _read_file(path)
+
+
+def _serve_file(path, counter, file_name):
+    stat = os.stat(path)
+    if stat.st_size <= SHARED_FILE_MAX_BYTES:
+        payload = _shared_file_bytes(os.fspath(path), (stat.st_mtime_ns, stat.st_size))
+    else:
+        payload = _read_file(path)
+    _count_bytes(counter, file_name, len(payload))
+    return payload
+
+
+def file_download_button(label, path, file_name, mime, **kwargs):
+    # Botón de descarga de un archivo del disco: no se lee nada hasta que el usuario hace clic
+    counter = _visit_counter()
+
+    def open_file():
+        return _serve_file(path, counter, file_name)
+
+    return st.download_button(label=label, data=open_file, file_name=file_name, mime=mime, on_click="ignore", **kwargs)
+
+
+def lazy_download_button(label, produce, file_name, mime, **kwargs):
+    # Botón de descarga cuyo contenido se genera al hacer clic
+    # produce() puede devolver bytes (se sirven tal cual) o la ruta de un archivo (se sirve como en file_download_button)
+    counter = _visit_counter()
+
+    def build():
+        payload = produce()
+        if isinstance(payload, bytes):
+            _count_bytes(counter, file_name, len(payload))
+            return payload
+        return _serve_file(payload, counter, file_name)
+
+    return st.download_button(label=label, data=build, file_name=file_name, mime=mime, on_click="ignore", **kwargs)
+
+
+def format_bytes(n):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def visit_bytes_summary():
+    # Texto con los bytes servidos durante la visita actual a la página
+    counter = _visit_counter()
+    with _counter_lock:
+        served = counter["served"]
+        files = dict(counter["files"])
+    if not files:
+        return "No files have been downloaded during this visit."
+    detail = ", ".join(f"{name}: {format_bytes(size)}" for name, size in files.items())
+    return f"Data served during this visit: {format_bytes(served)} ({detail})"
+
@@ -0,0 +1,383 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+import streamlit as st
+
+from utils.datasets import DATASETS
+from utils.paths import CACHE_DIR, temp_path
+
+# Paso raw -> processed: df_clients y df_networth se generan a partir de df_final_demo y df_final_experiment_clients
+# - df_clients: clientes de la demo que están en el experimento (con Variation), unidos por client_id,
+#   sin las filas que no tienen ningún dato demográfico y con la edad que falta rellenada con la media de los clientes
+# - df_networth: df_clients sin los saldos atípicos (bal por encima de Q3 + 1.5 * IQR)
+# Si a los archivos raw solo se les han añadido filas al final, solo se procesan esas filas nuevas
+# Solo se reescriben los archivos processed que ha escrito el propio ETL (lo dice el estado guardado): si se han
+# sustituido o editado a mano (como explica el README), se dejan como están y se avisa
+
+# Estado de la última ejecución y copias de los raw ordenadas por client_id (el índice para unir las filas nuevas)
+ETL_DIR = CACHE_DIR / "etl"
+STATE_PATH = ETL_DIR / "state.json"
+
+# Cambia este número si cambian las reglas de abajo: obliga a reconstruir todo
+ETL_VERSION = 1
+
+SOURCES = ["demo", "experiment"]
+OUTPUTS = ["clients", "networth"]
+
+# Columnas que necesita el ETL en cada raw; si falta alguna no se toca data/processed
+REQUIRED_COLUMNS = {
+    "demo": ["client_id", "clnt_age", "bal"],
+    "experiment": ["client_id", "Variation"],
+}
+
+# Columnas que se escriben como enteros (en los raw vienen como "6.0")
+INTEGER_COLUMNS = ["clnt_tenure_yr", "clnt_tenure_mnth", "num_accts", "calls_6_mnth", "logons_6_mnth"]
+
+# Multiplicador del rango intercuartílico para el límite de saldos atípicos de df_networth
+IQR_FACTOR = 1.5
+
+_lock = threading.Lock()
+
+
+def _index_path(source):
+    return ETL_DIR / f"{source}.feather"
+
+
+def _read_csv(data, header=True, names=None):
+    # Los raw se leen sin tipos especiales: client_id entero, el resto como venga (float con NaN, texto)
+    return pd.read_csv(data, header=0 if header else None, names=names, dtype={"client_id": "int64"})
+
+
+def _read_source(source):
+    columns = list(pd.read_csv(DATASETS[source], nrows=0).columns)
+    missing = [column for column in REQUIRED_COLUMNS[source] if column not in columns]
+    if missing:
+        raise ValueError(f"{DATASETS[source].name} has no column {', '.join(missing)}")
+    return _read_csv(DATASETS[source])
+
+
+def _prefix_digest(path, size):
+    # sha256 de los primeros size bytes (el objeto, para poder seguir añadiendo bytes sin volver a leer el archivo)
+    digest = hashlib.sha256()
+    remaining = size
+    with open(path, "rb") as f:
+        while remaining:
+            block = f.read(min(remaining, 1024 * 1024))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest
+
+
+def _file_state(path, digest=None):
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        f.seek(max(stat.st_size - 1, 0))
+        last_byte = f.read(1)
+    digest = digest or _prefix_digest(path, stat.st_size)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest(), "ends_with_newline": last_byte == b"\n"}
+
+
+def source_versions():
+    # Versión de los raw (fecha y tamaño): si cambia, hay que volver a ejecutar el ETL
+    return tuple((os.stat(DATASETS[source]).st_mtime_ns, os.stat(DATASETS[source]).st_size) for source in SOURCES)
+
+
+def _load_state():
+    if not STATE_PATH.exists():
+        return None
+    state = json.loads(STATE_PATH.read_text())
+    return state if state.get("version") == ETL_VERSION else None
+
+
+def _save_state(state):
+    ETL_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(STATE_PATH)
+    tmp_path.write_text(json.dumps(state, indent=2))
+    os.replace(tmp_path, STATE_PATH)
+
+
+def _sorted_index(df):
+    # Copia ordenada por client_id: las búsquedas de client_id son np.searchsorted sobre esta columna
+    return df.sort_values("client_id", kind="stable", ignore_index=True)
+
+
+def _write_index(source, df):
+    ETL_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(_index_path(source))
+    feather.write_feather(df, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, _index_path(source))
+
+
+def _lookup(index, client_ids):
+    # Posición de cada client_id en el índice ordenado (-1 si no está)
+    keys = index["client_id"].to_numpy()
+    positions = np.searchsorted(keys, client_ids)
+    found = positions < len(keys)
+    found[found] = keys[positions[found]] == client_ids[found]
+    return np.where(found, positions, -1)
+
+
+def _join(demo_rows, experiment_index):
+    # Filas de la demo (en su orden) con la Variation de su cliente; las que no están en el experimento se descartan
+    positions = _lookup(experiment_index, demo_rows["client_id"].to_numpy())
+    matched = demo_rows[positions >= 0].reset_index(drop=True)
+    matched["variation"] = experiment_index["Variation"].to_numpy()[positions[positions >= 0]]
+    return _clean(matched)
+
+
+def _clean(joined):
+    demo_columns = [column for column in joined.columns if column not in ("client_id", "variation")]
+    joined = joined[joined["variation"].notna()]
+    joined = joined.dropna(subset=demo_columns, how="all")
+    return joined.astype({column: "Int64" for column in INTEGER_COLUMNS if column in joined.columns}).reset_index(drop=True)
+
+
+def _age_totals(clients):
+    ages = clients["clnt_age"].dropna()
+    return {"sum": float(ages.sum()), "count": int(len(ages))}
+
+
+def _impute_age(clients, totals):
+    # La edad que falta se rellena con la media de todos los clientes con edad (los anteriores y los nuevos)
+    # En una ejecución incremental las filas ya escritas no se tocan: conservan la media de cuando se procesaron
+    if not totals["count"] or not clients["clnt_age"].isna().any():
+        return clients
+    return clients.assign(clnt_age=clients["clnt_age"].fillna(totals["sum"] / totals["count"]))
+
+
+def networth_fence(clients):
+    q1, q3 = clients["bal"].quantile([0.25, 0.75])
+    return float(q3 + IQR_FACTOR * (q3 - q1))
+
+
+def _networth(clients, fence):
+    return clients[clients["bal"] <= fence]
+
+
+def _csv_bytes(df, header=True):
+    return df.to_csv(index=False, header=header).encode()
+
+
+def _replace_if_changed(path, payload):
+    # No reescribe el archivo si el contenido es el mismo (así no cambia su fecha ni se invalidan las cachés)
+    if path.exists() and path.stat().st_size == len(payload) and path.read_bytes() == payload:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(path)
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _output_state(path, rows):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "rows": rows}
+
+
+def _build():
+    # df_clients, df_networth y todo lo que se guarda del ETL, sin escribir nada
+    demo = _read_source("demo")
+    experiment = _read_source("experiment")
+    if demo["client_id"].duplicated().any() or experiment["client_id"].duplicated().any():
+        raise ValueError("client_id must be unique in the raw files")
+    experiment_index = _sorted_index(experiment)
+    clients = _join(demo, experiment_index)
+    age = _age_totals(clients)
+    clients = _impute_age(clients, age)
+    fence = networth_fence(clients)
+    networth = _networth(clients, fence)
+    return {"demo": demo, "experiment_index": experiment_index, "clients": clients, "networth": networth, "fence": fence, "age": age}
+
+
+def _write_build(build, mode):
+    clients, networth = build["clients"], build["networth"]
+    _replace_if_changed(DATASETS["clients"], _csv_bytes(clients))
+    _replace_if_changed(DATASETS["networth"], _csv_bytes(networth))
+    _write_index("demo", _sorted_index(build["demo"]))
+    _write_index("experiment", build["experiment_index"])
+    _write_index("clients", clients[["client_id", "bal"]])
+    _save_state({
+        "version": ETL_VERSION,
+        "owned": True,
+        "sources": {source: _file_state(DATASETS[source]) for source in SOURCES},
+        "outputs": {"clients": _output_state(DATASETS["clients"], len(clients)), "networth": _output_state(DATASETS["networth"], len(networth))},
+        "fence": build["fence"],
+        "age": build["age"],
+    })
+    return {"mode": mode, "clients": len(clients), "networth": len(networth), "new_clients": len(clients)}
+
+
+def full_build():
+    return _write_build(_build(), "full")
+
+
+def _outputs_stat():
+    return {output: _output_state(DATASETS[output], None) if DATASETS[output].exists() else None for output in OUTPUTS}
+
+
+def _keep_outputs(reason):
+    # Los processed no los ha escrito el ETL: se guardan su tamaño y fecha para no volver a comprobarlos en cada arranque
+    _save_state({"version": ETL_VERSION, "owned": False, "outputs": _outputs_stat(), "reason": reason})
+    return {"mode": "kept", "reason": reason, "clients": None, "networth": None, "new_clients": 0}
+
+
+def _adopt_outputs():
+    # Primera ejecución con archivos processed ya en la carpeta (por ejemplo, los del repo tras un git clone):
+    # si son exactamente lo que generaría el ETL, se adoptan; si no, son de otra persona y no se tocan
+    build = _build()
+    for output in OUTPUTS:
+        if DATASETS[output].read_bytes() != _csv_bytes(build[output]):
+            return _keep_outputs(f"{DATASETS[output].name} was not built from data/raw")
+    return _write_build(build, "adopted")
+
+
+def _appended_rows(source, previous):
+    # Filas añadidas al final del raw desde la última ejecución y el nuevo estado del archivo
+    # None si el archivo ha cambiado de otra forma (se ha editado o borrado algo de lo anterior)
+    path = DATASETS[source]
+    if os.stat(path).st_size < previous["size"]:
+        return None
+    digest = _prefix_digest(path, previous["size"])
+    if digest.hexdigest() != previous["sha256"]:
+        return None
+    with open(path, "rb") as f:
+        f.seek(previous["size"])
+        tail = f.read()
+    if not previous["ends_with_newline"] and not tail.startswith(b"\n"):
+        # La última fila anterior se ha alargado: no es solo un añadido
+        return None
+    digest.update(tail)
+    if not tail.strip():
+        rows = pd.read_csv(path, nrows=0, dtype={"client_id": "int64"})
+    else:
+        rows = _read_csv(io.BytesIO(tail), header=False, names=list(pd.read_csv(path, nrows=0).columns))
+    return rows, _file_state(path, digest)
+
+
+def _outputs_untouched(state):
+    # Los processed siguen siendo los que se guardaron en el estado (mismo tamaño y fecha)
+    current = _outputs_stat()
+    return all(
+        current[output] is not None and saved is not None
+        and (current[output]["size"], current[output]["mtime_ns"]) == (saved["size"], saved["mtime_ns"])
+        for output, saved in state["outputs"].items()
+    )
+
+
+def incremental_build(state):
+    # Une solo las filas nuevas: las de la demo contra todo el experimento y las del experimento contra la demo anterior
+    appended = {source: _appended_rows(source, state["sources"][source]) for source in SOURCES}
+    if any(result is None for result in appended.values()):
+        return None
+    if not all(_index_path(name).exists() for name in ["demo", "experiment", "clients"]):
+        return None
+    new = {source: rows for source, (rows, _) in appended.items()}
+    demo_index = feather.read_feather(_index_path("demo"))
+    experiment_index = feather.read_feather(_index_path("experiment"))
+    for source, index in (("demo", demo_index), ("experiment", experiment_index)):
+        ids = new[source]["client_id"].to_numpy()
+        if pd.Series(ids).duplicated().any() or (_lookup(index, ids) >= 0).any():
+            # Un client_id repetido es una corrección de una fila anterior, no un añadido
+            return None
+
+    experiment_all = _sorted_index(pd.concat([experiment_index, new["experiment"]], ignore_index=True))
+    from_demo = _join(new["demo"], experiment_all)
+    old_positions = _lookup(demo_index, new["experiment"]["client_id"].to_numpy())
+    old_demo_rows = demo_index.iloc[old_positions[old_positions >= 0]]
+    from_experiment = _join(old_demo_rows.reset_index(drop=True), _sorted_index(new["experiment"]))
+    delta = pd.concat([from_demo, from_experiment], ignore_index=True)
+    delta_age = _age_totals(delta)
+    age = {"sum": state["age"]["sum"] + delta_age["sum"], "count": state["age"]["count"] + delta_age["count"]}
+    delta = _impute_age(delta, age)
+
+    clients_index = pd.concat([feather.read_feather(_index_path("clients")), delta[["client_id", "bal"]]], ignore_index=True)
+    fence = networth_fence(clients_index)
+    if len(delta):
+        with open(DATASETS["clients"], "ab") as f:
+            f.write(_csv_bytes(delta, header=False))
+    # df_networth: si el nuevo límite de saldos deja dentro o fuera a algún cliente anterior, se reescribe entero
+    # (un filtro sobre df_clients, sin volver a unir nada); si no, solo se añaden los clientes nuevos que lo cumplen
+    low, high = sorted([state["fence"], fence])
+    old_bal = clients_index["bal"].to_numpy()[: len(clients_index) - len(delta)]
+    if np.any((old_bal > low) & (old_bal <= high)):
+        clients = pd.read_csv(DATASETS["clients"], dtype={column: "Int64" for column in INTEGER_COLUMNS})
+        networth_rows = len(_networth(clients, fence))
+        _replace_if_changed(DATASETS["networth"], _csv_bytes(_networth(clients, fence)))
+    else:
+        delta_networth = _networth(delta, fence)
+        if len(delta_networth):
+            with open(DATASETS["networth"], "ab") as f:
+                f.write(_csv_bytes(delta_networth, header=False))
+        networth_rows = state["outputs"]["networth"]["rows"] + len(delta_networth)
+
+    _write_index("demo", _sorted_index(pd.concat([demo_index, new["demo"]], ignore_index=True)))
+    _write_index("experiment", experiment_all)
+    _write_index("clients", clients_index)
+    clients_rows = state["outputs"]["clients"]["rows"] + len(delta)
+    _save_state({
+        "version": ETL_VERSION,
+        "sources": {source: source_state for source, (_, source_state) in appended.items()},
+        "outputs": {"clients": _output_state(DATASETS["clients"], clients_rows), "networth": _output_state(DATASETS["networth"], networth_rows)},
+        "fence": fence,
+        "age": age,
+    })
+    return {"mode": "incremental", "clients": clients_rows, "networth": networth_rows, "new_clients": len(delta)}
+
+
+def run_etl(full=False):
+    # Ejecuta lo mínimo necesario: nada si los raw no han cambiado, solo las filas nuevas si se han añadido, o todo
+    # full=True reconstruye los processed aunque no los haya escrito el ETL (python -m utils.etl --full)
+    with _lock:
+        if full:
+            return full_build()
+        state = _load_state()
+        if state is None or (not state.get("owned", True) and not _outputs_untouched(state)):
+            if not any(DATASETS[output].exists() for output in OUTPUTS):
+                return full_build()
+            return _adopt_outputs()
+        if not state.get("owned", True):
+            return {"mode": "kept", "reason": state["reason"], "clients": None, "networth": None, "new_clients": 0}
+        if not _outputs_untouched(state):
+            return _keep_outputs("data/processed was edited after the last ETL run")
+        current = {source: os.stat(DATASETS[source]) for source in SOURCES}
+        if all((stat.st_size, stat.st_mtime_ns) == (state["sources"][source]["size"], state["sources"][source]["mtime_ns"])
+               for source, stat in current.items()):
+            return {"mode": "up to date", "clients": state["outputs"]["clients"]["rows"], "networth": state["outputs"]["networth"]["rows"], "new_clients": 0}
+        result = incremental_build(state)
+        if result is not None:
+            return result
+        return full_build()
+
+
+@st.cache_resource(show_spinner="Updating processed data...")
+def _refresh(versions):
+    return run_etl()
+
+
+def refresh_processed_data():
+    # Se llama al arrancar la app: solo hace algo (una vez por proceso) cuando cambian los archivos raw
+    # Devuelve mode "kept" (con reason) si los processed no son del ETL y se han dejado como estaban
+    if not all(DATASETS[source].exists() for source in SOURCES):
+        return None
+    return _refresh(source_versions())
+
+
+if __name__ == "__main__":
+    # python -m utils.etl          procesa lo que haya cambiado en data/raw
+    # python -m utils.etl --full   reconstruye df_clients y df_networth desde cero
+    parser = argparse.ArgumentParser(description="Build data/processed from data/raw (incrementally when rows were appended).")
+    parser.add_argument("--full", action="store_true", help="Rebuild everything instead of processing only the new rows")
+    args = parser.parse_args()
+    result = run_etl(full=args.full)
+    if result["mode"] == "kept":
+        raise SystemExit(f"{result['reason']}: data/processed was left as is (use --full to rebuild it from data/raw)")
+    print(f"{result['mode']}: {result['new_clients']:,} new clients, df_clients {result['clients']:,} rows, df_networth {result['networth']:,} rows")
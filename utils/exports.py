@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from utils.columnar import ensure_sidecar
+from utils.datasets import dataset_version
+from utils.paths import CACHE_DIR, temp_path
+from utils.resources import shared_resource
+
+# Exportaciones a medida: columnas y filtros elegidos por el usuario sobre la copia columnar exacta de utils/columnar.py
+# (métricas en float64: los valores exportados son los del CSV, no los de la copia en float32 que usa la app)
+# El filtro se evalúa bloque a bloque leyendo solo las columnas que usa (mmap, sin cargar el archivo), y solo las
+# filas que lo cumplen se convierten al formato de salida y se escriben por bloques: el coste de CSV/compresión
+# depende del tamaño del corte, no del dataset
+
+# Carpeta de las exportaciones generadas (cada una con un nombre que depende de su contenido)
+EXPORTS_DIR = CACHE_DIR / "exports"
+
+# Número de exportaciones que se guardan en disco; las más antiguas se borran
+MAX_EXPORTS = 20
+
+# Filas por bloque al leer y escribir
+CHUNK_ROWS = 64 * 1024
+
+# Formatos de salida: extensión, compresión del flujo (CSV) y tipo MIME
+EXPORT_FORMATS = {
+    "CSV": {"extension": ".csv", "compression": None, "mime": "text/csv"},
+    "CSV (gzip)": {"extension": ".csv.gz", "compression": "gzip", "mime": "application/gzip"},
+    "CSV (zstd)": {"extension": ".csv.zst", "compression": "zstd", "mime": "application/zstd"},
+    "Parquet": {"extension": ".parquet", "compression": None, "mime": "application/vnd.apache.parquet"},
+}
+
+# Operadores de los filtros: (columna, operador, valor); "in" recibe una tupla de valores
+FILTER_OPS = {
+    "==": lambda field, value: field == value,
+    "!=": lambda field, value: field != value,
+    "<": lambda field, value: field < value,
+    "<=": lambda field, value: field <= value,
+    ">": lambda field, value: field > value,
+    ">=": lambda field, value: field >= value,
+    "in": lambda field, value: field.isin(list(value)),
+}
+
+
+def _dataset(name):
+    return ds.dataset(ensure_sidecar(name, exact=True), format="ipc")
+
+
+def filter_expression(filters):
+    # Une los filtros con AND; None si no hay ninguno
+    expression = None
+    for column, op, value in filters:
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unknown filter operator '{op}'. Available: {', '.join(FILTER_OPS)}")
+        condition = FILTER_OPS[op](ds.field(column), value)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+@shared_resource("charts", "exports.column_summary")
+def _column_summary(name, version):
+    # Tipo de cada columna, mínimo y máximo de las numéricas y valores de las categóricas (para los controles de filtro)
+    dataset = _dataset(name)
+    summary = {}
+    for field in dataset.schema:
+        column = dataset.to_table(columns=[field.name]).column(field.name)
+        if pa.types.is_dictionary(field.type) or pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            values = pc.unique(column.cast(pa.string()) if pa.types.is_dictionary(field.type) else column)
+            summary[field.name] = {"kind": "category", "values": sorted(value for value in values.to_pylist() if value is not None)}
+        elif pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+            bounds = pc.min_max(column).as_py()
+            summary[field.name] = {"kind": "number", "min": bounds["min"], "max": bounds["max"]}
+        else:
+            summary[field.name] = {"kind": "other"}
+    return summary
+
+
+def column_summary(name):
+    return _column_summary(name, dataset_version(name))
+
+
+def count_matching(name, filters):
+    # Filas que cumplen los filtros (solo lee las columnas de los filtros)
+    return _dataset(name).count_rows(filter=filter_expression(filters))
+
+
+def _scanner(name, columns, filters):
+    return _dataset(name).scanner(columns=list(columns), filter=filter_expression(filters), batch_size=CHUNK_ROWS)
+
+
+def _write_csv(scanner, path, compression):
+    # El flujo de salida comprime al vuelo: no se guarda el CSV completo en memoria
+    options = pa_csv.WriteOptions(quoting_style="needed")
+    with pa.CompressedOutputStream(path, compression) if compression else pa.OSFile(os.fspath(path), "wb") as out:
+        with pa_csv.CSVWriter(out, scanner.projected_schema, write_options=options) as writer:
+            rows = 0
+            for batch in scanner.to_batches():
+                if batch.num_rows:
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+    return rows
+
+
+def _write_parquet(scanner, path):
+    rows = 0
+    with pq.ParquetWriter(path, scanner.projected_schema, compression="zstd") as writer:
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    return rows
+
+
+def export_key(name, version, columns, filters, export_format):
+    payload = json.dumps([name, list(version), list(columns), [list(f) for f in filters], export_format], default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def _remove_old_exports(keep=MAX_EXPORTS):
+    # Los temporales son exportaciones que otra sesión está escribiendo: no se tocan
+    files = [path for path in EXPORTS_DIR.glob("export-*") if path.suffix != ".tmp"]
+    files.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in files[keep:]:
+        path.unlink(missing_ok=True)
+
+
+# Sin spinner: la exportación se pide al hacer clic en la descarga, fuera de la ejecución del script
+# Solo se guarda la ruta: el archivo está en disco y se lee al servir la descarga (ver utils/downloads.py)
+@shared_resource("archives", "exports.build_export")
+def _build_export(name, version, columns, filters, export_format):
+    spec = EXPORT_FORMATS[export_format]
+    path = EXPORTS_DIR / f"export-{name}-{export_key(name, version, columns, filters, export_format)}{spec['extension']}"
+    if not path.exists():
+        EXPORTS_DIR.mkdir(parents=True, exist_ok=True)
+        # Escribimos en un temporal y lo renombramos para no servir nunca un archivo a medias
+        tmp_path = temp_path(path)
+        scanner = _scanner(name, columns, filters)
+        if export_format == "Parquet":
+            _write_parquet(scanner, tmp_path)
+        else:
+            _write_csv(scanner, tmp_path, spec["compression"])
+        os.replace(tmp_path, path)
+        _remove_old_exports()
+    else:
+        # Reutilizada: cuenta como reciente para no borrarla la primera
+        os.utime(path)
+    return str(path)
+
+
+def build_export(name, columns, filters=(), export_format="CSV"):
+    # Ruta del archivo con las columnas y las filas elegidas; filters: [("variation", "in", ("Test",)), ("bal", ">", 100000)]
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}'. Available: {', '.join(EXPORT_FORMATS)}")
+    columns = tuple(columns)
+    filters = tuple((column, op, tuple(value) if isinstance(value, (list, tuple)) else value) for column, op, value in filters)
+    path = _build_export(name, dataset_version(name), columns, filters, export_format)
+    if not os.path.exists(path):
+        # Alguien ha borrado la caché en disco: la regeneramos
+        _build_export.clear()
+        path = _build_export(name, dataset_version(name), columns, filters, export_format)
+    return path
+
+
+if __name__ == "__main__":
+    # Prueba rápida: clientes del grupo Test mayores de 50 con bal > 100k, en CSV comprimido con zstd
+    start = time.perf_counter()
+    path = build_export(
+        "clients", ["client_id", "clnt_age", "bal", "variation"],
+        [("variation", "in", ("Test",)), ("clnt_age", ">", 50), ("bal", ">", 100_000)], "CSV (zstd)",
+    )
+    print(f"{path} ({os.path.getsize(path):,} bytes) in {time.perf_counter() - start:.2f} s")
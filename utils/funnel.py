@@ -0,0 +1,332 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.datasets import load_dataset
+from utils.paths import CACHE_DIR, RAW_DIR, temp_path
+from utils.probes import cached_probe
+from utils.stats import CONTROL, TEST, two_proportion_ztest, welch_from_moments
+
+# Pasos del proceso en orden: volver a un paso anterior dentro de la misma visita cuenta como error
+STEPS = ["start", "step_1", "step_2", "step_3", "confirm"]
+
+# Archivos de eventos web (client_id, visitor_id, visit_id, process_step, date_time)
+# Cambia el patrón si tus archivos se llaman de otra forma
+WEB_EVENTS_PATTERN = "df_final_web_data*.txt"
+EVENT_COLUMNS = ["client_id", "visit_id", "process_step", "date_time"]
+
+# Carpeta donde se guarda el estado del motor para el modo incremental
+FUNNEL_DIR = CACHE_DIR / "funnel"
+
+# Tabla de visitas (una fila por visit_id); las horas se guardan como nanosegundos desde 1970
+VISIT_DTYPES = {
+    "client_id": "int32",
+    "variation": "string",
+    "first_time": "int64",
+    "last_time": "int64",
+    "last_step": "int8",
+    "steps": "int64",
+    "transitions": "int64",
+    "errors": "int64",
+    "completed": "bool",
+}
+
+_lock = threading.Lock()
+
+
+def web_event_files():
+    return sorted(RAW_DIR.glob(WEB_EVENTS_PATTERN))
+
+
+def read_events(path, chunk_rows=2_000_000):
+    # Lee un archivo de eventos por bloques con tipos compactos (el texto de los pasos pasa a categoría)
+    chunks = pd.read_csv(
+        path,
+        usecols=EVENT_COLUMNS,
+        dtype={"client_id": "int32", "visit_id": "string", "process_step": "category"},
+        chunksize=chunk_rows,
+    )
+    return pd.concat(chunks, ignore_index=True)
+
+
+class FunnelEngine:
+    # Duraciones por paso, finalización a la primera y errores (pasos hacia atrás) por visita, cliente y variación
+    # append() con todos los eventos calcula todo de una vez; después se pueden añadir días nuevos con más append()
+
+    def __init__(self):
+        self.visits = pd.DataFrame(
+            {column: pd.Series(dtype=dtype) for column, dtype in VISIT_DTYPES.items()},
+            index=pd.Index([], name="visit_id", dtype="string"),
+        )
+        # count, suma y suma de cuadrados de la duración (segundos) de cada paso por variación
+        self.step_stats = pd.DataFrame(
+            columns=["count", "sum", "sumsq"],
+            index=pd.MultiIndex.from_arrays([[], []], names=["variation", "step"]),
+            dtype="float64",
+        )
+
+    def append(self, events, variations):
+        # events: DataFrame con EVENT_COLUMNS; variations: Series client_id -> Control/Test
+        # Los eventos de una visita que ya se había procesado deben ser posteriores a los anteriores (días nuevos)
+        events = events.assign(variation=events["client_id"].map(variations)).dropna(subset=["variation"])
+        if events.empty:
+            return self
+        step_code = pd.Categorical(events["process_step"], categories=STEPS).codes.astype("int8")
+        new = pd.DataFrame({
+            "visit_id": events["visit_id"].astype("string").to_numpy(),
+            "client_id": events["client_id"].to_numpy(),
+            "variation": events["variation"].astype("string").to_numpy(),
+            "step": step_code,
+            "time": pd.to_datetime(events["date_time"]).to_numpy("datetime64[ns]").astype("int64"),
+            "carry": False,
+        })
+        new = new[new["step"] >= 0]
+
+        # Para las visitas que ya conocíamos añadimos su último evento, así el paso que cruza de un lote a otro
+        # también cuenta (duración y posible error)
+        known = self.visits.index.intersection(pd.Index(new["visit_id"].unique()))
+        carry = self.visits.loc[known]
+        carry = pd.DataFrame({
+            "visit_id": carry.index.to_numpy(),
+            "client_id": carry["client_id"].to_numpy(),
+            "variation": carry["variation"].to_numpy(),
+            "step": carry["last_step"].to_numpy().astype("int8"),
+            "time": carry["last_time"].to_numpy().astype("int64"),
+            "carry": True,
+        })
+        rows = pd.concat([carry, new], ignore_index=True) if len(carry) else new.reset_index(drop=True)
+
+        # Una sola ordenación por visita y hora; después todo son operaciones sobre arrays desplazados una posición
+        visit_codes, visit_ids = pd.factorize(rows["visit_id"])
+        order = np.lexsort((~rows["carry"].to_numpy(), rows["time"].to_numpy(), visit_codes))
+        visit = visit_codes[order]
+        step = rows["step"].to_numpy()[order]
+        time = rows["time"].to_numpy()[order]
+        is_new = ~rows["carry"].to_numpy()[order]
+        client = rows["client_id"].to_numpy()[order]
+        variation = rows["variation"].to_numpy()[order]
+
+        same_visit = visit[1:] == visit[:-1]
+        duration = (time[1:] - time[:-1]) / 1e9
+        backward = same_visit & (step[1:] < step[:-1])
+
+        # Duraciones: el tiempo de un paso va desde su evento hasta el siguiente de la misma visita
+        durations = pd.DataFrame({
+            "variation": variation[:-1][same_visit],
+            "step": np.asarray(STEPS, dtype=object)[step[:-1][same_visit]],
+            "seconds": duration[same_visit],
+        })
+        durations["sq"] = durations["seconds"] ** 2
+        batch_stats = durations.groupby(["variation", "step"]).agg(
+            count=("seconds", "size"), sum=("seconds", "sum"), sumsq=("sq", "sum")
+        ).astype("float64")
+        self.step_stats = batch_stats.add(self.step_stats, fill_value=0) if len(self.step_stats) else batch_stats
+
+        # Agregados por visita del lote: solo cuentan los eventos nuevos (los de arrastre ya estaban contados)
+        transitions = pd.DataFrame({"visit": visit[:-1][same_visit], "errors": backward[same_visit]})
+        per_visit_transitions = transitions.groupby("visit").agg(transitions=("errors", "size"), errors=("errors", "sum"))
+        new_rows = pd.DataFrame({
+            "visit": visit[is_new],
+            "client_id": client[is_new],
+            "variation": variation[is_new],
+            "time": time[is_new],
+            "step": step[is_new],
+            "confirm": step[is_new] == STEPS.index("confirm"),
+        })
+        grouped = new_rows.groupby("visit")
+        batch = grouped.agg(
+            client_id=("client_id", "first"),
+            variation=("variation", "first"),
+            first_time=("time", "first"),
+            last_time=("time", "last"),
+            last_step=("step", "last"),
+            steps=("step", "size"),
+            completed=("confirm", "any"),
+        ).join(per_visit_transitions).fillna({"transitions": 0, "errors": 0})
+        batch.index = pd.Index(visit_ids[batch.index], name="visit_id", dtype="string")
+
+        # Fusionamos con las visitas que ya existían
+        old = self.visits.reindex(batch.index)
+        existed = old["steps"].notna().to_numpy()
+        for column in ["steps", "transitions", "errors"]:
+            batch[column] = batch[column] + old[column].fillna(0).to_numpy()
+        batch["completed"] = batch["completed"] | old["completed"].fillna(False).astype(bool).to_numpy()
+        batch["first_time"] = np.where(existed, old["first_time"].fillna(0).to_numpy(), batch["first_time"].to_numpy())
+        batch = batch[list(VISIT_DTYPES)].astype(VISIT_DTYPES)
+        self.visits = pd.concat([self.visits.drop(index=known), batch]) if len(self.visits) else batch
+        return self
+
+    def client_table(self):
+        # Por cliente: si completó alguna visita y si su primera visita se completó sin errores
+        visits = self.visits.sort_values("first_time")
+        grouped = visits.groupby("client_id")
+        clients = grouped.agg(variation=("variation", "first"), completed=("completed", "any"), visits=("steps", "size"))
+        first = grouped.head(1).set_index("client_id")
+        clients["first_attempt"] = (first["completed"].astype(bool) & (first["errors"] == 0)).reindex(clients.index)
+        return clients
+
+    def kpi_summary(self):
+        # Tabla de KPIs por variación
+        clients = self.client_table()
+        visits = self.visits
+        summary = pd.DataFrame({
+            "clients": clients.groupby("variation").size(),
+            "completion_rate": clients.groupby("variation")["completed"].mean(),
+            "first_attempt_rate": clients.groupby("variation")["first_attempt"].mean(),
+            "visits": visits.groupby("variation").size(),
+            "error_rate": visits.groupby("variation")["errors"].sum() / visits.groupby("variation")["transitions"].sum(),
+        })
+        return summary
+
+    def step_times(self):
+        # Media y desviación típica del tiempo en cada paso por variación
+        stats = self.step_stats
+        mean = stats["sum"] / stats["count"]
+        var = (stats["sumsq"] - stats["count"] * mean ** 2) / (stats["count"] - 1)
+        return pd.DataFrame({"count": stats["count"], "mean_seconds": mean, "std_seconds": np.sqrt(var.clip(lower=0))})
+
+    def hypothesis_tests(self, alpha=0.05):
+        # Tests de las conclusiones de la pestaña KPIs, calculados con los datos actuales
+        clients = self.client_table()
+        counts = clients.groupby("variation").agg(
+            n=("completed", "size"), completed=("completed", "sum"), first_attempt=("first_attempt", "sum")
+        )
+        errors = self.visits.groupby("variation")[["errors", "transitions"]].sum()
+        tests = {
+            "completion_rate": two_proportion_ztest(
+                counts.loc[CONTROL, "completed"], counts.loc[CONTROL, "n"],
+                counts.loc[TEST, "completed"], counts.loc[TEST, "n"], alpha=alpha),
+            "first_attempt_rate": two_proportion_ztest(
+                counts.loc[CONTROL, "first_attempt"], counts.loc[CONTROL, "n"],
+                counts.loc[TEST, "first_attempt"], counts.loc[TEST, "n"], alpha=alpha),
+            # H1: error_rate(Control) > error_rate(Test)
+            "error_rate": two_proportion_ztest(
+                errors.loc[CONTROL, "errors"], errors.loc[CONTROL, "transitions"],
+                errors.loc[TEST, "errors"], errors.loc[TEST, "transitions"], alpha=alpha, alternative="smaller"),
+        }
+        proportions = pd.DataFrame(tests).T
+
+        times = self.step_times()
+        control, test = times.xs(CONTROL, level="variation"), times.xs(TEST, level="variation")
+        step_tests = pd.DataFrame(welch_from_moments(
+            control["count"], control["mean_seconds"], control["std_seconds"] ** 2,
+            test["count"], test["mean_seconds"], test["std_seconds"] ** 2, alpha=alpha,
+        )).reindex([s for s in STEPS if s in control.index])
+        return proportions, step_tests
+
+    def save(self, folder=FUNNEL_DIR, sources=None):
+        # Cada archivo se escribe en un temporal y se renombra; sources.json el último, cuando los otros ya están
+        folder.mkdir(parents=True, exist_ok=True)
+        for name, frame in (("visits.parquet", self.visits), ("step_stats.parquet", self.step_stats)):
+            tmp_path = temp_path(folder / name)
+            frame.to_parquet(tmp_path)
+            os.replace(tmp_path, folder / name)
+        tmp_path = temp_path(folder / "sources.json")
+        tmp_path.write_text(json.dumps(sources or {}))
+        os.replace(tmp_path, folder / "sources.json")
+
+    @classmethod
+    def load(cls, folder=FUNNEL_DIR):
+        engine = cls()
+        if not (folder / "visits.parquet").exists():
+            return engine, {}
+        engine.visits = pd.read_parquet(folder / "visits.parquet")
+        engine.step_stats = pd.read_parquet(folder / "step_stats.parquet")
+        return engine, json.loads((folder / "sources.json").read_text())
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def update_engine(variations, files=None, folder=FUNNEL_DIR):
+    # Modo incremental: solo se procesan los archivos nuevos (por ejemplo, el de un día nuevo)
+    # Si un archivo ya procesado ha cambiado o ha desaparecido, se recalcula todo desde cero
+    # Las actualizaciones van de una en una: dos sesiones a la vez añadirían los mismos eventos al mismo estado
+    files = web_event_files() if files is None else files
+    with _lock:
+        return _update_engine(variations, files, folder)
+
+
+def _update_engine(variations, files, folder):
+    engine, sources = FunnelEngine.load(folder)
+    current = {os.path.basename(path): _file_key(path) for path in files}
+    if any(current.get(name) != key for name, key in sources.items()):
+        engine, sources = FunnelEngine(), {}
+    pending = [path for path in files if os.path.basename(path) not in sources]
+    if not pending:
+        return engine
+    if not sources:
+        # Primera vez: todos los eventos juntos (no hace falta que los archivos estén ordenados en el tiempo)
+        engine.append(pd.concat([read_events(path) for path in pending], ignore_index=True), variations)
+    else:
+        for path in pending:
+            engine.append(read_events(path), variations)
+    sources.update({os.path.basename(path): current[os.path.basename(path)] for path in pending})
+    engine.save(folder, sources)
+    return engine
+
+
+@cached_probe("funnel.results", st.cache_data(show_spinner="Processing web events...", max_entries=4))
+def _funnel_results(sources):
+    variations = load_dataset("experiment").set_index("client_id")["Variation"]
+    engine = update_engine(variations)
+    proportions, step_tests = engine.hypothesis_tests()
+    return {
+        "kpis": engine.kpi_summary(),
+        "step_times": engine.step_times(),
+        "proportions": proportions,
+        "step_tests": step_tests,
+    }
+
+
+def _sources(files):
+    return tuple((os.path.basename(path), *_file_key(path)) for path in files)
+
+
+def load_funnel_results():
+    # Resultados de los KPIs para la app, una vez por versión de los archivos de eventos
+    # Devuelve None si no hay archivos de eventos en data/raw
+    files = web_event_files()
+    if not files:
+        return None
+    return _funnel_results(_sources(files))
+
+
+@cached_probe("funnel.client_outcomes", st.cache_data(show_spinner="Processing web events...", max_entries=4))
+def _client_outcomes(sources):
+    variations = load_dataset("experiment").set_index("client_id")["Variation"]
+    return update_engine(variations).client_table()
+
+
+def events_version():
+    # Versión de los archivos de eventos (nombre, fecha y tamaño de cada uno); None si no hay ninguno
+    files = web_event_files()
+    return _sources(files) if files else None
+
+
+def load_client_outcomes():
+    # Tabla por cliente (completed, first_attempt, visits) para usarla como objetivo de los modelos
+    # Devuelve None si no hay archivos de eventos en data/raw
+    sources = events_version()
+    if sources is None:
+        return None
+    return _client_outcomes(sources)
+
+
+if __name__ == "__main__":
+    # python -m utils.funnel: procesa los archivos de eventos nuevos y muestra los KPIs
+    from utils.datasets import DATASETS, read_dataset
+
+    experiment = read_dataset(DATASETS["experiment"])
+    engine = update_engine(experiment.set_index("client_id")["Variation"])
+    if engine.visits.empty:
+        print(f"No web event files found in {RAW_DIR} ({WEB_EVENTS_PATTERN})")
+    else:
+        print(engine.kpi_summary())
+        print(engine.step_times())
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import joblib
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, log_loss, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from utils.datasets import dataset_version, load_dataset
+from utils.funnel import events_version, load_client_outcomes
+from utils.paths import CACHE_DIR, temp_path
+from utils.probes import cached_probe
+from utils.resampling import get_pool
+
+# Modelos entrenados (uno por archivo), con nombre = hash de los datos de entrenamiento + modelo + parámetros
+MODEL_DIR = CACHE_DIR / "models"
+
+NUMERIC_FEATURES = ["clnt_tenure_yr", "clnt_age", "num_accts", "bal", "calls_6_mnth", "logons_6_mnth"]
+CATEGORICAL_FEATURES = ["gendr", "variation"]
+FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+# Proporción de clientes que se reserva para medir el modelo
+TEST_SIZE = 0.2
+
+
+def _low_engagement(clients):
+    # Aproximación a "churn": clientes en el cuartil más bajo de logons de los últimos 6 meses
+    return (clients["logons_6_mnth"] <= clients["logons_6_mnth"].quantile(0.25)).astype("int8")
+
+
+def _completed(clients):
+    # Clientes que terminaron el proceso online (necesita los archivos de eventos web en data/raw)
+    outcomes = load_client_outcomes()
+    if outcomes is None:
+        return None
+    return outcomes["completed"].reindex(clients["client_id"]).to_numpy()
+
+
+# Objetivos que se pueden predecir; "drop" son las variables que no se usan porque definen el objetivo
+TARGETS = {
+    "low_engagement": {"label": "Low engagement (churn proxy)", "build": _low_engagement, "drop": ["logons_6_mnth", "calls_6_mnth"]},
+    "completed": {"label": "Completed the online process", "build": _completed, "drop": []},
+}
+
+
+def _logistic_regression(params, seed):
+    return LogisticRegression(C=params["C"], max_iter=1000)
+
+
+def _random_forest(params, seed):
+    return RandomForestClassifier(
+        n_estimators=params["n_estimators"], max_depth=params["max_depth"], min_samples_leaf=20, n_jobs=1, random_state=seed
+    )
+
+
+def _gradient_boosting(params, seed):
+    return HistGradientBoostingClassifier(learning_rate=params["learning_rate"], max_iter=params["max_iter"], random_state=seed)
+
+
+# Modelos disponibles: para añadir uno, una función que lo construya y las opciones de sus hiperparámetros
+# El primer valor de cada lista es el que sale por defecto en la página
+MODELS = {
+    "logistic_regression": {"label": "Logistic regression", "build": _logistic_regression, "params": {"C": [1.0, 0.01, 0.1, 10.0]}},
+    "random_forest": {
+        "label": "Random forest",
+        "build": _random_forest,
+        "params": {"n_estimators": [100, 50, 200, 400], "max_depth": [8, 4, 12, 16]},
+    },
+    "gradient_boosting": {
+        "label": "Gradient boosting",
+        "build": _gradient_boosting,
+        "params": {"learning_rate": [0.1, 0.05, 0.2], "max_iter": [200, 100, 400]},
+    },
+}
+
+
+def available_targets():
+    # El objetivo "completed" solo está si hay archivos de eventos web
+    return [name for name in TARGETS if name != "completed" or events_version() is not None]
+
+
+def _features(target):
+    return [column for column in FEATURES if column not in TARGETS[target]["drop"]]
+
+
+@cached_probe("models.training_data", st.cache_data(show_spinner=False, max_entries=8))
+def _training_data(name, version, target, events):
+    clients = load_dataset(name, columns=["client_id"] + FEATURES)
+    y = TARGETS[target]["build"](clients)
+    X = clients[_features(target)]
+    known = ~pd.isna(y)
+    X, y = X[known], np.asarray(y[known], dtype="int8")
+    # Hash del contenido exacto con el que se entrena: cambia si cambian los datos o las etiquetas
+    digest = hashlib.sha256(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(y.tobytes())
+    return X, y, digest.hexdigest()
+
+
+def training_data(name, target):
+    # Variables y objetivo para entrenar, con el hash de los datos; una vez por versión del dataset
+    events = events_version() if target == "completed" else None
+    return _training_data(name, dataset_version(name), target, events)
+
+
+def model_key(data_digest, target, model, params, seed=42):
+    payload = json.dumps({"data": data_digest, "target": target, "model": model, "params": params, "seed": seed}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def model_path(key):
+    return MODEL_DIR / f"{key}.joblib"
+
+
+def _pipeline(model, params, features, seed):
+    numeric = [column for column in features if column in NUMERIC_FEATURES]
+    categorical = [column for column in features if column in CATEGORICAL_FEATURES]
+    preprocess = ColumnTransformer([
+        ("num", StandardScaler(), numeric),
+        ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), categorical),
+    ])
+    return Pipeline([("preprocess", preprocess), ("model", MODELS[model]["build"](params, seed))])
+
+
+def _importances(pipeline):
+    # Peso de cada variable (coeficientes o importancias del árbol), si el modelo lo tiene
+    estimator = pipeline.named_steps["model"]
+    names = pipeline.named_steps["preprocess"].get_feature_names_out()
+    if hasattr(estimator, "coef_"):
+        values = np.abs(estimator.coef_[0])
+    elif hasattr(estimator, "feature_importances_"):
+        values = estimator.feature_importances_
+    else:
+        return None
+    return pd.Series(values, index=[name.split("__", 1)[1] for name in names]).sort_values(ascending=False)
+
+
+def _train_model(path, X, y, target, model, params, seed):
+    # Se ejecuta en un proceso del pool: entrena, mide con un conjunto reservado y guarda el modelo en disco
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, stratify=y, random_state=seed)
+    pipeline = _pipeline(model, params, list(X.columns), seed)
+    start = time.perf_counter()
+    pipeline.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    proba = pipeline.predict_proba(X_test)[:, 1]
+    predicted = (proba >= 0.5).astype("int8")
+    metrics = {
+        "roc_auc": float(roc_auc_score(y_test, proba)),
+        "accuracy": float(accuracy_score(y_test, predicted)),
+        "f1": float(f1_score(y_test, predicted, zero_division=0)),
+        "log_loss": float(log_loss(y_test, proba, labels=[0, 1])),
+        "base_rate": float(y.mean()),
+        "n_train": len(y_train),
+        "n_test": len(y_test),
+        "fit_seconds": fit_seconds,
+    }
+    fitted = {"pipeline": pipeline, "metrics": metrics, "importances": _importances(pipeline), "target": target, "model": model, "params": params}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(path)
+    joblib.dump(fitted, tmp_path)
+    os.replace(tmp_path, path)
+    return metrics
+
+
+class TrainingJob:
+    # Un entrenamiento en el pool de procesos; error: la excepción si ha fallado (al lanzarlo o dentro del proceso)
+
+    def __init__(self, future=None, error=None):
+        self.future = future
+        self.error = error
+
+
+class TrainingRegistry:
+    # Entrenamientos en curso, compartidos entre sesiones (dos usuarios con la misma configuración comparten trabajo)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+
+@st.cache_resource
+def get_training_registry():
+    return TrainingRegistry()
+
+
+def start_training(key, X, y, target, model, params, seed=42):
+    # Lanza el entrenamiento en el pool de procesos, salvo que el modelo ya esté en disco o entrenándose
+    # Si el anterior falló, se vuelve a lanzar
+    path = model_path(key)
+    if path.exists():
+        return None
+    registry = get_training_registry()
+    with registry.lock:
+        job = registry.jobs.get(key)
+        if job is None or job.error is not None:
+            try:
+                job = TrainingJob(get_pool().submit(_train_model, path, X, y, target, model, params, seed))
+            except Exception as error:
+                # Pool roto o cerrado (RuntimeError, como BrokenProcessPool): el siguiente intento crea otro pool
+                if isinstance(error, RuntimeError):
+                    get_pool.clear()
+                job = TrainingJob(error=error)
+            registry.jobs[key] = job
+    return job
+
+
+@cached_probe("models.load_model", st.cache_resource(max_entries=16, show_spinner=False))
+def _load_model(path, version):
+    return joblib.load(path)
+
+
+def poll_training(key):
+    # Devuelve el modelo si ya está entrenado, el trabajo si sigue en curso o ha fallado (job.error) o None si no existe
+    # El trabajo fallido se queda en el registro hasta que se vuelva a lanzar con start_training
+    path = model_path(key)
+    registry = get_training_registry()
+    with registry.lock:
+        job = registry.jobs.get(key)
+        if job is not None and job.error is None and job.future.done():
+            try:
+                job.future.result()
+            except Exception as error:
+                job.error = error
+                if isinstance(error, BrokenProcessPool):
+                    # Un proceso del pool ha muerto (por ejemplo, sin memoria): el pool no acepta más trabajos
+                    get_pool.clear()
+            else:
+                del registry.jobs[key]
+                job = None
+    if job is not None:
+        return job
+    if path.exists():
+        return _load_model(str(path), os.stat(path).st_mtime_ns)
+    return None
+
+
+@cached_probe("models.score_clients", st.cache_data(show_spinner=False, max_entries=8))
+def score_clients(key, name, version):
+    # Probabilidad para todos los clientes de una vez (predict_proba sobre la tabla completa)
+    fitted = poll_training(key)
+    clients = load_dataset(name, columns=["client_id"] + FEATURES)
+    start = time.perf_counter()
+    proba = fitted["pipeline"].predict_proba(clients[_features(fitted["target"])])[:, 1]
+    elapsed = time.perf_counter() - start
+    scores = pd.DataFrame({"client_id": clients["client_id"], "variation": clients["variation"], "score": proba.astype("float32")})
+    return scores, elapsed
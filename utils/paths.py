@@ -0,0 +1,25 @@
+import os
+import threading
+from pathlib import Path
+
+# Rutas del proyecto, calculadas desde la raíz del repo para que funcionen
+# tanto con `streamlit run app.py` como al ejecutar los módulos desde la terminal
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# APP_DATA_DIR y APP_CACHE_DIR permiten usar otras carpetas (por ejemplo, los benchmarks con datos sintéticos)
+DATA_DIR = Path(os.environ.get("APP_DATA_DIR", BASE_DIR / "data"))
+RAW_DIR = DATA_DIR / "raw"
+PROCESSED_DIR = DATA_DIR / "processed"
+REPORTS_DIR = DATA_DIR / "reports"
+# Archivos grandes para perfilar en "Load & Quick EDA" sin subirlos desde el navegador
+UPLOADS_DIR = DATA_DIR / "uploads"
+ASSETS_DIR = BASE_DIR / "assets"
+
+# Carpeta para los ficheros que genera la app (se puede borrar sin perder nada)
+CACHE_DIR = Path(os.environ.get("APP_CACHE_DIR", BASE_DIR / ".cache"))
+
+
+def temp_path(path):
+    # Temporal junto a path para escribir y después os.replace: único por proceso y por hilo, así dos sesiones
+    # que escriben el mismo archivo a la vez nunca comparten el temporal
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
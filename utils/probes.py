@@ -0,0 +1,292 @@
+import bisect
+import contextlib
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Sondas de rendimiento: miden el tiempo y el crecimiento de memoria de un bloque de código (probe("nombre"))
+# y cuentan aciertos y fallos de las funciones con caché (cached_probe). Se ven en la página Settings
+# Cada medida se guarda dos veces: en el total del proceso (todas las sesiones) y en la sesión actual
+
+# Con APP_PROBES=0 el servidor arranca con las sondas desactivadas (también se pueden desactivar desde Settings)
+ENABLED_BY_DEFAULT = os.environ.get("APP_PROBES", "1") != "0"
+
+# Límites de los tramos de los histogramas (en segundos y en bytes), como los de Prometheus
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MEMORY_BUCKETS = tuple(2 ** 20 * size for size in (1, 4, 16, 64, 256, 1024))
+
+# Los percentiles se calculan con las últimas WINDOW medidas de cada sonda (ventana móvil)
+# Las medidas de cada sesión usan una ventana más pequeña: con cientos de sesiones abiertas a la vez, su memoria se suma
+WINDOW = 512
+SESSION_WINDOW = 64
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Clave de session_state con las medidas de la sesión
+SESSION_KEY = "probe_stats"
+
+
+def rss_bytes():
+    # Memoria residente actual del proceso (solo Linux); None si no se puede leer
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class Histogram:
+    # Conteo por tramos desde el arranque (para Prometheus) y ventana de las últimas medidas (para los percentiles)
+
+    def __init__(self, buckets, window=WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        self.recent.append(value)
+
+    def percentiles(self, qs=(0.5, 0.95, 0.99)):
+        values = sorted(self.recent)
+        if not values:
+            return {q: None for q in qs}
+        # Percentil por rango más cercano: el valor que deja por debajo al menos q de las medidas
+        return {q: values[max(0, math.ceil(q * len(values)) - 1)] for q in qs}
+
+    def cumulative(self):
+        # Pares (límite, medidas <= límite) con el último tramo +Inf, como los espera Prometheus
+        running, pairs = 0, []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+
+class ProbeStats:
+    # Histogramas de tiempo y memoria y contadores de caché por sonda
+
+    def __init__(self, window=WINDOW):
+        self.lock = threading.Lock()
+        self.window = window
+        self.started = time.time()
+        self.metrics = {}
+
+    def record(self, name, seconds, memory=None, miss=None):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = {
+                    "seconds": Histogram(TIME_BUCKETS, self.window), "memory": Histogram(MEMORY_BUCKETS, self.window),
+                    "hits": 0, "misses": 0,
+                }
+            metric["seconds"].observe(seconds)
+            if memory is not None:
+                # Si la memoria baja (el recolector ha liberado algo) cuenta como 0
+                metric["memory"].observe(max(memory, 0))
+            if miss is not None:
+                metric["misses" if miss else "hits"] += 1
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.metrics = {}
+
+    def summary(self):
+        # Una fila por sonda para la tabla de Settings y la exportación JSON
+        with self.lock:
+            rows = []
+            for name, metric in sorted(self.metrics.items()):
+                seconds, memory = metric["seconds"], metric["memory"]
+                p50, p95, p99 = seconds.percentiles().values()
+                calls = metric["hits"] + metric["misses"]
+                rows.append({
+                    "probe": name,
+                    "count": seconds.count,
+                    "total_seconds": seconds.total,
+                    "mean_seconds": seconds.total / seconds.count,
+                    "p50_seconds": p50,
+                    "p95_seconds": p95,
+                    "p99_seconds": p99,
+                    "max_seconds": max(seconds.recent),
+                    "hits": metric["hits"],
+                    "misses": metric["misses"],
+                    "hit_ratio": metric["hits"] / calls if calls else None,
+                    "max_memory_growth_bytes": max(memory.recent) if memory.recent else None,
+                })
+            return rows
+
+    def to_json(self, scope):
+        return json.dumps({
+            "scope": scope,
+            "enabled": probes_enabled(),
+            "started": self.started,
+            "exported": time.time(),
+            "window": self.window,
+            "process_rss_bytes": rss_bytes(),
+            "probes": self.summary(),
+        }, indent=2)
+
+    def to_prometheus(self, scope):
+        # Formato de texto de Prometheus (histogramas acumulados desde el arranque o desde el último reinicio)
+        lines = []
+        with self.lock:
+            metrics = sorted(self.metrics.items())
+            for metric_name, kind, unit_help in (
+                ("app_probe_duration_seconds", "seconds", "Time spent in instrumented code."),
+                ("app_probe_memory_growth_bytes", "memory", "Resident memory growth during instrumented code."),
+            ):
+                lines += [f"# HELP {metric_name} {unit_help}", f"# TYPE {metric_name} histogram"]
+                for name, metric in metrics:
+                    histogram = metric[kind]
+                    if not histogram.count:
+                        continue
+                    labels = f'scope="{scope}",probe="{_label(name)}"'
+                    for bound, count in histogram.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(float(bound))
+                        lines.append(f'{metric_name}_bucket{{{labels},le="{le}"}} {count}')
+                    lines.append(f"{metric_name}_sum{{{labels}}} {histogram.total!r}")
+                    lines.append(f"{metric_name}_count{{{labels}}} {histogram.count}")
+            lines += ["# HELP app_cache_requests_total Calls to cached loaders by result.", "# TYPE app_cache_requests_total counter"]
+            for name, metric in metrics:
+                if metric["hits"] or metric["misses"]:
+                    labels = f'scope="{scope}",probe="{_label(name)}"'
+                    lines.append(f'app_cache_requests_total{{{labels},result="hit"}} {metric["hits"]}')
+                    lines.append(f'app_cache_requests_total{{{labels},result="miss"}} {metric["misses"]}')
+        rss = rss_bytes()
+        if rss is not None:
+            lines += ["# HELP app_process_resident_memory_bytes Resident memory of the server process.",
+                      "# TYPE app_process_resident_memory_bytes gauge", f"app_process_resident_memory_bytes {rss}"]
+        return "\n".join(lines) + "\n"
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Estado global en variables del módulo y no con st.cache_resource: probe() se llama muchas veces por ejecución
+# y con las sondas desactivadas solo debe costar leer un booleano
+_global_stats = ProbeStats()
+_settings = {"enabled": ENABLED_BY_DEFAULT}
+_local = threading.local()
+_NO_PROBE = contextlib.nullcontext()
+
+
+def probes_enabled():
+    return _settings["enabled"]
+
+
+def set_probes_enabled(enabled):
+    _settings["enabled"] = bool(enabled)
+
+
+def global_stats():
+    return _global_stats
+
+
+def session_stats():
+    # Medidas de la sesión actual; None fuera de una sesión (hilos propios, scripts de línea de comandos)
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    stats = st.session_state.get(SESSION_KEY)
+    if stats is None:
+        stats = st.session_state[SESSION_KEY] = ProbeStats(SESSION_WINDOW)
+    return stats
+
+
+def observe(name, seconds, memory=None, miss=None):
+    # Guarda una medida ya tomada (por ejemplo, la duración de toda la ejecución de app.py)
+    if not _settings["enabled"]:
+        return
+    _global_stats.record(name, seconds, memory, miss)
+    stats = session_stats()
+    if stats is not None:
+        stats.record(name, seconds, memory, miss)
+
+
+class _Probe:
+    # miss se puede marcar dentro del bloque (with probe(...) as measure: measure.miss = True) para contar aciertos y fallos
+    __slots__ = ("name", "start", "rss", "miss")
+
+    def __init__(self, name):
+        self.name = name
+        self.miss = None
+
+    def __enter__(self):
+        self.rss = rss_bytes()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        rss = rss_bytes()
+        observe(self.name, seconds, None if rss is None or self.rss is None else rss - self.rss, self.miss)
+        return False
+
+
+def probe(name):
+    # with probe("page.Statistics"): ...  mide el bloque; si las sondas están desactivadas no hace nada
+    if not _settings["enabled"]:
+        return _NO_PROBE
+    return _Probe(name)
+
+
+def probed(name):
+    # Decorador con la misma medida que probe(), para funciones que se vuelven a ejecutar solas (fragmentos)
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with probe(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def cached_probe(name, cache):
+    # Sustituye a @st.cache_data(...) / @st.cache_resource(...): @cached_probe("nombre", st.cache_data(...))
+    # Mide cada llamada y cuenta un fallo si la función se ha ejecutado de verdad y un acierto si no
+    def decorate(func):
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            # Solo se ejecuta cuando el resultado no está en la caché: marca la llamada en curso como fallo
+            calls = getattr(_local, "calls", None)
+            if calls:
+                calls[-1][0] = True
+            return func(*args, **kwargs)
+
+        cached = cache(compute)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            if not _settings["enabled"]:
+                return cached(*args, **kwargs)
+            calls = _local.__dict__.setdefault("calls", [])
+            frame = [False]
+            calls.append(frame)
+            rss = rss_bytes()
+            start = time.perf_counter()
+            try:
+                return cached(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                calls.pop()
+                end_rss = rss_bytes()
+                observe(name, seconds, None if rss is None or end_rss is None else end_rss - rss, miss=frame[0])
+
+        call.clear = cached.clear
+        return call
+
+    return decorate
@@ -0,0 +1,211 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from utils.paths import UPLOADS_DIR
+
+# Filas que se leen en cada bloque: la memoria usada depende de esto, no del tamaño del archivo
+CHUNK_ROWS = 200_000
+
+# Precisión del contador de valores distintos (2^14 registros, error típico ~0.8%)
+HLL_PRECISION = 14
+
+# Tamaño del sketch de cuantiles (más grande = más preciso y más memoria)
+KLL_K = 400
+
+
+class HyperLogLog:
+    # Conteo aproximado de valores distintos con memoria fija
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update(self, values):
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_pandas_object(pd.Series(values), index=False).to_numpy()
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # Posición del primer bit a 1 en los bits restantes (ceros a la izquierda + 1)
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest == 0, 64 - self.p + 1, 64 - self.p - exponent + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def estimate(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m ** 2 / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * self.m and zeros:
+            # Corrección para pocos valores (linear counting)
+            return self.m * math.log(self.m / zeros)
+        return raw
+
+
+class KLLSketch:
+    # Cuantiles aproximados con memoria fija (sketch KLL); cada nivel h guarda elementos con peso 2^h
+
+    def __init__(self, k=KLL_K, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Si el número de elementos es impar, uno se queda en este nivel
+                keep = items[:1] if len(items) % 2 else items[:0]
+                items = items[len(keep):]
+                promoted = items[self.rng.integers(0, 2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantiles(self, qs):
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return np.full(len(qs), np.nan)
+        weights = np.concatenate([np.full(len(items_h), 2.0 ** h) for h, items_h in enumerate(self.levels)])
+        order = np.argsort(items)
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        return items[order][np.minimum(positions, len(items) - 1)]
+
+
+class ColumnProfile:
+    # Estadísticos de una columna que se actualizan bloque a bloque
+
+    def __init__(self, name):
+        self.name = name
+        self.numeric = None
+        self.count = 0
+        self.nulls = 0
+        self.non_numeric = 0
+        self.minimum = np.nan
+        self.maximum = np.nan
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.numeric_count = 0
+        self.distinct = HyperLogLog()
+        self.quantiles = KLLSketch()
+
+    def update(self, series):
+        self.count += len(series)
+        valid = series.dropna()
+        self.nulls += len(series) - len(valid)
+        if len(valid) == 0:
+            return
+
+        # El tipo se decide con el primer bloque que tenga datos
+        if self.numeric is None:
+            self.numeric = pd.api.types.is_numeric_dtype(valid) or pd.to_numeric(valid, errors="coerce").notna().all()
+        if not self.numeric:
+            # Texto: se cuenta como texto aunque un bloque se haya leído como números
+            self.distinct.update(valid.astype(str).to_numpy())
+            return
+
+        numbers = pd.to_numeric(valid, errors="coerce").to_numpy(dtype=np.float64)
+        parsed = numbers[~np.isnan(numbers)]
+        self.non_numeric += len(numbers) - len(parsed)
+        # Los valores distintos se cuentan sobre los float64: un bloque leído como int64 (sin nulos) y otro como
+        # float64 (con nulos) darían hashes distintos para el mismo número; lo que no es número, como texto
+        self.distinct.update(parsed)
+        if len(parsed) < len(numbers):
+            self.distinct.update(valid[np.isnan(numbers)].astype(str).to_numpy())
+        if len(parsed) == 0:
+            return
+        self.minimum = np.fmin(self.minimum, parsed.min())
+        self.maximum = np.fmax(self.maximum, parsed.max())
+
+        # Welford por bloques: combinamos la media y M2 del bloque con las acumuladas (fórmula de Chan)
+        n_b = len(parsed)
+        mean_b = parsed.mean()
+        m2_b = ((parsed - mean_b) ** 2).sum()
+        n = self.numeric_count + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.numeric_count * n_b / n
+        self.numeric_count = n
+        self.quantiles.update(parsed)
+
+    def summary(self):
+        row = {
+            "column": self.name,
+            "type": "numeric" if self.numeric else "text",
+            "count": self.count,
+            "nulls": self.nulls,
+            "null_pct": self.nulls / self.count if self.count else np.nan,
+            "distinct_approx": int(round(self.distinct.estimate())),
+        }
+        if self.numeric and self.numeric_count:
+            p25, p50, p75 = self.quantiles.quantiles([0.25, 0.5, 0.75])
+            row.update({
+                "min": self.minimum,
+                "p25": p25,
+                "median": p50,
+                "p75": p75,
+                "max": self.maximum,
+                "mean": self.mean,
+                "std": math.sqrt(self.m2 / (self.numeric_count - 1)) if self.numeric_count > 1 else np.nan,
+                "non_numeric": self.non_numeric,
+            })
+        return row
+
+
+class StreamingProfiler:
+    # Perfil de un archivo leído por bloques: update() con cada bloque y summary() cuando se quiera pintar
+
+    def __init__(self):
+        self.columns = {}
+        self.rows = 0
+        self.chunks = 0
+
+    def update(self, chunk):
+        for name in chunk.columns:
+            if name not in self.columns:
+                self.columns[name] = ColumnProfile(name)
+            self.columns[name].update(chunk[name])
+        self.rows += len(chunk)
+        self.chunks += 1
+
+    def summary(self):
+        return pd.DataFrame([profile.summary() for profile in self.columns.values()]).set_index("column")
+
+
+def server_files():
+    # CSV/TXT de data/uploads: se leen del disco por bloques, sin pasar por la memoria del servidor como las subidas
+    if not UPLOADS_DIR.exists():
+        return []
+    return sorted(path for path in UPLOADS_DIR.iterdir() if path.suffix.lower() in (".csv", ".txt") and path.is_file())
+
+
+def iter_chunks(file, sep=",", chunk_rows=CHUNK_ROWS):
+    # Lee un CSV/TXT (ruta o archivo abierto) por bloques de chunk_rows filas
+    return pd.read_csv(file, sep=sep, chunksize=chunk_rows, low_memory=True)
+
+
+def profile_file(file, sep=",", chunk_rows=CHUNK_ROWS):
+    # Generador: devuelve el profiler después de cada bloque para poder pintar resultados parciales
+    profiler = StreamingProfiler()
+    for chunk in iter_chunks(file, sep=sep, chunk_rows=chunk_rows):
+        profiler.update(chunk)
+        yield profiler
+    if profiler.chunks == 0:
+        # Archivo con cabecera pero sin filas
+        yield profiler
@@ -0,0 +1,417 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from utils.columnar import file_sha256
+from utils.dashboards import demographics_tables
+from utils.funnel import STEPS, load_funnel_results, web_event_files
+from utils.paths import CACHE_DIR, REPORTS_DIR, temp_path
+from utils.stats import CONTROL, TEST, ab_test_report
+from utils.texts import CONCLUSIONS
+from utils.warmcache import dataset_digest, file_digest
+
+# Generador de los resúmenes ejecutivos en PDF (inglés y español) a partir de los resultados calculados y de utils/texts.py
+# Las conclusiones de cada test (se rechaza H₀ o no, umbral de negocio) se escriben a partir de los resultados
+# calculados, no de los textos fijos de HYPOTHESES: si cambian los datos, el informe no se contradice
+# Todo se guarda por contenido en .cache/reports:
+#   charts/<hash>.png     gráficos, compartidos por los dos idiomas (no llevan texto traducible)
+#   sections/<hash>.json  contenido de cada apartado, que solo se rehace si cambian sus datos o su texto
+#   <idioma>-<hash>.pdf   informe final, que no se vuelve a generar si su contenido no ha cambiado
+REPORTS_CACHE_DIR = CACHE_DIR / "reports"
+CHARTS_DIR = REPORTS_CACHE_DIR / "charts"
+SECTIONS_DIR = REPORTS_CACHE_DIR / "sections"
+
+# Cambia este número si cambias cómo se construyen los apartados, los gráficos o el PDF: invalida todo lo guardado
+LAYOUT_VERSION = 2
+
+LANGUAGES = ["en", "es"]
+REPORT_FILES = {"en": "Executive_Summary_EN.pdf", "es": "Executive_Summary_ES.pdf"}
+
+CLIENT_METRICS = ["clnt_tenure_yr", "clnt_age", "num_accts", "bal", "calls_6_mnth", "logons_6_mnth"]
+
+# Nivel de significación de los tests del informe
+ALPHA = 0.05
+
+# Criterio de negocio: aumento mínimo de la tasa de finalización de Test sobre Control (en puntos porcentuales)
+COMPLETION_THRESHOLD = 0.05
+
+# Hipótesis de cada test de los KPIs (las mismas en los dos idiomas)
+KPI_HYPOTHESES = {
+    "completion_rate": ("completion_rate(Control) = completion_rate(Test)", "completion_rate(Control) ≠ completion_rate(Test)"),
+    "first_attempt_rate": ("first_attempt_success(Control) = first_attempt_success(Test)", "first_attempt_success(Control) ≠ first_attempt_success(Test)"),
+    "error_rate": ("error_rate(Control) ≤ error_rate(Test)", "error_rate(Control) > error_rate(Test)"),
+}
+
+LABELS = {
+    "en": {
+        "title": "A/B Analysis Report — Vanguard Digital Redesign",
+        "subtitle": "Executive summary generated from the current data",
+        "kpis": "Key Performance Indicators",
+        "kpi_names": {"completion_rate": "Completion rate", "first_attempt_rate": "First-attempt completion", "error_rate": "Error rate"},
+        "step_times": "Time invested per step",
+        "no_events": "The web event files (df_final_web_data*.txt) were not available when this report was generated.",
+        "client_metrics": "Client profile: Test vs Control",
+        "demographics": "Demographics",
+        "age": "Age distribution by group",
+        "conclusions": "Conclusions",
+        "columns": {"kpi": "KPI", "metric": "Metric", "step": "Step", "group": "Group", "clients": "Clients", "age": "Avg. age",
+                    "tenure": "Avg. tenure", "balance": "Median balance", "diff": "Difference", "ci": "95% CI", "p_value": "p-value"},
+        "verdicts": {
+            "result": "Control **{control}** vs. Test **{test}** ({diff} pp, p = {p_value}).",
+            "rejected": "We rejected **H₀**, so the difference is statistically significant.",
+            "not_rejected": "We could not reject **H₀**, so the difference is not statistically significant.",
+            "threshold_met": "The increase reaches the **+{threshold} pp threshold**, so it meets the business criterion.",
+            "threshold_missed": "The increase is below the **+{threshold} pp threshold**, so it doesn’t meet the business criterion.",
+            "step": "- **{step}**: Test is {direction} by {seconds} s (p = {p_value}, {significance})",
+            "faster": "faster", "slower": "slower", "significant": "significant", "not_significant": "not significant",
+        },
+    },
+    "es": {
+        "title": "Informe de análisis A/B — Rediseño digital de Vanguard",
+        "subtitle": "Resumen ejecutivo generado con los datos actuales",
+        "kpis": "Indicadores clave (KPIs)",
+        "kpi_names": {"completion_rate": "Tasa de finalización", "first_attempt_rate": "Finalización al primer intento", "error_rate": "Tasa de error"},
+        "step_times": "Tiempo invertido por paso",
+        "no_events": "Los archivos de eventos web (df_final_web_data*.txt) no estaban disponibles al generar este informe.",
+        "client_metrics": "Perfil de clientes: Test frente a Control",
+        "demographics": "Demografía",
+        "age": "Distribución de edad por grupo",
+        "conclusions": "Conclusiones",
+        "columns": {"kpi": "KPI", "metric": "Métrica", "step": "Paso", "group": "Grupo", "clients": "Clientes", "age": "Edad media",
+                    "tenure": "Antigüedad media", "balance": "Saldo mediano", "diff": "Diferencia", "ci": "IC 95%", "p_value": "p-valor"},
+        "verdicts": {
+            "result": "Control **{control}** frente a Test **{test}** ({diff} pp, p = {p_value}).",
+            "rejected": "Rechazamos **H₀**, así que la diferencia es estadísticamente significativa.",
+            "not_rejected": "No podemos rechazar **H₀**, así que la diferencia no es estadísticamente significativa.",
+            "threshold_met": "El aumento llega al **umbral de +{threshold} pp**, así que cumple el criterio de negocio.",
+            "threshold_missed": "El aumento está por debajo del **umbral de +{threshold} pp**, así que no cumple el criterio de negocio.",
+            "step": "- **{step}**: Test es {direction} en {seconds} s (p = {p_value}, {significance})",
+            "faster": "más rápido", "slower": "más lento", "significant": "significativo", "not_significant": "no significativo",
+        },
+    },
+}
+
+COLORS = {CONTROL: "#9ec5fe", TEST: "#0d6efd"}
+
+
+def _hash(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _write_atomic(path, write):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(path)
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+# Gráficos: se dibujan con matplotlib una sola vez por contenido y se comparten entre idiomas
+
+def _chart(kind, data, draw):
+    # data es lo único que define el gráfico; si ya existe un PNG con ese contenido no se vuelve a dibujar
+    path = CHARTS_DIR / f"{_hash([LAYOUT_VERSION, kind, data])[:24]}.png"
+    if not path.exists():
+        # Figure directamente y no pyplot: pyplot guarda estado global y no se puede usar desde los hilos de Streamlit
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(6.4, 2.6), dpi=150)
+        ax = fig.subplots()
+        draw(ax, data)
+        ax.spines[["top", "right"]].set_visible(False)
+        fig.tight_layout()
+        _write_atomic(path, lambda tmp: fig.savefig(tmp, format="png"))
+    return str(path)
+
+
+def _draw_rates(ax, data):
+    groups = [CONTROL, TEST]
+    for column, (kpi, rates) in enumerate(data.items()):
+        for offset, group in enumerate(groups):
+            x = column + (offset - 0.5) * 0.38
+            ax.bar(x, rates[group], width=0.36, color=COLORS[group], label=group if column == 0 else None)
+            ax.text(x, rates[group], f"{rates[group]:.1%}", ha="center", va="bottom", fontsize=7)
+    ax.set_xticks(range(len(data)), list(data))
+    ax.yaxis.set_major_formatter(lambda value, _: f"{value:.0%}")
+    ax.legend(frameon=False, fontsize=7)
+
+
+def _draw_step_times(ax, data):
+    for offset, group in enumerate([CONTROL, TEST]):
+        xs = [i + (offset - 0.5) * 0.38 for i in range(len(data["steps"]))]
+        ax.bar(xs, data[group], width=0.36, color=COLORS[group], label=group)
+    ax.set_xticks(range(len(data["steps"])), data["steps"])
+    ax.set_ylabel("s")
+    ax.legend(frameon=False, fontsize=7)
+
+
+def _draw_histogram(ax, data):
+    for group in [CONTROL, TEST]:
+        ax.stairs(data[group], data["edges"], color=COLORS[group], linewidth=1.5, label=group)
+    ax.set_xlabel(data["column"])
+    ax.yaxis.set_major_formatter(lambda value, _: f"{value:.0%}")
+    ax.legend(frameon=False, fontsize=7)
+
+
+# Apartados: cada uno devuelve una lista de bloques (texto, tabla o imagen) para un idioma
+
+def _text(markdown):
+    return {"type": "text", "markdown": markdown}
+
+
+def _table(header, rows):
+    return {"type": "table", "header": header, "rows": rows}
+
+
+def _image(path):
+    return {"type": "image", "path": path}
+
+
+def _kpi_verdict(kpi, row, lang):
+    # Hipótesis, resultado y conclusión del test de un KPI, escritos con los valores calculados
+    verdicts = LABELS[lang]["verdicts"]
+    null, alternative = KPI_HYPOTHESES[kpi]
+    lines = [
+        f"**H₀**: {null}",
+        f"**H₁**: {alternative}",
+        verdicts["result"].format(control=f"{row['rate_control']:.2%}", test=f"{row['rate_test']:.2%}",
+                                  diff=f"{row['diff'] * 100:+.2f}", p_value=f"{row['p_value']:.4f}"),
+        verdicts["rejected" if row["p_value"] < ALPHA else "not_rejected"],
+    ]
+    if kpi == "completion_rate":
+        met = row["p_value"] < ALPHA and row["diff"] >= COMPLETION_THRESHOLD
+        lines.append(verdicts["threshold_met" if met else "threshold_missed"].format(threshold=f"{COMPLETION_THRESHOLD * 100:g}"))
+    return "  \n".join(lines)
+
+
+def _step_verdicts(step_tests, lang):
+    verdicts = LABELS[lang]["verdicts"]
+    return "\n".join(
+        verdicts["step"].format(
+            step=step, direction=verdicts["faster" if row["diff"] < 0 else "slower"], seconds=f"{abs(row['diff']):.1f}",
+            p_value=f"{row['p_value']:.4f}", significance=verdicts["significant" if row["p_value"] < ALPHA else "not_significant"],
+        )
+        for step, row in step_tests.iterrows()
+    )
+
+
+def _kpi_section(lang):
+    labels = LABELS[lang]
+    columns = labels["columns"]
+    blocks = [{"type": "heading", "text": labels["kpis"]}]
+    results = load_funnel_results()
+    if results is None:
+        return blocks + [_text(labels["no_events"])]
+
+    kpis, proportions = results["kpis"], results["proportions"]
+    names = list(proportions.index)
+    rates = {kpi: {group: float(kpis.loc[group, kpi]) for group in [CONTROL, TEST]} for kpi in names}
+    blocks.append(_image(_chart("rates", rates, _draw_rates)))
+    blocks.append(_table(
+        [columns["kpi"], CONTROL, TEST, columns["diff"], columns["p_value"]],
+        [[labels["kpi_names"][kpi], f"{row['rate_control']:.2%}", f"{row['rate_test']:.2%}", f"{row['diff'] * 100:+.2f} pp", f"{row['p_value']:.4f}"]
+         for kpi, row in proportions.iterrows()],
+    ))
+    for kpi in names:
+        blocks += [{"type": "subheading", "text": labels["kpi_names"][kpi]}, _text(_kpi_verdict(kpi, proportions.loc[kpi], lang))]
+
+    times = results["step_times"]["mean_seconds"]
+    steps = [step for step in STEPS if (CONTROL, step) in times.index and (TEST, step) in times.index]
+    step_data = {"steps": steps, **{group: [float(times.loc[(group, step)]) for step in steps] for group in [CONTROL, TEST]}}
+    step_tests = results["step_tests"]
+    blocks += [
+        {"type": "subheading", "text": labels["step_times"]},
+        _image(_chart("step_times", step_data, _draw_step_times)),
+        _table(
+            [columns["step"], CONTROL, TEST, columns["diff"], columns["p_value"]],
+            [[step, f"{step_data[CONTROL][i]:.1f} s", f"{step_data[TEST][i]:.1f} s", f"{step_tests.loc[step, 'diff']:+.1f} s", f"{step_tests.loc[step, 'p_value']:.4f}"]
+             for i, step in enumerate(steps) if step in step_tests.index],
+        ),
+        _text(_step_verdicts(step_tests.loc[[step for step in steps if step in step_tests.index]], lang)),
+    ]
+    return blocks
+
+
+def _client_metrics_section(lang):
+    labels = LABELS[lang]
+    columns = labels["columns"]
+    report = ab_test_report("clients", CLIENT_METRICS)
+    return [
+        {"type": "heading", "text": labels["client_metrics"]},
+        _table(
+            [columns["metric"], CONTROL, TEST, columns["diff"], columns["ci"], columns["p_value"]],
+            [[metric, f"{row[f'mean_{CONTROL}']:,.2f}", f"{row[f'mean_{TEST}']:,.2f}", f"{row['diff']:+,.2f}",
+              f"[{row['ci_low']:,.2f}, {row['ci_high']:,.2f}]", f"{row['p_value']:.4f}"]
+             for metric, row in report.iterrows()],
+        ),
+    ]
+
+
+def _demographics_section(lang):
+    labels = LABELS[lang]
+    columns = labels["columns"]
+    tables = demographics_tables("clients")
+    age = tables["age"]
+    age_data = {
+        "column": "clnt_age",
+        "edges": [float(edge) for edge in [*age.loc[age["variation"] == CONTROL, "bin_start"], age["bin_end"].max()]],
+        **{group: [float(share) for share in age.loc[age["variation"] == group, "share"]] for group in [CONTROL, TEST]},
+    }
+    totals = tables["totals"]
+    return [
+        {"type": "heading", "text": labels["demographics"]},
+        _table(
+            [columns["group"], columns["clients"], columns["age"], columns["tenure"], columns["balance"]],
+            [[group, f"{int(row['clients']):,}", f"{row['age']:.1f}", f"{row['tenure']:.1f}", f"{row['balance']:,.0f}"]
+             for group, row in totals.iterrows()],
+        ),
+        {"type": "subheading", "text": labels["age"]},
+        _image(_chart("histogram", age_data, _draw_histogram)),
+    ]
+
+
+def _conclusions_section(lang):
+    conclusions = CONCLUSIONS[lang]
+    blocks = [{"type": "heading", "text": LABELS[lang]["conclusions"]}, _text(conclusions["intro"])]
+    for heading, body in conclusions["sections"]:
+        blocks += [{"type": "subheading", "text": heading}, _text(body)]
+    return blocks
+
+
+def _events_digest():
+    return [(path.name, file_digest(path)) for path in web_event_files()]
+
+
+# Apartados del informe en orden, con la función que da la versión de los datos de los que dependen
+# (el hash del contenido y no la fecha: tras un despliegue los apartados ya construidos se reutilizan)
+SECTIONS = [
+    ("kpis", _kpi_section, _events_digest),
+    ("client_metrics", _client_metrics_section, lambda: dataset_digest("clients")),
+    ("demographics", _demographics_section, lambda: dataset_digest("clients")),
+    ("conclusions", _conclusions_section, lambda: None),
+]
+
+
+def _section_blocks(name, build, inputs, lang):
+    # Un apartado solo se vuelve a construir si cambian sus datos, sus textos o el formato
+    key = _hash([LAYOUT_VERSION, name, lang, inputs(), LABELS[lang], ALPHA, COMPLETION_THRESHOLD, CONCLUSIONS[lang]])
+    path = SECTIONS_DIR / f"{key[:24]}.json"
+    if path.exists():
+        blocks = json.loads(path.read_text(encoding="utf-8"))
+        if all(os.path.exists(block["path"]) for block in blocks if block["type"] == "image"):
+            return blocks
+    blocks = build(lang)
+    _write_atomic(path, lambda tmp: tmp.write_text(json.dumps(blocks, ensure_ascii=False), encoding="utf-8"))
+    return blocks
+
+
+# PDF: fpdf2 con la fuente DejaVu Sans que trae matplotlib (tiene acentos, flechas y símbolos como ≠ o H₀)
+
+_UNSUPPORTED = re.compile("[\U0001F000-\U0001FFFF\u2600-\u27bf\ufe0f]")
+
+
+def _clean(text):
+    # Quita los emojis (la fuente no los tiene) y los espacios sobrantes
+    return _UNSUPPORTED.sub("", text).strip()
+
+
+def _write_markdown(pdf, markdown):
+    # Markdown sencillo: listas (- o •), citas (>), sangría y negritas (**); cada línea en su propio párrafo
+    for raw_line in markdown.strip("\n").split("\n"):
+        line = _clean(raw_line)
+        if not line:
+            pdf.ln(2)
+            continue
+        indent = (len(raw_line) - len(raw_line.lstrip(" "))) // 2 * 5
+        quote = line.startswith(">")
+        line = line.lstrip("> ").strip() if quote else line
+        bullet = line.startswith(("- ", "• "))
+        line = line[2:] if bullet else line
+        pdf.set_x(pdf.l_margin + indent + (5 if quote else 0))
+        pdf.set_text_color(90 if quote else 0)
+        pdf.multi_cell(0, 5, ("• " if bullet else "") + line, markdown=True, new_x="LMARGIN", new_y="NEXT")
+    pdf.set_text_color(0)
+    pdf.ln(2)
+
+
+def _render_pdf(blocks, lang, path):
+    import matplotlib
+    from fpdf import FPDF, FontFace
+
+    fonts = os.path.join(matplotlib.get_data_path(), "fonts", "ttf")
+    pdf = FPDF(format="A4")
+    pdf.set_margins(18, 18)
+    pdf.set_auto_page_break(True, margin=18)
+    pdf.add_font("DejaVu", "", os.path.join(fonts, "DejaVuSans.ttf"))
+    pdf.add_font("DejaVu", "B", os.path.join(fonts, "DejaVuSans-Bold.ttf"))
+    pdf.set_title(LABELS[lang]["title"])
+    pdf.add_page()
+    pdf.set_font("DejaVu", "B", 16)
+    pdf.multi_cell(0, 8, LABELS[lang]["title"], align="L", new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("DejaVu", "", 10)
+    pdf.set_text_color(90)
+    pdf.multi_cell(0, 6, LABELS[lang]["subtitle"], new_x="LMARGIN", new_y="NEXT")
+    pdf.set_text_color(0)
+    for block in blocks:
+        if block["type"] == "heading":
+            pdf.ln(4)
+            pdf.set_font("DejaVu", "B", 13)
+            pdf.multi_cell(0, 7, _clean(block["text"]), align="L", new_x="LMARGIN", new_y="NEXT")
+            pdf.ln(1)
+        elif block["type"] == "subheading":
+            pdf.ln(1)
+            pdf.set_font("DejaVu", "B", 11)
+            pdf.multi_cell(0, 6, _clean(block["text"]), align="L", new_x="LMARGIN", new_y="NEXT")
+        elif block["type"] == "text":
+            pdf.set_font("DejaVu", "", 9.5)
+            _write_markdown(pdf, block["markdown"])
+        elif block["type"] == "table":
+            pdf.set_font("DejaVu", "", 8.5)
+            with pdf.table(headings_style=FontFace(emphasis="BOLD", fill_color=(231, 245, 255)), line_height=5, text_align="RIGHT") as table:
+                for cells in [block["header"], *block["rows"]]:
+                    row = table.row()
+                    for cell in cells:
+                        row.cell(str(cell))
+            pdf.ln(2)
+        elif block["type"] == "image":
+            pdf.image(block["path"], w=pdf.epw)
+            pdf.ln(2)
+    _write_atomic(path, lambda tmp: pdf.output(str(tmp)))
+
+
+def build_report(lang):
+    # Ruta del informe en ese idioma; solo se genera el PDF si su contenido es distinto de los ya generados
+    blocks = [block for name, build, inputs in SECTIONS for block in _section_blocks(name, build, inputs, lang)]
+    key = _hash([LAYOUT_VERSION, lang, blocks])
+    path = REPORTS_CACHE_DIR / f"{lang}-{key[:24]}.pdf"
+    if not path.exists():
+        _render_pdf(blocks, lang, path)
+    return path
+
+
+def publish_reports(languages=LANGUAGES):
+    # Genera los informes y los copia a data/reports (solo si han cambiado); devuelve los archivos actualizados
+    updated = []
+    for lang in languages:
+        source = build_report(lang)
+        target = REPORTS_DIR / REPORT_FILES[lang]
+        if not target.exists() or file_sha256(target) != file_sha256(source):
+            shutil.copyfile(source, target)
+            updated.append(target)
+    return updated
+
+
+if __name__ == "__main__":
+    # python -m utils.reports: genera los informes de los dos idiomas en .cache/reports
+    # python -m utils.reports --publish: además los copia a data/reports (sustituyen a los PDF de ejemplo)
+    parser = argparse.ArgumentParser(description="Build the executive summary PDFs from the current data.")
+    parser.add_argument("--publish", action="store_true", help="Copy the reports into data/reports")
+    args = parser.parse_args()
+    if args.publish:
+        updated = publish_reports()
+        print("\n".join(f"Updated {path}" for path in updated) or "Reports already up to date")
+    else:
+        for lang in LANGUAGES:
+            print(f"{lang}: {build_report(lang)}")
@@ -0,0 +1,227 @@
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import streamlit as st
+
+# Remuestreos por bloque: cada bloque tiene su propia semilla, así el resultado es el mismo
+# aunque cambie el número de procesos
+CHUNK_SIZE = 500
+
+# Resultados terminados que se guardan para no repetir nunca el mismo test con los mismos parámetros
+MAX_CACHED_RESULTS = 64
+
+# Filas por lote dentro de un bloque (limita la memoria de las matrices de índices)
+ROWS_PER_BATCH = 2_000_000
+
+
+def _bootstrap_chunk(control, test, n_resamples, seed):
+    # Bootstrap clásico: remuestreo con reemplazo de las filas de cada grupo
+    rng = np.random.default_rng(seed)
+    diffs = np.empty(n_resamples)
+    batch = max(1, ROWS_PER_BATCH // max(len(control) + len(test), 1))
+    for start in range(0, n_resamples, batch):
+        size = min(batch, n_resamples - start)
+        test_idx = rng.integers(0, len(test), size=(size, len(test)), dtype=np.int32)
+        control_idx = rng.integers(0, len(control), size=(size, len(control)), dtype=np.int32)
+        diffs[start:start + size] = test[test_idx].mean(axis=1) - control[control_idx].mean(axis=1)
+    return diffs
+
+
+def _permutation_chunk(control, test, n_resamples, seed):
+    # Test de permutaciones: barajamos las etiquetas Control/Test y recalculamos la diferencia de medias
+    rng = np.random.default_rng(seed)
+    pooled = np.concatenate([control, test])
+    total = pooled.sum()
+    n_test = len(test)
+    diffs = np.empty(n_resamples)
+    batch = max(1, ROWS_PER_BATCH // max(len(pooled), 1))
+    for start in range(0, n_resamples, batch):
+        size = min(batch, n_resamples - start)
+        shuffled = rng.permuted(np.broadcast_to(pooled, (size, len(pooled))), axis=1)
+        test_sums = shuffled[:, :n_test].sum(axis=1)
+        diffs[start:start + size] = test_sums / n_test - (total - test_sums) / len(control)
+    return diffs
+
+
+CHUNK_FUNCTIONS = {
+    "bootstrap": _bootstrap_chunk,
+    "permutation": _permutation_chunk,
+}
+
+
+class ResamplingJob:
+    # Un test repartido en bloques que se ejecutan en el pool de procesos
+
+    def __init__(self, key, kind, control, test, n_resamples, seed, alpha):
+        self.key = key
+        self.kind = kind
+        self.alpha = alpha
+        self.observed = float(test.mean() - control.mean())
+        self.owners = set()
+        self.cancelled = False
+        # Primer error de un bloque (pool roto, falta de memoria, datos que no se pueden enviar al proceso...)
+        self.error = None
+        self._lock = threading.Lock()
+        self._results = {}
+        self._result = None
+
+        sizes = [CHUNK_SIZE] * (n_resamples // CHUNK_SIZE)
+        if n_resamples % CHUNK_SIZE:
+            sizes.append(n_resamples % CHUNK_SIZE)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        pool = get_pool()
+        self._futures = []
+        self._chunks = len(sizes)
+        for i, (size, chunk_seed) in enumerate(zip(sizes, seeds)):
+            try:
+                future = pool.submit(CHUNK_FUNCTIONS[kind], control, test, size, chunk_seed)
+            except BaseException as error:
+                self._fail(error)
+                break
+            future.add_done_callback(lambda f, i=i: self._chunk_done(i, f))
+            self._futures.append(future)
+
+    def _fail(self, error):
+        with self._lock:
+            if self.error is None:
+                self.error = error
+
+    def _chunk_done(self, index, future):
+        # Se ejecuta en un hilo del pool: un error que salga de aquí se pierde, así que se guarda en el trabajo
+        try:
+            diffs = future.result()
+        except CancelledError:
+            return
+        except BaseException as error:
+            self._fail(error)
+            return
+        with self._lock:
+            self._results[index] = diffs
+
+    def progress(self):
+        with self._lock:
+            return len(self._results) / self._chunks
+
+    @property
+    def done(self):
+        return self.progress() == 1
+
+    def cancel(self):
+        # Cancela los bloques pendientes; los que ya se están ejecutando terminan solos (son cortos)
+        self.cancelled = True
+        for future in self._futures:
+            future.cancel()
+
+    def result(self):
+        if self._result is None and self.done:
+            # Juntamos los bloques en su orden original para que el resultado sea reproducible
+            diffs = np.concatenate([self._results[i] for i in range(self._chunks)])
+            self._result = summarize(self.kind, self.observed, diffs, self.alpha)
+        return self._result
+
+
+def summarize(kind, observed, diffs, alpha):
+    if kind == "bootstrap":
+        low, high = np.percentile(diffs, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+        return {"observed_diff": observed, "ci_low": float(low), "ci_high": float(high), "se": float(diffs.std(ddof=1)), "n_resamples": len(diffs)}
+    # p-valor bilateral con la corrección +1 (nunca devuelve exactamente 0)
+    extreme = np.count_nonzero(np.abs(diffs) >= abs(observed))
+    return {"observed_diff": observed, "p_value": float((extreme + 1) / (len(diffs) + 1)), "n_resamples": len(diffs)}
+
+
+@st.cache_resource
+def get_pool():
+    # Un único pool de procesos para todo el servidor; "spawn" evita copiar el estado de los hilos de Streamlit
+    return ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+
+
+class JobRegistry:
+    # Trabajos en curso y resultados terminados, compartidos entre sesiones
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.results = OrderedDict()
+
+
+@st.cache_resource
+def get_registry():
+    return JobRegistry()
+
+
+def _session_token():
+    if "resampling_session" not in st.session_state:
+        st.session_state["resampling_session"] = uuid.uuid4().hex
+    return st.session_state["resampling_session"]
+
+
+def start_job(key, kind, control, test, n_resamples=10_000, seed=42, alpha=0.05):
+    # Lanza (o reutiliza) el test identificado por key; key debe incluir el dataset, su versión y los parámetros
+    # Devuelve el resultado si ya estaba calculado o el trabajo en curso
+    registry = get_registry()
+    owner = _session_token()
+    with registry.lock:
+        if key in registry.results:
+            registry.results.move_to_end(key)
+            return registry.results[key]
+        job = registry.jobs.get(key)
+        if job is None or job.cancelled or job.error is not None:
+            control = np.asarray(control, dtype="float64")
+            test = np.asarray(test, dtype="float64")
+            job = ResamplingJob(key, kind, control[~np.isnan(control)], test[~np.isnan(test)], n_resamples, seed, alpha)
+            registry.jobs[key] = job
+        job.owners.add(owner)
+    st.session_state.setdefault("resampling_jobs", set()).add(key)
+    return job
+
+
+def poll_job(key):
+    # Devuelve el resultado si ya está, el trabajo si sigue en curso o ha fallado (job.error) o None si no existe
+    registry = get_registry()
+    with registry.lock:
+        if key in registry.results:
+            return registry.results[key]
+        job = registry.jobs.get(key)
+        if job is None:
+            return None
+        if job.error is not None:
+            # Se cancelan los bloques pendientes; con el botón se vuelve a lanzar (start_job crea otro trabajo)
+            if not job.cancelled:
+                job.cancel()
+                if isinstance(job.error, BrokenProcessPool):
+                    # Un pool roto no acepta más trabajos: el siguiente test crea uno nuevo
+                    get_pool.clear()
+            return job
+        if job.cancelled:
+            return None
+        if job.done:
+            registry.results[key] = job.result()
+            while len(registry.results) > MAX_CACHED_RESULTS:
+                registry.results.popitem(last=False)
+            del registry.jobs[key]
+            return registry.results[key]
+        return job
+
+
+def release_session_jobs():
+    # Se llama al salir de la página: los trabajos que ya no mira ninguna sesión se cancelan
+    keys = st.session_state.pop("resampling_jobs", set())
+    if not keys:
+        return
+    registry = get_registry()
+    owner = _session_token()
+    with registry.lock:
+        for key in keys:
+            job = registry.jobs.get(key)
+            if job is None:
+                continue
+            job.owners.discard(owner)
+            if not job.owners and not job.done:
+                job.cancel()
+                del registry.jobs[key]
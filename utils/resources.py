@@ -0,0 +1,184 @@
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.probes import probe
+
+# Recursos compartidos entre todas las sesiones (datasets, tablas de los gráficos, ZIP y PDF), con un presupuesto
+# de memoria por grupo: cuando se pasa del presupuesto se descartan los menos usados (LRU), y cada entrada caduca
+# a los ttl segundos. Con 200 personas viendo la presentación a la vez, la memoria no crece con el número de sesiones
+
+# Presupuesto (MB) y caducidad (segundos, None = no caduca) de cada grupo; ajústalos a la memoria del servidor
+POOLS = {
+    "datasets": {"budget_mb": 512, "ttl": None},
+    "charts": {"budget_mb": 64, "ttl": 3600},
+    "archives": {"budget_mb": 256, "ttl": 3600},
+    "reports": {"budget_mb": 64, "ttl": 3600},
+}
+
+_MISSING = object()
+
+
+def estimate_size(value):
+    # Bytes aproximados de un recurso (DataFrames con memory_usage(deep=True), contenedores sumando su contenido)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def read_only_view(value):
+    # Los DataFrames compartidos se devuelven como copia superficial: sin copiar datos, y con el copy-on-write
+    # de pandas una página que añade o cambia columnas no modifica el objeto que ven las demás sesiones
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return {key: read_only_view(item) for key, item in value.items()}
+    return value
+
+
+class ResourcePool:
+    # Caché LRU con presupuesto en bytes y caducidad; get_or_build construye cada clave una sola vez
+    # aunque muchas sesiones la pidan a la vez
+
+    def __init__(self, name, budget_mb, ttl):
+        self.name = name
+        self.budget = int(budget_mb * 1024 ** 2)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.building = {}
+        self.used = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "oversized": 0}
+
+    def _remove(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.used -= size
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISSING
+            value, _, expires = entry
+            if expires is not None and expires < time.monotonic():
+                self._remove(key)
+                self.stats["expirations"] += 1
+                return _MISSING
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            if size > self.budget:
+                # Más grande que todo el presupuesto: se devuelve a quien lo ha pedido pero no se guarda
+                self.stats["oversized"] += 1
+                return
+            while self.entries and self.used + size > self.budget:
+                self._remove(next(iter(self.entries)))
+                self.stats["evictions"] += 1
+            expires = None if self.ttl is None else time.monotonic() + self.ttl
+            self.entries[key] = (value, size, expires)
+            self.used += size
+
+    def get_or_build(self, key, build):
+        # Devuelve (valor, construido); si otra sesión ya lo está construyendo, espera a que termine
+        value = self.get(key)
+        if value is not _MISSING:
+            return value, False
+        with self.lock:
+            key_lock = self.building.setdefault(key, threading.Lock())
+        with key_lock:
+            value = self.get(key)
+            if value is not _MISSING:
+                return value, False
+            with self.lock:
+                self.stats["misses"] += 1
+            try:
+                value = build()
+                self.put(key, value)
+            finally:
+                with self.lock:
+                    self.building.pop(key, None)
+        return value, True
+
+    def discard(self, predicate=None):
+        with self.lock:
+            for key in [key for key in self.entries if predicate is None or predicate(key)]:
+                self._remove(key)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "pool": self.name,
+                "budget_bytes": self.budget,
+                "used_bytes": self.used,
+                "entries": len(self.entries),
+                "ttl": self.ttl,
+                **self.stats,
+            }
+
+
+class ResourceManager:
+    def __init__(self):
+        self.pools = {name: ResourcePool(name, **config) for name, config in POOLS.items()}
+
+    def snapshot(self):
+        return [pool.snapshot() for pool in self.pools.values()]
+
+    def clear(self):
+        for pool in self.pools.values():
+            pool.discard()
+
+
+# Con st.cache_resource, "Clear cache" del menú de Streamlit también vacía los recursos compartidos
+@st.cache_resource
+def get_resources():
+    return ResourceManager()
+
+
+def shared_resource(pool, name, spinner=None):
+    # Sustituye a @st.cache_resource / @st.cache_data para resultados que pueden compartir todas las sesiones:
+    # @shared_resource("charts", "charts.histogram"). Los argumentos forman la clave (deben ser hashables,
+    # e incluir la versión de los datos); la medida y los aciertos/fallos salen en Settings con el nombre name
+    def decorate(func):
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+
+            def build():
+                if spinner and get_script_run_ctx(suppress_warning=True) is not None:
+                    with st.spinner(spinner):
+                        return func(*args, **kwargs)
+                return func(*args, **kwargs)
+
+            with probe(name) as measure:
+                value, built = get_resources().pools[pool].get_or_build(key, build)
+                if measure is not None:
+                    measure.miss = built
+            return read_only_view(value)
+
+        call.clear = lambda: get_resources().pools[pool].discard(lambda key: key[0] == name)
+        return call
+
+    return decorate
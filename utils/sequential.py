@@ -0,0 +1,282 @@
+import argparse
+import io
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.datasets import COLUMN_DTYPES, dataset_path, dataset_version
+from utils.paths import CACHE_DIR, temp_path
+from utils.probes import cached_probe
+from utils.stats import CONTROL, TEST
+
+# Seguimiento secuencial del test A/B: mientras el experimento sigue y llegan filas nuevas a los datasets
+# (por ejemplo, las que añade utils/etl.py), se guardan por variación count, suma y suma de cuadrados de cada
+# métrica y el número de éxitos de cada tasa. Cada actualización solo lee las filas añadidas al final del archivo
+# y es una "mirada" al experimento: los p-valores son siempre válidos (mSPRT con mezcla normal), así se pueden
+# mirar tantas veces como se quiera sin inflar los falsos positivos, a diferencia del t-test de la página
+
+# Estado guardado de cada dataset (un JSON por dataset)
+SEQUENTIAL_DIR = CACHE_DIR / "sequential"
+
+# Cambia este número si cambia el formato del estado: obliga a empezar el seguimiento de nuevo
+SEQUENTIAL_VERSION = 1
+
+# Métricas con test de diferencia de medias
+METRICS = ["clnt_tenure_yr", "clnt_age", "num_accts", "bal", "calls_6_mnth", "logons_6_mnth"]
+
+# Tasas con test de diferencia de proporciones: nombre -> (columna, umbral); éxito = columna > umbral
+# Los umbrales tienen que estar fijados antes de empezar: cambiarlos a mitad del experimento invalida los p-valores
+RATES = {
+    "calls_6_mnth > 0": ("calls_6_mnth", 0),
+    "num_accts > 2": ("num_accts", 2),
+}
+
+# Tamaño del efecto (en desviaciones típicas) que se espera detectar: fija la varianza de la mezcla del mSPRT
+# Se calcula una vez, con la primera mirada que tiene MIN_SAMPLES clientes en cada grupo, y no cambia después
+MIXTURE_EFFECT = 0.1
+MIN_SAMPLES = 100
+
+# Cada cuántos segundos vuelve a mirar la página Statistics si hay filas nuevas
+REFRESH_SECONDS = 60
+
+# Bytes del final de la parte ya leída que se comparan para saber que el archivo solo ha crecido
+ANCHOR_BYTES = 64 * 1024
+
+_lock = threading.Lock()
+
+
+def _state_path(name):
+    return SEQUENTIAL_DIR / f"{name}.json"
+
+
+def _anchor(path, size):
+    # Los últimos ANCHOR_BYTES antes de size: si no han cambiado, lo anterior a size se da por igual (sin releerlo)
+    with open(path, "rb") as f:
+        f.seek(max(size - ANCHOR_BYTES, 0))
+        return f.read(min(size, ANCHOR_BYTES)).hex()
+
+
+def _source_state(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "anchor": _anchor(path, stat.st_size)}
+
+
+def _read_rows(path, start=0):
+    # Filas desde el byte start (0 = todo el archivo) con los tipos de utils/datasets.py
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    dtypes = {column: COLUMN_DTYPES[column] for column in columns if column in COLUMN_DTYPES}
+    if start == 0:
+        return pd.read_csv(path, dtype=dtypes)
+    with open(path, "rb") as f:
+        f.seek(start)
+        tail = f.read()
+    if not tail.strip():
+        return pd.read_csv(path, nrows=0, dtype=dtypes)
+    return pd.read_csv(io.BytesIO(tail), header=None, names=columns, dtype=dtypes)
+
+
+def _mixture_test(estimate, variance, tau2, alpha):
+    # mSPRT con mezcla normal N(0, tau2) sobre la diferencia: razón de verosimilitudes de cada mirada,
+    # 1 / razón como p-valor y el intervalo en el que la razón no supera 1 / alpha (secuencia de confianza)
+    # Acepta arrays (una posición por mirada)
+    ratio = np.sqrt(variance / (variance + tau2)) * np.exp(tau2 * estimate ** 2 / (2 * variance * (variance + tau2)))
+    half_width = np.sqrt(variance * (variance + tau2) / tau2 * (np.log((variance + tau2) / variance) - 2 * np.log(alpha)))
+    return np.minimum(1 / ratio, 1), estimate - half_width, estimate + half_width
+
+
+class SequentialMonitor:
+    # Estadísticos suficientes por variación y el historial de miradas (estimación y varianza de cada diferencia)
+    # update() con un lote de filas nuevas cuesta O(lote); results() y history() no dependen del número de filas
+
+    def __init__(self, metrics=METRICS, rates=RATES, group_col="variation"):
+        self.metrics = list(metrics)
+        self.rates = dict(rates)
+        self.group_col = group_col
+        self.rows = 0
+        # {variación: {métrica: [count, sum, sumsq]}} y {variación: {tasa: [count, éxitos]}}
+        self.sums = {}
+        self.successes = {}
+        self.tau2 = {}
+        self.looks = []
+
+    def update(self, batch):
+        if batch.empty:
+            return self
+        groups = batch[self.group_col].astype("string")
+        values = batch[self.metrics].astype("float64")
+        grouped = pd.concat(
+            {"count": values.notna(), "sum": values, "sumsq": values ** 2}, axis=1
+        ).groupby(groups, observed=True).sum()
+        flags = pd.DataFrame(
+            {name: (batch[column] > threshold).where(batch[column].notna()) for name, (column, threshold) in self.rates.items()},
+            index=batch.index,
+        ).astype("float64")
+        rate_grouped = pd.concat({"count": flags.notna(), "successes": flags}, axis=1).groupby(groups, observed=True).sum()
+        for variation in grouped.index:
+            sums = self.sums.setdefault(variation, {})
+            for metric in self.metrics:
+                previous = sums.get(metric, [0.0, 0.0, 0.0])
+                sums[metric] = [previous[i] + float(grouped.loc[variation, (part, metric)]) for i, part in enumerate(["count", "sum", "sumsq"])]
+            successes = self.successes.setdefault(variation, {})
+            for name in self.rates:
+                previous = successes.get(name, [0.0, 0.0])
+                successes[name] = [previous[i] + float(rate_grouped.loc[variation, (part, name)]) for i, part in enumerate(["count", "successes"])]
+        self.rows += len(batch)
+        self._look()
+        return self
+
+    def _differences(self):
+        # Diferencia Test - Control, su varianza y la varianza de referencia (para tau2) de cada métrica y tasa
+        differences = {}
+        if CONTROL not in self.sums or TEST not in self.sums:
+            return differences
+        for metric in self.metrics:
+            (n1, s1, q1), (n2, s2, q2) = self.sums[CONTROL][metric], self.sums[TEST][metric]
+            if min(n1, n2) < 2:
+                continue
+            m1, m2 = s1 / n1, s2 / n2
+            v1, v2 = max((q1 - n1 * m1 ** 2) / (n1 - 1), 0), max((q2 - n2 * m2 ** 2) / (n2 - 1), 0)
+            pooled = ((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2)
+            differences[metric] = {"n": (n1, n2), "means": (m1, m2), "estimate": m2 - m1, "variance": v1 / n1 + v2 / n2, "pooled": pooled}
+        for name in self.rates:
+            (n1, x1), (n2, x2) = self.successes[CONTROL][name], self.successes[TEST][name]
+            if min(n1, n2) < 2:
+                continue
+            p1, p2 = x1 / n1, x2 / n2
+            pooled = (x1 + x2) / (n1 + n2)
+            differences[name] = {
+                "n": (n1, n2), "means": (p1, p2), "estimate": p2 - p1,
+                "variance": p1 * (1 - p1) / n1 + p2 * (1 - p2) / n2, "pooled": pooled * (1 - pooled),
+            }
+        return differences
+
+    def _look(self):
+        look = {"time": time.time(), "rows": self.rows, "tests": {}}
+        for name, difference in self._differences().items():
+            if name not in self.tau2 and min(difference["n"]) >= MIN_SAMPLES and difference["pooled"] > 0:
+                self.tau2[name] = MIXTURE_EFFECT ** 2 * difference["pooled"]
+            if name in self.tau2 and difference["variance"] > 0:
+                look["tests"][name] = [difference["estimate"], difference["variance"]]
+        self.looks.append(look)
+
+    def history(self, alpha=0.05):
+        # Una fila por mirada y prueba: p-valor siempre válido (mínimo acumulado) e intervalo (intersección acumulada)
+        frames = []
+        for name, tau2 in self.tau2.items():
+            looks = [look for look in self.looks if name in look["tests"]]
+            if not looks:
+                continue
+            estimate, variance = np.array([look["tests"][name] for look in looks]).T
+            p_value, ci_low, ci_high = _mixture_test(estimate, variance, tau2, alpha)
+            frames.append(pd.DataFrame({
+                "test": name,
+                "look": range(1, len(looks) + 1),
+                "rows": [look["rows"] for look in looks],
+                "time": pd.to_datetime([look["time"] for look in looks], unit="s"),
+                "estimate": estimate,
+                "p_value": np.minimum.accumulate(p_value),
+                "ci_low": np.maximum.accumulate(ci_low),
+                "ci_high": np.minimum.accumulate(ci_high),
+            }))
+        if not frames:
+            return pd.DataFrame(columns=["test", "look", "rows", "time", "estimate", "p_value", "ci_low", "ci_high"])
+        return pd.concat(frames, ignore_index=True)
+
+    def results(self, alpha=0.05):
+        # Última mirada de cada prueba, con los tamaños y las medias (o tasas) actuales de cada grupo
+        history = self.history(alpha)
+        differences = self._differences()
+        rows = {}
+        for name, last in history.groupby("test", sort=False).tail(1).set_index("test").iterrows():
+            difference = differences[name]
+            rows[name] = {
+                "kind": "rate" if name in self.rates else "mean",
+                f"n_{CONTROL}": difference["n"][0],
+                f"n_{TEST}": difference["n"][1],
+                CONTROL: difference["means"][0],
+                TEST: difference["means"][1],
+                "diff": last["estimate"],
+                "p_value": last["p_value"],
+                "ci_low": last["ci_low"],
+                "ci_high": last["ci_high"],
+                "significant": last["p_value"] < alpha,
+                "looks": last["look"],
+            }
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+    def to_dict(self):
+        return {
+            "metrics": self.metrics, "rates": self.rates, "group_col": self.group_col, "rows": self.rows,
+            "sums": self.sums, "successes": self.successes, "tau2": self.tau2, "looks": self.looks,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        monitor = cls(data["metrics"], {name: tuple(rule) for name, rule in data["rates"].items()}, data["group_col"])
+        monitor.rows, monitor.sums, monitor.successes = data["rows"], data["sums"], data["successes"]
+        monitor.tau2, monitor.looks = data["tau2"], data["looks"]
+        return monitor
+
+    def save(self, path, source):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = temp_path(path)
+        tmp_path.write_text(json.dumps({"version": SEQUENTIAL_VERSION, "source": source, "monitor": self.to_dict()}))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        if not path.exists():
+            return None, None
+        state = json.loads(path.read_text())
+        if state.get("version") != SEQUENTIAL_VERSION:
+            return None, None
+        return cls.from_dict(state["monitor"]), state["source"]
+
+
+def update_monitor(name, restart=False):
+    # Lee solo lo que se ha añadido al dataset desde la última mirada y guarda el estado
+    # Si el archivo se ha reescrito (no solo crecido), o cambian las métricas o tasas, el seguimiento empieza de nuevo
+    path = dataset_path(name)
+    with _lock:
+        monitor, source = (None, None) if restart else SequentialMonitor.load(_state_path(name))
+        if monitor is not None and (monitor.metrics != METRICS or monitor.rates != RATES):
+            monitor = None
+        stat = os.stat(path)
+        if monitor is not None and (stat.st_size, stat.st_mtime_ns) == (source["size"], source["mtime_ns"]):
+            return monitor
+        if monitor is not None and stat.st_size >= source["size"] and _anchor(path, source["size"]) == source["anchor"]:
+            batch = _read_rows(path, source["size"])
+        else:
+            monitor, batch = SequentialMonitor(), _read_rows(path)
+        monitor.update(batch)
+        monitor.save(_state_path(name), _source_state(path))
+        return monitor
+
+
+@cached_probe("sequential.results", st.cache_data(show_spinner="Updating sequential tests...", max_entries=8))
+def _sequential_results(name, version, alpha):
+    monitor = update_monitor(name)
+    return {"results": monitor.results(alpha), "history": monitor.history(alpha), "rows": monitor.rows}
+
+
+def sequential_results(name, alpha=0.05):
+    # Resultados del seguimiento secuencial; solo se vuelve a mirar cuando cambia la versión del dataset
+    return _sequential_results(name, dataset_version(name), alpha)
+
+
+if __name__ == "__main__":
+    # python -m utils.sequential clients            mira las filas nuevas de df_clients y muestra los tests
+    # python -m utils.sequential clients --restart  empieza el seguimiento de nuevo con todo el archivo
+    parser = argparse.ArgumentParser(description="Update the sequential A/B tests with the rows appended to a dataset.")
+    parser.add_argument("dataset", nargs="?", default="clients", help="Dataset name from utils/datasets.py")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level of the confidence sequences")
+    parser.add_argument("--restart", action="store_true", help="Discard the saved state and start over")
+    args = parser.parse_args()
+    monitor = update_monitor(args.dataset, restart=args.restart)
+    print(f"{monitor.rows:,} rows, {len(monitor.looks)} looks")
+    print(monitor.results(args.alpha).to_string())
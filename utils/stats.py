@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy import stats as sps
+
+from utils.datasets import dataset_version, load_dataset
+from utils.probes import cached_probe
+from utils.warmcache import dataset_inputs, persistent
+
+# Nombres de los grupos del experimento (cámbialos si tu columna de variación usa otros)
+CONTROL = "Control"
+TEST = "Test"
+
+# Si una variable tiene más valores distintos que esto, el bootstrap se hace por tramos (ver _bootstrap_means):
+# ya no es un remuestreo exacto sino una aproximación, y el informe lo indica en la columna boot_method
+MAX_BOOTSTRAP_BINS = 256
+
+# Valores de boot_method en ab_test_report
+BOOT_EXACT = "Poisson bootstrap"
+BOOT_APPROXIMATE = "binned (approx.)"
+
+# Número de remuestreos que se calculan a la vez en cada matriz
+BOOTSTRAP_BATCH = 2000
+
+
+def group_moments(df, value_cols, group_col="variation"):
+    # count, media y varianza (ddof=1) de varias columnas por grupo en un solo groupby
+    # Pasamos a float64 antes de sumar: los datasets se guardan en float32
+    values = df[list(value_cols)].astype("float64")
+    grouped = values.groupby(df[group_col], observed=True)
+    return grouped.count(), grouped.mean(), grouped.var()
+
+
+def welch_from_moments(n1, m1, v1, n2, m2, v2, alpha=0.05):
+    # Welch t-test (varianzas distintas) a partir de count, media y varianza de cada grupo (grupo 2 - grupo 1)
+    # Acepta números, arrays o Series (un test por posición)
+    se2_1, se2_2 = v1 / n1, v2 / n2
+    se = np.sqrt(se2_1 + se2_2)
+    diff = m2 - m1
+    t_stat = diff / se
+    dof = (se2_1 + se2_2) ** 2 / (se2_1 ** 2 / (n1 - 1) + se2_2 ** 2 / (n2 - 1))
+    p_value = 2 * sps.t.sf(np.abs(t_stat), dof)
+    t_crit = sps.t.ppf(1 - alpha / 2, dof)
+
+    # Tamaño del efecto: g de Hedges (d de Cohen con corrección para muestras pequeñas)
+    pooled_sd = np.sqrt(((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2))
+    hedges_g = diff / pooled_sd * (1 - 3 / (4 * (n1 + n2) - 9))
+    return {
+        "diff": diff,
+        "rel_diff": diff / m1,
+        "t_stat": t_stat,
+        "dof": dof,
+        "p_value": p_value,
+        "ci_low": diff - t_crit * se,
+        "ci_high": diff + t_crit * se,
+        "hedges_g": hedges_g,
+        "significant": p_value < alpha,
+    }
+
+
+def welch_ttest(df, value_cols, group_col="variation", control=CONTROL, treatment=TEST, alpha=0.05):
+    # Welch t-test de treatment vs control para todas las columnas a la vez
+    counts, means, variances = group_moments(df, value_cols, group_col)
+    n1, n2 = counts.loc[control], counts.loc[treatment]
+    m1, m2 = means.loc[control], means.loc[treatment]
+    result = welch_from_moments(n1, m1, variances.loc[control], n2, m2, variances.loc[treatment], alpha)
+    return pd.DataFrame({
+        f"n_{control}": n1,
+        f"n_{treatment}": n2,
+        f"mean_{control}": m1,
+        f"mean_{treatment}": m2,
+        **result,
+    })
+
+
+def two_proportion_ztest(successes_control, n_control, successes_test, n_test, alpha=0.05, alternative="two-sided"):
+    # z-test de dos proporciones; acepta números o arrays (un test por posición)
+    # alternative: "two-sided", "larger" (Test > Control) o "smaller" (Test < Control)
+    x1, n1 = np.asarray(successes_control, dtype="float64"), np.asarray(n_control, dtype="float64")
+    x2, n2 = np.asarray(successes_test, dtype="float64"), np.asarray(n_test, dtype="float64")
+    p1, p2 = x1 / n1, x2 / n2
+    pooled = (x1 + x2) / (n1 + n2)
+    z = (p2 - p1) / np.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    if alternative == "two-sided":
+        p_value = 2 * sps.norm.sf(np.abs(z))
+    elif alternative == "larger":
+        p_value = sps.norm.sf(z)
+    elif alternative == "smaller":
+        p_value = sps.norm.cdf(z)
+    else:
+        raise ValueError(f"Unknown alternative '{alternative}'")
+
+    # Intervalo de confianza de la diferencia con el error estándar sin agrupar
+    se = np.sqrt(p1 * (1 - p1) / n1 + p2 * (1 - p2) / n2)
+    z_crit = sps.norm.ppf(1 - alpha / 2)
+    return {
+        "rate_control": p1,
+        "rate_test": p2,
+        "diff": p2 - p1,
+        "z_stat": z,
+        "p_value": p_value,
+        "ci_low": p2 - p1 - z_crit * se,
+        "ci_high": p2 - p1 + z_crit * se,
+        # h de Cohen: tamaño del efecto para proporciones
+        "cohens_h": 2 * np.arcsin(np.sqrt(p2)) - 2 * np.arcsin(np.sqrt(p1)),
+        "significant": p_value < alpha,
+    }
+
+
+def proportion_test(df, success_cols, group_col="variation", control=CONTROL, treatment=TEST, alpha=0.05, alternative="two-sided"):
+    # Igual que two_proportion_ztest pero a partir de columnas booleanas (True = éxito), todas a la vez
+    flags = df[list(success_cols)].astype("float64")
+    grouped = flags.groupby(df[group_col], observed=True)
+    successes, totals = grouped.sum(), grouped.count()
+    result = two_proportion_ztest(
+        successes.loc[control], totals.loc[control],
+        successes.loc[treatment], totals.loc[treatment],
+        alpha=alpha, alternative=alternative,
+    )
+    return pd.DataFrame(result, index=list(success_cols))
+
+
+def _bootstrap_means(values, n_resamples, rng):
+    # Bootstrap de Poisson: en cada remuestreo cada fila aparece Poisson(1) veces
+    # En vez de remuestrear filas, agrupamos los valores y sorteamos cuántas veces sale cada grupo,
+    # así cada lote de remuestreos es una matriz (lote x grupos) y no (lote x filas)
+    # Devuelve (medias, exacto): exacto es False si se ha usado la aproximación por tramos
+    values = np.asarray(values, dtype="float64")
+    values = values[~np.isnan(values)]
+    uniques, counts = np.unique(values, return_counts=True)
+    if len(uniques) <= MAX_BOOTSTRAP_BINS:
+        # Pocos valores distintos: agrupar por valor es exacto
+        sizes, bin_means, bin_vars = counts, uniques, None
+    else:
+        # Muchos valores distintos: tramos de cuantiles; la variación dentro de cada tramo
+        # se añade con una aproximación normal (media y varianza del tramo)
+        sorted_values = np.sort(values)
+        edges = np.linspace(0, len(sorted_values), MAX_BOOTSTRAP_BINS + 1).astype(int)
+        sizes = np.diff(edges)
+        bin_means = np.add.reduceat(sorted_values, edges[:-1]) / sizes
+        bin_vars = np.maximum(np.add.reduceat(sorted_values ** 2, edges[:-1]) / sizes - bin_means ** 2, 0)
+
+    means = np.empty(n_resamples)
+    for start in range(0, n_resamples, BOOTSTRAP_BATCH):
+        batch = min(BOOTSTRAP_BATCH, n_resamples - start)
+        draws = rng.poisson(sizes.astype("float64"), size=(batch, len(sizes)))
+        sums = draws @ bin_means
+        if bin_vars is not None:
+            sums += np.sqrt(draws @ bin_vars) * rng.standard_normal(batch)
+        means[start:start + batch] = sums / np.maximum(draws.sum(axis=1), 1)
+    return means, bin_vars is None
+
+
+def bootstrap_diff_ci(control_values, test_values, n_resamples=10_000, alpha=0.05, seed=42):
+    # Intervalo de confianza bootstrap (percentiles) de la diferencia de medias Test - Control
+    # Para un remuestreo exacto de las filas con cualquier variable está "Resampling tests" (utils/resampling.py)
+    rng = np.random.default_rng(seed)
+    test_means, test_exact = _bootstrap_means(test_values, n_resamples, rng)
+    control_means, control_exact = _bootstrap_means(control_values, n_resamples, rng)
+    diffs = test_means - control_means
+    low, high = np.percentile(diffs, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    method = BOOT_EXACT if test_exact and control_exact else BOOT_APPROXIMATE
+    return {"boot_ci_low": low, "boot_ci_high": high, "boot_se": diffs.std(ddof=1), "boot_method": method}
+
+
+@cached_probe("stats.ab_test_report", st.cache_data(show_spinner="Running statistical tests...", max_entries=32))
+@persistent("stats.ab_test_report", inputs=dataset_inputs, ignore=("version",))
+def _ab_test_report(name, version, value_cols, group_col, n_resamples, alpha, seed):
+    df = load_dataset(name, columns=[*value_cols, group_col])
+    report = welch_ttest(df, value_cols, group_col, alpha=alpha)
+    control = df[df[group_col] == CONTROL]
+    test = df[df[group_col] == TEST]
+    boot = pd.DataFrame(
+        {col: bootstrap_diff_ci(control[col], test[col], n_resamples, alpha, seed) for col in value_cols}
+    ).T
+    return report.join(boot)
+
+
+def ab_test_report(name, value_cols, group_col="variation", n_resamples=10_000, alpha=0.05, seed=42):
+    # Tabla con Welch t-test, g de Hedges e IC bootstrap por columna (boot_method: exacto o aproximado por tramos)
+    # Se calcula una vez por versión del dataset
+    return _ab_test_report(name, dataset_version(name), tuple(value_cols), group_col, n_resamples, alpha, seed)
+
+
+@cached_probe("stats.threshold_proportion_test", st.cache_data(show_spinner="Running statistical tests...", max_entries=32))
+@persistent("stats.threshold_proportion_test", inputs=dataset_inputs, ignore=("version",))
+def _threshold_proportion_test(name, version, value_col, threshold, group_col, alpha):
+    df = load_dataset(name, columns=[value_col, group_col])
+    flags = pd.DataFrame({value_col: df[value_col] > threshold, group_col: df[group_col]})
+    return proportion_test(flags, [value_col], group_col, alpha=alpha)
+
+
+def threshold_proportion_test(name, value_col, threshold, group_col="variation", alpha=0.05):
+    # z-test de la proporción de clientes con value_col > threshold en Test vs Control
+    return _threshold_proportion_test(name, dataset_version(name), value_col, float(threshold), group_col, alpha)
@@ -0,0 +1,115 @@
+# Textos de la app: las hipótesis de la página "Interactive Analysis" y las conclusiones, que también salen en los
+# informes PDF (ver utils/reports.py) en inglés ("en") y español ("es")
+# En los informes, el resultado de cada test no sale de HYPOTHESES: se escribe con los valores calculados
+# Se escriben en Markdown; en el PDF se admiten títulos (###), listas (-), citas (>) y negritas (**)
+
+HYPOTHESES = {
+    "completion_rate": """
+**H₀**: completion_rate(Control) = completion_rate(Test)  
+**H₁**: completion_rate(Control) ≠ completion_rate(Test)  
+We rejected **H₀**, so the difference is significant.  
+However, the increase is below the **+5% threshold**, so it doesn’t meet the business criterion.  
+""",
+    "first_attempt_rate": """
+**H₀**: first_attempt_success(Control) = first_attempt_success(Test)  
+**H₁**: first_attempt_success(Control) ≠ first_attempt_success(Test)  
+We performed the test and rejected **H₀**.  
+✅ So, the difference in first attempt success rate is statistically significant.  
+Although more users in the Test group completed the process, the success rate on the first attempt was **lower** than in the Control group (**43.67% vs. 47.39%**).  
+""",
+    "step_times": """
+**UX Insights**:  
+• Test starts faster → less initial friction  
+• Test slower at step_1 & confirm → +5s and +23s (not significant)  
+• Big speedup at step_3 (**+7s**, highly significant)  
+• Mixed results: some steps better, others worse  
+• Statistically solid effects, but overall UX needs review  
+""",
+    "error_rate": """
+**H₀**: error_rate(Control) ≤ error_rate(Test)  
+**H₁**: error_rate(Control) > error_rate(Test)  
+We performed the test and rejected **H₀**.  
+✅ So, the global error rate in **Control** is significantly higher than in **Test**.  
+Control had an error rate of **0.19%**, while Test reduced this to **0.07%**, indicating a clear improvement in the new design’s performance.  
+""",
+}
+
+# Conclusiones: una introducción y una lista de apartados (título, texto)
+CONCLUSIONS = {
+    "en": {
+        "intro": """
+This (**Test group**) has shown **statistically significant improvements** in..., but it **does not fully meet all operational effectiveness criteria** defined by X.  
+Below is a summary of the final trade-off between the two versions:  
+""",
+        "sections": [
+            ("✅ Clear Advantages of the Test Group", """
+- **X**:
+- **X**:
+- **Critical “confirm” step errors** reduced from x to x
+  > +0.5 pp improvement,
+"""),
+            ("⚠️ Limitations of the Test Group", """
+- **X**: 43.7% vs. 47.4%
+  > Indicates...
+- **X**
+  > X → X
+- **X** in...
+  - Xds
+  - X
+  > X
+"""),
+            ("🧠 Hypotheses & Business Considerations", """
+- Some improvements...
+  > e.g.
+- **Exception**:
+"""),
+            ("🧭 Final Recommendation", """
+It is recommended to **X**:
+
+> - X
+> - X
+> - X
+
+Final comment **x**, **x**, and **x**
+"""),
+        ],
+    },
+    "es": {
+        "intro": """
+El (**grupo Test**) ha mostrado **mejoras estadísticamente significativas** en..., pero **no cumple todos los criterios de eficacia operativa** definidos por X.  
+A continuación, un resumen del balance final entre las dos versiones:  
+""",
+        "sections": [
+            ("✅ Ventajas claras del grupo Test", """
+- **X**:
+- **X**:
+- **Errores en el paso crítico “confirm”** reducidos de x a x
+  > mejora de +0,5 pp,
+"""),
+            ("⚠️ Limitaciones del grupo Test", """
+- **X**: 43,7% frente a 47,4%
+  > Indica...
+- **X**
+  > X → X
+- **X** en...
+  - Xds
+  - X
+  > X
+"""),
+            ("🧠 Hipótesis y consideraciones de negocio", """
+- Algunas mejoras...
+  > p. ej.
+- **Excepción**:
+"""),
+            ("🧭 Recomendación final", """
+Se recomienda **X**:
+
+> - X
+> - X
+> - X
+
+Comentario final **x**, **x** y **x**
+"""),
+        ],
+    },
+}
@@ -0,0 +1,187 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats as sps
+
+from utils.datasets import dataset_path, dataset_version
+from utils.resources import shared_resource
+from utils.warmcache import dataset_inputs, persistent
+
+# Validación de los datasets: reglas declarativas por columna (tipo, rango, nulos, valores permitidos, duplicados)
+# y por dataset (reparto Control/Test), comprobadas de una pasada vectorizada sobre la copia columnar
+# El resultado se calcula una vez por versión del archivo, se guarda en la caché en disco y sale en "Load & Quick EDA"
+
+# Reglas de cada columna:
+#   kind            "id" (entero sin nulos), "integer" (números enteros), "number" o "category"
+#   min / max       rango permitido
+#   max_null_ratio  proporción máxima de nulos (0 = ninguno)
+#   values          valores permitidos (categorías); warn_values: permitidos pero que conviene revisar
+#   unique          sin valores repetidos
+CLIENT_ID = {"kind": "id", "min": 1, "unique": True, "max_null_ratio": 0}
+DEMO_COLUMNS = {
+    "client_id": CLIENT_ID,
+    "clnt_tenure_yr": {"kind": "integer", "min": 0, "max": 100, "max_null_ratio": 0.01},
+    "clnt_tenure_mnth": {"kind": "integer", "min": 0, "max": 1200, "max_null_ratio": 0.01},
+    "clnt_age": {"kind": "number", "min": 0, "max": 120, "max_null_ratio": 0.01},
+    "gendr": {"kind": "category", "values": ["M", "F", "U", "X"], "warn_values": ["U", "X"], "max_null_ratio": 0.01},
+    "num_accts": {"kind": "integer", "min": 1, "max": 100, "max_null_ratio": 0.01},
+    "bal": {"kind": "number", "min": 0, "max_null_ratio": 0.01},
+    "calls_6_mnth": {"kind": "integer", "min": 0, "max_null_ratio": 0.01},
+    "logons_6_mnth": {"kind": "integer", "min": 0, "max_null_ratio": 0.01},
+}
+VARIATION = {"kind": "category", "values": ["Control", "Test"]}
+
+# Reparto esperado de clientes entre grupos (el del diseño del experimento); se comprueba con un test chi-cuadrado
+EXPECTED_SPLIT = {"Control": 0.5, "Test": 0.5}
+
+# Esquema de cada dataset de utils/datasets.py: cambia las reglas si cambian los archivos de tu proyecto
+SCHEMAS = {
+    "demo": {"columns": DEMO_COLUMNS},
+    "experiment": {
+        "columns": {"client_id": CLIENT_ID, "Variation": {**VARIATION, "max_null_ratio": 0.5}},
+        "split": {"column": "Variation", "expected": EXPECTED_SPLIT},
+    },
+    # df_clients y df_networth salen de utils/etl.py: sin nulos
+    "clients": {
+        "columns": {**{column: {**rules, "max_null_ratio": 0} for column, rules in DEMO_COLUMNS.items()}, "variation": {**VARIATION, "max_null_ratio": 0}},
+        "split": {"column": "variation", "expected": EXPECTED_SPLIT},
+    },
+}
+SCHEMAS["networth"] = SCHEMAS["clients"]
+
+# p-valor por debajo del cual el reparto entre grupos no es el esperado (sample ratio mismatch)
+SRM_P_VALUE = 0.001
+
+# Filas del CSV que se leen como texto para ver cómo están escritos los números (por ejemplo "6.0" en vez de "6")
+SAMPLE_ROWS = 1000
+
+
+def _result(column, rule, passed, failing=0, detail="", severity="error"):
+    return {"column": column, "rule": rule, "status": "ok" if passed else severity, "failing_rows": int(failing), "detail": detail}
+
+
+def _check_column(name, series, rules, sample):
+    results = []
+    rows = len(series)
+    nulls = series.isna().to_numpy()
+    null_count = int(nulls.sum())
+
+    if "max_null_ratio" in rules:
+        ratio = null_count / rows if rows else 0.0
+        results.append(_result(name, "nulls", ratio <= rules["max_null_ratio"], null_count,
+                               f"{ratio:.2%} empty (at most {rules['max_null_ratio']:.0%})"))
+
+    kind = rules.get("kind", "number")
+    if kind in ("id", "integer", "number"):
+        if not pd.api.types.is_numeric_dtype(series.dtype):
+            # Texto en una columna numérica: se cuentan los valores que no son números y se sigue con el resto
+            numbers = pd.to_numeric(series, errors="coerce")
+            invalid = int((numbers.isna() & ~nulls).sum())
+            examples = series[numbers.isna() & ~nulls].astype(str).unique()[:5]
+            results.append(_result(name, "type", False, invalid, f"not numbers: {', '.join(examples)}"))
+            series, nulls = numbers, numbers.isna().to_numpy()
+        values = series.to_numpy()[~nulls]
+        if kind in ("id", "integer"):
+            # Números enteros aunque se guarden como decimales; los que tienen parte decimal fallan
+            fractional = int(np.count_nonzero(values != np.floor(values))) if values.dtype.kind == "f" else 0
+            results.append(_result(name, "whole numbers", fractional == 0, fractional, "values with decimals" if fractional else "all whole"))
+            if sample is not None and sample.str.contains(r"\.0$", na=False).any():
+                results.append(_result(name, "storage", False, 0, "whole numbers written with decimals (6.0)", severity="warning"))
+        if "min" in rules or "max" in rules:
+            low, high = rules.get("min", -np.inf), rules.get("max", np.inf)
+            out = int(np.count_nonzero((values < low) | (values > high)))
+            bounds = f"{values.min():,.6g} to {values.max():,.6g}" if len(values) else "no values"
+            results.append(_result(name, "range", out == 0, out, f"{bounds} (allowed {low:,.6g} to {high:,.6g})"))
+        if rules.get("unique"):
+            duplicates = len(values) - len(pd.unique(values))
+            results.append(_result(name, "unique", duplicates == 0, duplicates, f"{duplicates:,} repeated values" if duplicates else "no repeats"))
+    elif kind == "category":
+        counts = series.value_counts(dropna=True)
+        counts = counts[counts > 0]
+        unknown = counts[~counts.index.isin(rules.get("values", counts.index))]
+        results.append(_result(name, "values", unknown.empty, unknown.sum(),
+                               f"unexpected: {', '.join(map(str, unknown.index[:10]))}" if len(unknown) else f"{len(counts)} known values"))
+        flagged = counts[counts.index.isin(rules.get("warn_values", []))]
+        if len(flagged):
+            results.append(_result(name, "review values", False, flagged.sum(),
+                                   ", ".join(f"{value}: {count:,}" for value, count in flagged.items()), severity="warning"))
+    return results
+
+
+def _check_split(df, split):
+    # Sample ratio mismatch: test chi-cuadrado de los clientes por grupo frente al reparto esperado
+    column, expected = split["column"], split["expected"]
+    counts = df[column].value_counts().reindex(list(expected), fill_value=0).astype("float64")
+    total = counts.sum()
+    if total == 0:
+        return _result(column, "sample ratio", False, 0, "no clients in any group")
+    p_value = sps.chisquare(counts.to_numpy(), np.array(list(expected.values())) * total).pvalue
+    shares = ", ".join(f"{group}: {count / total:.1%}" for group, count in counts.items())
+    return _result(column, "sample ratio", p_value >= SRM_P_VALUE, 0, f"{shares} (p = {p_value:.2g})", severity="warning")
+
+
+def validate_frame(df, schema, sample=None):
+    # Una fila por regla comprobada: column, rule, status ("ok", "warning", "error"), failing_rows, detail
+    # sample: primeras filas del archivo leídas como texto (para la regla "storage"), opcional
+    results = []
+    for column, rules in schema["columns"].items():
+        if column not in df.columns:
+            results.append(_result(column, "present", False, len(df), "column missing"))
+            continue
+        column_sample = sample[column] if sample is not None and column in sample.columns else None
+        results.extend(_check_column(column, df[column], rules, column_sample))
+    extra = [column for column in df.columns if column not in schema["columns"]]
+    if extra:
+        results.append(_result(", ".join(extra), "unexpected columns", False, 0, "not in the schema", severity="warning"))
+    if "split" in schema and schema["split"]["column"] in df.columns:
+        results.append(_check_split(df, schema["split"]))
+    return pd.DataFrame(results, columns=["column", "rule", "status", "failing_rows", "detail"])
+
+
+def _read_for_validation(name):
+    # Copia columnar (rápida); si el archivo no se puede leer con los tipos esperados, el CSV tal cual
+    from utils.columnar import read_columns
+
+    path = dataset_path(name)
+    sample = pd.read_csv(path, nrows=SAMPLE_ROWS, dtype=str)
+    try:
+        return read_columns(name), sample, None
+    except (ValueError, TypeError) as error:
+        return pd.read_csv(path, low_memory=False), sample, f"{type(error).__name__}: {error}"
+
+
+@shared_resource("charts", "validation.validate_dataset", spinner="Validating dataset...")
+@persistent("validation.validate_dataset", inputs=dataset_inputs, ignore=("version",))
+def _validate_dataset(name, version):
+    df, sample, load_error = _read_for_validation(name)
+    results = validate_frame(df, SCHEMAS[name], sample)
+    if load_error is not None:
+        load = pd.DataFrame([_result("(file)", "load", False, 0, load_error)])
+        results = pd.concat([load, results], ignore_index=True)
+    return {"rows": len(df), "results": results}
+
+
+def validate_dataset(name):
+    # Resultado de la validación del dataset ({"rows", "results"}); None si no hay esquema para ese dataset
+    if name not in SCHEMAS:
+        return None
+    return _validate_dataset(name, dataset_version(name))
+
+
+if __name__ == "__main__":
+    # python -m utils.validation [dataset ...]: valida los datasets y termina con código 1 si alguna regla falla
+    parser = argparse.ArgumentParser(description="Validate the project datasets against their schemas.")
+    parser.add_argument("datasets", nargs="*", help="Datasets to validate (default: all with a schema)")
+    args = parser.parse_args()
+
+    failed = False
+    for name in args.datasets or SCHEMAS:
+        start = time.perf_counter()
+        validation = validate_dataset(name)
+        results = validation["results"]
+        print(f"{name}: {validation['rows']:,} rows in {time.perf_counter() - start:.2f} s")
+        print(results[results["status"] != "ok"].to_string(index=False) if (results["status"] != "ok").any() else "  all rules pass")
+        failed = failed or (results["status"] == "error").any()
+    raise SystemExit(1 if failed else 0)
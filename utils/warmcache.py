@@ -0,0 +1,200 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+from pathlib import Path
+
+import streamlit as st
+
+from utils.columnar import file_sha256
+from utils.datasets import dataset_path
+from utils.paths import BASE_DIR, CACHE_DIR, temp_path
+from utils.probes import probe
+
+# Caché en disco de resultados calculados (tablas de los gráficos, agregados de KPIs, tests, ZIP) que sobrevive a los
+# reinicios del servidor: tras un despliegue, la primera visita lee los resultados del disco en vez de recalcularlos
+# La clave es el hash del contenido de los archivos de entrada (no su fecha: un git clone cambia todas las fechas),
+# de los argumentos y del código (el módulo de la función y todo utils/, del que dependen); si cambia cualquiera, es otra entrada
+# Se usa debajo de las cachés en memoria: @shared_resource(...) / @cached_probe(...) y después @persistent(...)
+
+WARM_CACHE_DIR = CACHE_DIR / "warm"
+
+# Tamaño máximo de la caché en disco; al pasarlo se borran las entradas usadas hace más tiempo (LRU)
+WARM_CACHE_MAX_MB = 512
+
+# Cambia este número para invalidar todo (por ejemplo, si cambia una librería de la que dependen los resultados)
+CACHE_VERSION = 1
+
+# Módulos cuyo código entra en la clave de todas las entradas
+UTILS_DIR = Path(__file__).parent
+
+_MISSING = object()
+
+
+@functools.lru_cache(maxsize=256)
+def _digest(path, mtime_ns, size):
+    return file_sha256(path)
+
+
+def file_digest(path):
+    # Hash del contenido del archivo; solo se vuelve a leer si cambian su fecha o su tamaño
+    stat = os.stat(path)
+    return _digest(os.fspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def dataset_digest(name):
+    return file_digest(dataset_path(name))
+
+
+def dataset_inputs(arguments):
+    # Archivo de entrada de las funciones cuyo primer argumento es el nombre de un dataset
+    return [dataset_path(arguments["name"])]
+
+
+def _relative(path):
+    # Las rutas de la clave son relativas al proyecto: la caché sirve aunque se despliegue en otra carpeta
+    try:
+        return os.path.relpath(path, BASE_DIR)
+    except ValueError:
+        return os.fspath(path)
+
+
+def _hash(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class DiskCache:
+    # Un archivo pickle por entrada; la fecha de modificación es la del último uso (se actualiza en cada acierto)
+
+    def __init__(self, folder, max_mb):
+        self.folder = folder
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "oversized": 0}
+
+    def _path(self, key):
+        return self.folder / f"{key}.pkl"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            value = _MISSING
+        except Exception:
+            # Archivo a medias o de otra versión de las librerías: se descarta y se vuelve a calcular
+            path.unlink(missing_ok=True)
+            value = _MISSING
+        with self.lock:
+            self.stats["misses" if value is _MISSING else "hits"] += 1
+        return value
+
+    def put(self, key, value):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            with self.lock:
+                self.stats["oversized"] += 1
+            return
+        self.folder.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        # Escribimos en un temporal y lo renombramos para que otro proceso nunca lea una entrada a medias
+        tmp_path = temp_path(path)
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+        with self.lock:
+            self.stats["writes"] += 1
+            self._evict()
+
+    def _entries(self):
+        entries = []
+        for path in self.folder.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        used = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if used <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            used -= size
+            self.stats["evictions"] += 1
+
+    def snapshot(self):
+        entries = self._entries() if self.folder.exists() else []
+        with self.lock:
+            return {
+                "folder": os.fspath(self.folder),
+                "used_bytes": sum(size for _, size, _ in entries),
+                "budget_bytes": self.max_bytes,
+                "entries": len(entries),
+                **self.stats,
+            }
+
+    def clear(self):
+        for _, _, path in self._entries() if self.folder.exists() else []:
+            path.unlink(missing_ok=True)
+
+
+@st.cache_resource
+def get_disk_cache():
+    return DiskCache(WARM_CACHE_DIR, WARM_CACHE_MAX_MB)
+
+
+@functools.lru_cache(maxsize=1)
+def _package_version():
+    # Hash de todos los módulos de utils/: las funciones en caché llaman a otras de utils (stats, datasets, columnar...)
+    return _hash([(path.name, file_digest(path)) for path in sorted(UTILS_DIR.glob("*.py"))])
+
+
+def _code_version(func):
+    # Hash del módulo de la función y de utils/: cualquier cambio en ese código invalida sus entradas
+    try:
+        module = file_digest(inspect.getsourcefile(func))
+    except (OSError, TypeError):
+        module = func.__qualname__
+    return _hash([module, _package_version()])
+
+
+def persistent(name, inputs=None, ignore=()):
+    # @persistent("charts.histogram", inputs=dataset_inputs, ignore=("version",))
+    # inputs recibe los argumentos (dict) y devuelve los archivos de los que depende el resultado; su contenido
+    # entra en la clave. Los argumentos de ignore no entran (las versiones por fecha, que cambian al desplegar)
+    def decorate(func):
+        signature = inspect.signature(func)
+        code = _code_version(func)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            values = dict(arguments.arguments)
+            files = inputs(values) if inputs else []
+            key = _hash([
+                CACHE_VERSION, name, code,
+                {argument: value for argument, value in values.items() if argument not in ignore},
+                [(_relative(path), file_digest(path)) for path in files],
+            ])
+            cache = get_disk_cache()
+            with probe(f"{name}.disk") as measure:
+                value = cache.get(key)
+                if measure is not None:
+                    measure.miss = value is _MISSING
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                cache.put(key, value)
+            return value
+
+        return call
+
+    return decorate
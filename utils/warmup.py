@@ -0,0 +1,111 @@
+import argparse
+import os
+import time
+
+from sections import PAGES
+from utils.datasets import DATASETS
+from utils.paths import BASE_DIR, PROCESSED_DIR, RAW_DIR
+
+# Calentamiento antes de abrir el servidor: calcula y deja en disco todo lo que necesitan las páginas del menú
+# (las de option_titles_en en app.py), así la primera persona que entra tras un despliegue no espera a nada
+#   python -m utils.warmup && streamlit run app.py
+# Lo que queda en disco: data/processed (utils/etl.py), copias columnares (utils/columnar.py), texto de los PDF
+# (utils/documents.py), resultados de las páginas y ZIP (utils/warmcache.py) e informes PDF (utils/reports.py)
+
+# Tiempo máximo de la ejecución de una página
+PAGE_TIMEOUT = 900
+
+
+def _timed(results, name, produce):
+    start = time.perf_counter()
+    try:
+        produce()
+        results[name] = {"seconds": time.perf_counter() - start, "error": None}
+    except Exception as error:
+        results[name] = {"seconds": time.perf_counter() - start, "error": f"{type(error).__name__}: {error}"}
+
+
+def warm_data(results):
+    from utils.columnar import ensure_sidecar
+    from utils.etl import refresh_processed_data
+
+    _timed(results, "data/processed", refresh_processed_data)
+    for name in DATASETS:
+        _timed(results, f"columnar.{name}", lambda name=name: ensure_sidecar(name))
+        _timed(results, f"columnar.{name}.exact", lambda name=name: ensure_sidecar(name, exact=True))
+
+
+def warm_documents(results):
+    from utils.documents import extraction_progress, load_index, start_extraction
+
+    def extract():
+        start_extraction()
+        while extraction_progress() is not None:
+            time.sleep(0.2)
+        load_index()
+
+    _timed(results, "documents.index", extract)
+
+
+def warm_pages(results, titles=None):
+    # Cada página se ejecuta sin navegador, como en benchmarks/page_runner.py: todo lo que calcula queda en disco
+    import streamlit_option_menu
+    from streamlit.testing.v1 import AppTest
+
+    for page in PAGES:
+        title = page["title"]
+        if titles and title not in titles:
+            continue
+
+        def run(title=title):
+            # El menú es un componente de React que no funciona sin navegador: devolvemos directamente la página
+            streamlit_option_menu.option_menu = lambda *args, **kwargs: title
+            app = AppTest.from_file(str(BASE_DIR / "app.py"), default_timeout=PAGE_TIMEOUT)
+            app.session_state["current_page_key"] = title
+            app.run()
+            if app.exception:
+                raise RuntimeError("; ".join(exception.message for exception in app.exception))
+
+        _timed(results, f"page.{title}", run)
+
+
+def warm_downloads(results):
+    # Lo que "Downloads & Resources" genera al hacer clic (fuera de la ejecución de la página)
+    from utils.archives import get_folder_archive
+    from utils.reports import LANGUAGES, build_report
+
+    _timed(results, "archives.raw", lambda: get_folder_archive(os.fspath(RAW_DIR)))
+    _timed(results, "archives.processed", lambda: get_folder_archive(os.fspath(PROCESSED_DIR)))
+    for lang in LANGUAGES:
+        _timed(results, f"reports.{lang}", lambda lang=lang: build_report(lang))
+
+
+def warmup(titles=None, pages=True, downloads=True):
+    # Devuelve {paso: {"seconds", "error"}} en el orden en que se ha calentado
+    results = {}
+    warm_data(results)
+    warm_documents(results)
+    if pages:
+        warm_pages(results, titles)
+    if downloads:
+        warm_downloads(results)
+    return results
+
+
+if __name__ == "__main__":
+    # python -m utils.warmup                     todo (datos, PDF, todas las páginas y descargas)
+    # python -m utils.warmup --page Statistics   solo esa página (se puede repetir)
+    parser = argparse.ArgumentParser(description="Precompute everything the pages need before the server takes traffic.")
+    parser.add_argument("--page", action="append", help="Only this page (can be repeated)")
+    parser.add_argument("--no-downloads", action="store_true", help="Skip the ZIP archives and PDF reports")
+    args = parser.parse_args()
+
+    from utils.warmcache import get_disk_cache
+
+    results = warmup(args.page, downloads=not args.no_downloads)
+    for name, result in results.items():
+        print(f"{name:<36} {result['seconds']:>7.2f} s" + (f"  ERROR {result['error']}" if result["error"] else ""))
+    snapshot = get_disk_cache().snapshot()
+    print(f"Disk cache: {snapshot['entries']} entries, {snapshot['used_bytes'] / 1024 ** 2:.1f} of {snapshot['budget_bytes'] / 1024 ** 2:.0f} MB in {snapshot['folder']}")
+    if any(result["error"] for result in results.values()):
+        raise SystemExit(1)